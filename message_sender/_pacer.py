@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class _PacerBase:
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+
+    def _reserve(self) -> float:
+        """Take a token and return how many seconds the caller has to wait before using it.
+
+        Tokens are allowed to go negative so concurrent callers queue up behind each other instead
+        of all waking at the same time.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= 1
+
+        if self._tokens >= 0:
+            return 0.0
+
+        return -self._tokens / self.rate
+
+
+class AsyncPacer(_PacerBase):
+    """Async token bucket used to space out sends.
+
+    Args:
+        rate: The number of sends allowed per second.
+        burst: The number of sends that can go out back to back before pacing starts. Defaults to 1
+    """
+
+    async def wait(self) -> None:
+        """Wait until the next send is allowed."""
+
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class Pacer(_PacerBase):
+    """Thread safe token bucket used to space out sends.
+
+    Args:
+        rate: The number of sends allowed per second.
+        burst: The number of sends that can go out back to back before pacing starts. Defaults to 1
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self._lock = threading.Lock()
+
+        super().__init__(rate=rate, burst=burst)
+
+    def wait(self) -> None:
+        """Block until the next send is allowed."""
+
+        with self._lock:
+            delay = self._reserve()
+
+        if delay:
+            time.sleep(delay)
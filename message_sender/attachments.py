@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import mimetypes
+import os
+from collections.abc import AsyncIterable, AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass
+from typing import BinaryIO, Final
+
+FileSource = str | os.PathLike[str] | bytes | BinaryIO | AsyncIterable[bytes]
+
+_CHUNK_SIZE: Final = 64 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class Attachment:
+    """A file uploaded with a message.
+
+    The file is read in chunks while the request is being sent so large files are never loaded
+    into memory.
+
+    Args:
+        file: A path, bytes, a binary file object or an async iterator of bytes. Paths are opened
+            when the upload starts, file objects are read from their current position and are not
+            closed, and async iterators can only be sent by the async clients.
+        filename: The name shown for the file. Defaults to the name of the path or file object
+        content_type: The media type of the file. Defaults to a guess from the file name
+        description: Alt text for the file. Defaults to None
+    """
+
+    file: FileSource
+    filename: str | None = None
+    content_type: str | None = None
+    description: str | None = None
+
+    @property
+    def name(self) -> str:
+        """The name sent for the file."""
+
+        if self.filename:
+            return self.filename
+
+        path = self.file if isinstance(self.file, (str, os.PathLike)) else None
+        if path is None:
+            path = getattr(self.file, "name", None)
+
+        return os.path.basename(path) if isinstance(path, (str, os.PathLike)) else "file"
+
+    @property
+    def media_type(self) -> str:
+        """The content type sent for the file."""
+
+        return self.content_type or mimetypes.guess_type(self.name)[0] or "application/octet-stream"
+
+    def size(self) -> int | None:
+        """The number of bytes that will be sent, None if it can't be known before sending."""
+
+        if isinstance(self.file, bytes):
+            return len(self.file)
+
+        if isinstance(self.file, (str, os.PathLike)):
+            return os.path.getsize(self.file)
+
+        if isinstance(self.file, AsyncIterable) or not self.file.seekable():
+            return None
+
+        position = self.file.tell()
+        end = self.file.seek(0, os.SEEK_END)
+        self.file.seek(position)
+
+        return end - position
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Read the file in chunks."""
+
+        if isinstance(self.file, bytes):
+            yield self.file
+        elif isinstance(self.file, (str, os.PathLike)):
+            with open(self.file, "rb") as f:
+                while chunk := f.read(_CHUNK_SIZE):
+                    yield chunk
+        elif isinstance(self.file, AsyncIterable):
+            raise TypeError("Async iterators can only be sent by the async clients")
+        else:
+            while chunk := self.file.read(_CHUNK_SIZE):
+                yield chunk
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        """Read the file in chunks without blocking the event loop."""
+
+        if isinstance(self.file, bytes):
+            yield self.file
+        elif isinstance(self.file, AsyncIterable):
+            async for chunk in self.file:
+                yield chunk
+        elif isinstance(self.file, (str, os.PathLike)):
+            f = await asyncio.to_thread(open, self.file, "rb")
+            try:
+                while chunk := await asyncio.to_thread(f.read, _CHUNK_SIZE):
+                    yield chunk
+            finally:
+                f.close()
+        else:
+            while chunk := await asyncio.to_thread(self.file.read, _CHUNK_SIZE):
+                yield chunk
+
+
+def _quote(value: str) -> str:
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class MultipartBody:
+    """A multipart/form-data request body that streams its files.
+
+    Args:
+        fields: The name, content type and value of each form field.
+        files: The field name and attachment for each file.
+    """
+
+    def __init__(
+        self, fields: Sequence[tuple[str, str, bytes]], files: Sequence[tuple[str, Attachment]]
+    ) -> None:
+        self.boundary = os.urandom(16).hex()
+        self._fields = [
+            self._part_header(name, None, content_type) + value + b"\r\n"
+            for name, content_type, value in fields
+        ]
+        self._files = [
+            (self._part_header(name, attachment.name, attachment.media_type), attachment)
+            for name, attachment in files
+        ]
+        self._end = f"--{self.boundary}--\r\n".encode()
+        self.bytes_sent = 0
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """The request headers for the body, including Content-Length when every file size is
+        known.
+        """
+
+        headers = {"Content-Type": f"multipart/form-data; boundary={self.boundary}"}
+        length = sum(len(field) for field in self._fields) + len(self._end)
+        for header, attachment in self._files:
+            size = attachment.size()
+            if size is None:
+                return headers
+            length += len(header) + size + 2
+
+        headers["Content-Length"] = str(length)
+
+        return headers
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Produce the body in chunks, counting them in `bytes_sent`."""
+
+        for chunk in self._chunks():
+            self.bytes_sent += len(chunk)
+            yield chunk
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        """Produce the body in chunks without blocking the event loop, counting them in
+        `bytes_sent`.
+        """
+
+        for field in self._fields:
+            self.bytes_sent += len(field)
+            yield field
+        for header, attachment in self._files:
+            self.bytes_sent += len(header) + 2
+            yield header
+            async for chunk in attachment.aiter_bytes():
+                self.bytes_sent += len(chunk)
+                yield chunk
+            yield b"\r\n"
+        self.bytes_sent += len(self._end)
+        yield self._end
+
+    def _chunks(self) -> Iterator[bytes]:
+        yield from self._fields
+        for header, attachment in self._files:
+            yield header
+            yield from attachment.iter_bytes()
+            yield b"\r\n"
+        yield self._end
+
+    def _part_header(self, name: str, filename: str | None, content_type: str) -> bytes:
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: {disposition}\r\n"
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
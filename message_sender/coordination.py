@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import ssl
+import time
+from typing import TYPE_CHECKING, Any, Final, Protocol, Self
+from urllib.parse import unquote, urlsplit
+
+from aiosmtplib import SMTPResponseException, SMTPServerDisconnected
+from httpx2 import HTTPStatusError, TransportError
+
+from message_sender.limiter import is_throttled
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+
+class BackendError(Exception):
+    """Raised when the shared backend replies with an error."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending while a destination's circuit is open.
+
+    The circuit opens for every sender sharing the backend when a destination fails too often, so
+    the cluster stops hammering a service that is down.
+
+    Args:
+        key: The destination whose circuit is open.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        super().__init__(f"Circuit is open for {key}")
+
+
+class SharedBackend(Protocol):
+    """Shared state used to coordinate senders across processes and hosts.
+
+    Every operation must be atomic across all senders using the backend.
+    """
+
+    async def take_token(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from a token bucket refilled at `rate` per second holding up to `burst`.
+
+        Returns 0.0 if a token was taken, otherwise the seconds until one will be available
+        without taking anything.
+        """
+        ...
+
+    async def set_if_absent(self, key: str, ttl: float) -> bool:
+        """Set a key that expires after `ttl` seconds, True if it didn't already exist."""
+        ...
+
+    async def exists(self, key: str) -> bool:
+        """True if the key is set."""
+        ...
+
+    async def increment(self, key: str, ttl: float) -> int:
+        """Add one to a counter and return it, the counter expires `ttl` seconds after it starts."""
+        ...
+
+    async def delete(self, key: str) -> None:
+        """Remove a key."""
+        ...
+
+    async def close(self) -> None:
+        """Release any connections."""
+        ...
+
+
+def _gcra(tat: float, now: float, rate: float, burst: int) -> tuple[float, float]:
+    """Token bucket as the generic cell rate algorithm.
+
+    Returns the new theoretical arrival time and the seconds to wait, which is 0.0 when a token
+    was taken.
+    """
+
+    interval = 1 / rate
+    new_tat = max(tat, now) + interval
+    wait = new_tat - now - burst * interval
+
+    return new_tat, max(wait, 0.0)
+
+
+class InMemoryBackend:
+    """Backend holding the shared state in this process.
+
+    Coordinates the clients and tasks of one process, and stands in for a shared backend in tests
+    and single node deployments.
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[str, tuple[float, float | None]] = {}
+
+    def _get(self, key: str) -> float | None:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._values[key]
+            return None
+
+        return entry[0]
+
+    async def take_token(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        new_tat, wait = _gcra(self._get(key) or now, now, rate, burst)
+        if not wait:
+            self._values[key] = (new_tat, new_tat)
+
+        return wait
+
+    async def set_if_absent(self, key: str, ttl: float) -> bool:
+        if self._get(key) is not None:
+            return False
+
+        self._values[key] = (1.0, time.monotonic() + ttl)
+        return True
+
+    async def exists(self, key: str) -> bool:
+        return self._get(key) is not None
+
+    async def increment(self, key: str, ttl: float) -> int:
+        value = self._get(key)
+        expires = self._values[key][1] if value is not None else time.monotonic() + ttl
+        count = int(value or 0) + 1
+        self._values[key] = (float(count), expires)
+
+        return count
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def close(self) -> None:
+        self._values.clear()
+
+
+def _encode(*args: str | int | float) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = str(arg).encode()
+        parts.append(b"$%d\r\n%b\r\n" % (len(data), data))
+
+    return b"".join(parts)
+
+
+class RedisBackend:
+    """Backend holding the shared state in Redis, or anything speaking the Redis protocol such as
+    Valkey or KeyDB.
+
+    Tokens are taken with an optimistic WATCH/MULTI/EXEC transaction using the server's clock, so
+    the senders' clocks don't need to agree, and deduplication uses SET NX. Commands share one
+    connection which is opened on first use and reopened after an error.
+
+    Args:
+        url: The server URL, `redis://[:password@]host[:port][/db]`, or `rediss://` for TLS.
+            Defaults to "redis://localhost:6379/0"
+        timeout: Seconds to wait for the server before giving up. Defaults to 5.0
+
+    Examples:
+        >>> from message_sender.coordination import RedisBackend
+        >>>
+        >>> backend = RedisBackend("redis://:password@redis.internal:6379/0")
+    """
+
+    _MAX_RETRIES: Final = 16
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout: float = 5.0) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Unsupported URL scheme: {parts.scheme!r}")
+
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._username = unquote(parts.username) if parts.username else None
+        self._password = unquote(parts.password) if parts.password else None
+        self._ssl = ssl.create_default_context() if parts.scheme == "rediss" else None
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        async with self._lock:
+            self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self._ssl), self.timeout
+        )
+        commands: list[tuple[str | int, ...]] = []
+        if self._password is not None:
+            auth = (self._username, self._password) if self._username else (self._password,)
+            commands.append(("AUTH", *auth))
+        if self.db:
+            commands.append(("SELECT", self.db))
+        if commands:
+            await self._send(commands)
+
+    async def _read(self) -> Any:
+        assert self._reader is not None
+        line = await self._reader.readuntil(b"\r\n")
+        kind, value = line[:1], line[1:-2]
+        if kind == b"+":
+            return value.decode()
+        if kind == b"-":
+            return BackendError(value.decode())
+        if kind == b":":
+            return int(value)
+        if kind == b"$":
+            if int(value) == -1:
+                return None
+            return (await self._reader.readexactly(int(value) + 2))[:-2].decode()
+        if kind == b"*":
+            if int(value) == -1:
+                return None
+            return [await self._read() for _ in range(int(value))]
+
+        raise BackendError(f"Unexpected reply: {line!r}")
+
+    async def _send(self, commands: list[tuple[str | int, ...]]) -> list[Any]:
+        assert self._writer is not None
+        self._writer.write(b"".join(_encode(*command) for command in commands))
+        await self._writer.drain()
+        replies = [await asyncio.wait_for(self._read(), self.timeout) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, BackendError):
+                raise reply
+
+        return replies
+
+    async def execute(self, *commands: tuple[str | int, ...]) -> list[Any]:
+        """Send commands in one round trip and return their replies.
+
+        Args:
+            *commands: The commands, each a tuple of the command name and its arguments.
+
+        Examples:
+            >>> from message_sender.coordination import RedisBackend
+            >>>
+            >>> async with RedisBackend() as backend:
+            >>>     await backend.execute(("PING",))
+            ['PONG']
+        """
+
+        async with self._lock:
+            return await self._execute(list(commands))
+
+    async def _execute(self, commands: list[tuple[str | int, ...]]) -> list[Any]:
+        if self._writer is None:
+            await self._connect()
+        try:
+            return await self._send(commands)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            self._disconnect()
+            raise
+
+    async def take_token(self, key: str, rate: float, burst: int) -> float:
+        async with self._lock:
+            for _ in range(self._MAX_RETRIES):
+                _, stored, (seconds, microseconds) = await self._execute(
+                    [("WATCH", key), ("GET", key), ("TIME",)]
+                )
+                now = int(seconds) + int(microseconds) / 1_000_000
+                new_tat, wait = _gcra(float(stored) if stored else now, now, rate, burst)
+                if wait:
+                    await self._execute([("UNWATCH",)])
+                    return wait
+
+                ttl = max(math.ceil((new_tat - now) * 1000), 1)
+                *_, committed = await self._execute(
+                    [("MULTI",), ("SET", key, repr(new_tat), "PX", ttl), ("EXEC",)]
+                )
+                if committed is not None:
+                    return 0.0
+
+        # Other senders won every race, back off as if the bucket were empty.
+        return 1 / rate
+
+    async def set_if_absent(self, key: str, ttl: float) -> bool:
+        (reply,) = await self.execute(("SET", key, 1, "NX", "PX", max(math.ceil(ttl * 1000), 1)))
+        return reply is not None
+
+    async def exists(self, key: str) -> bool:
+        (reply,) = await self.execute(("EXISTS", key))
+        return bool(reply)
+
+    async def increment(self, key: str, ttl: float) -> int:
+        *_, (count, _) = await self.execute(
+            ("MULTI",),
+            ("INCR", key),
+            ("PEXPIRE", key, max(math.ceil(ttl * 1000), 1), "NX"),
+            ("EXEC",),
+        )
+        return count
+
+    async def delete(self, key: str) -> None:
+        await self.execute(("DEL", key))
+
+
+def is_service_failure(error: BaseException) -> bool:
+    """Determine if an error means the destination is down or overloaded.
+
+    Throttling (see `is_throttled`), HTTP 5xx responses, temporary SMTP 4xx replies and connection
+    errors count. Errors caused by the message itself, such as HTTP 400, don't.
+
+    Args:
+        error: The error raised by the send.
+    """
+
+    if is_throttled(error):
+        return True
+    if isinstance(error, HTTPStatusError):
+        return error.response.status_code >= 500
+    if isinstance(error, SMTPResponseException):
+        return 400 <= error.code < 500
+
+    return isinstance(error, (TransportError, SMTPServerDisconnected, OSError))
+
+
+class Coordinator:
+    """Coordinates sends from many processes or hosts through a shared backend.
+
+    Pass the same coordinator settings and backend to the async clients on every node. Sends to
+    one destination then share a global rate limit, alerts sent with a `dedup_key` go out once
+    across the cluster, and a destination that keeps failing has its circuit opened for everyone
+    so sends fail fast with `CircuitOpenError` until it has had time to recover.
+
+    Keys in the backend are prefixed with `namespace` and hashed so webhook tokens and addresses
+    aren't stored.
+
+    Args:
+        backend: The shared state, a `RedisBackend` for a cluster or an `InMemoryBackend` for one
+            process.
+        rate: The most sends per second to one destination across all senders. None disables the
+            shared rate limit. Defaults to None
+        burst: How many sends can go at once after a quiet period. Defaults to 1
+        dedup_ttl: Seconds a `dedup_key` is remembered. Defaults to 3600.0
+        failure_threshold: Failures within `failure_window` that open the circuit. None disables
+            the circuit. Defaults to 5
+        failure_window: Seconds failures are counted over. Defaults to 60.0
+        open_seconds: Seconds the circuit stays open. Defaults to 30.0
+        namespace: Prefix for the keys in the backend. Defaults to "message_sender"
+
+    Examples:
+        >>> from message_sender.coordination import Coordinator, RedisBackend
+        >>> from message_sender.discord import AsyncDiscordClient
+        >>>
+        >>> coordinator = Coordinator(RedisBackend("redis://redis.internal:6379/0"), rate=0.5)
+        >>> async with AsyncDiscordClient(
+        >>>     "https://your-webhook-url.com", coordinator=coordinator
+        >>> ) as client:
+        >>>     await client.send_message("Disk full on db1", dedup_key="disk-full:db1")
+    """
+
+    def __init__(
+        self,
+        backend: SharedBackend,
+        rate: float | None = None,
+        burst: int = 1,
+        dedup_ttl: float = 3600.0,
+        failure_threshold: int | None = 5,
+        failure_window: float = 60.0,
+        open_seconds: float = 30.0,
+        namespace: str = "message_sender",
+    ) -> None:
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if failure_threshold is not None and failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+
+        self.backend = backend
+        self.rate = rate
+        self.burst = burst
+        self.dedup_ttl = dedup_ttl
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.open_seconds = open_seconds
+        self.namespace = namespace
+
+    def _key(self, kind: str, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return f"{self.namespace}:{kind}:{digest}"
+
+    async def begin(self, key: str, dedup_key: str | None = None) -> bool:
+        """Check a send can go ahead before it starts.
+
+        Args:
+            key: The destination, for example the webhook URL.
+            dedup_key: Identifies the message so it is only sent once across all senders.
+                Defaults to None
+
+        Returns:
+            False if the message was already sent by any sender and should be skipped.
+
+        Raises:
+            CircuitOpenError: The destination's circuit is open.
+        """
+
+        if self.failure_threshold is not None and await self.backend.exists(
+            self._key("circuit", key)
+        ):
+            raise CircuitOpenError(key)
+
+        if dedup_key is None:
+            return True
+
+        return await self.backend.set_if_absent(self._key("sent", dedup_key), self.dedup_ttl)
+
+    async def acquire(self, key: str) -> None:
+        """Wait for a token from the destination's shared rate limit.
+
+        Args:
+            key: The destination, for example the webhook URL.
+        """
+
+        if self.rate is None:
+            return
+
+        bucket = self._key("rate", key)
+        while True:
+            wait = await self.backend.take_token(bucket, self.rate, self.burst)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    async def failed(self, key: str, dedup_key: str | None, error: BaseException) -> None:
+        """Record a failed send.
+
+        The `dedup_key` is released so the message can be sent again, and service failures (see
+        `is_service_failure`) count towards opening the destination's circuit.
+
+        Args:
+            key: The destination, for example the webhook URL.
+            dedup_key: The `dedup_key` the send claimed, if any.
+            error: The error raised by the send.
+        """
+
+        if dedup_key is not None:
+            await self.backend.delete(self._key("sent", dedup_key))
+
+        if self.failure_threshold is None or not is_service_failure(error):
+            return
+
+        failures = self._key("failures", key)
+        if await self.backend.increment(failures, self.failure_window) >= self.failure_threshold:
+            await self.backend.set_if_absent(self._key("circuit", key), self.open_seconds)
+            await self.backend.delete(failures)
@@ -1,27 +1,140 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Self
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Sequence
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Final, Self
 
-from httpx2 import AsyncClient, Client
+from httpx2 import AsyncBaseTransport, AsyncClient, BaseTransport, Client
+
+from message_sender.attachments import Attachment, MultipartBody
+from message_sender.maintenance import STALE_CONNECTION_ERRORS, pool_limits
+from message_sender.payloads import JSON_HEADERS, dumps
+from message_sender.results import SendResult, record_response
+from message_sender.splitting import MessageTooLongError, Overflow, chunk_message
+from message_sender.streaming import StreamResult, stream_sends
 
 if TYPE_CHECKING:
     from types import TracebackType
 
+    from message_sender.coordination import Coordinator
+    from message_sender.limiter import AdaptiveLimiter
+
 
 class _DiscordClientBase:
+    MAX_MESSAGE_LENGTH: Final = 2000
+    MAX_ATTACHMENTS: Final = 10
+    MAX_ATTACHMENT_BYTES: Final = 10 * 1024 * 1024
+
     def __init__(self, webhook_url: str) -> None:
         self.webhook_url = webhook_url
 
+    @classmethod
+    def encode_message(cls, message: str) -> bytes:
+        """Serialize a message once so it can be sent to many webhooks without encoding it again.
+
+        The message is checked against Discord's limits here, so it must fit in one message.
+
+        Args:
+            message: The message to encode
+
+        Examples:
+            >>> import asyncio
+            >>> from message_sender.discord import AsyncDiscordClient
+            >>>
+            >>> payload = AsyncDiscordClient.encode_message("Some test message")
+            >>> await asyncio.gather(*(client.send_message(payload) for client in clients))
+        """
+
+        chunk_message(message, cls.MAX_MESSAGE_LENGTH, "error")
+
+        return dumps({"content": message})
+
+    def _requests(
+        self,
+        message: str | bytes,
+        overflow: Overflow,
+        thread_id: str | None,
+        attachments: Sequence[Attachment] | None,
+        wait: bool,
+    ) -> list[dict[str, Any]]:
+        query = {"thread_id": thread_id} if thread_id else {}
+        if wait:
+            query["wait"] = "true"
+        params = {"params": query} if query else {}
+        if isinstance(message, bytes):
+            if attachments:
+                raise ValueError("Attachments can't be sent with a pre-encoded message")
+            return [{"content": message, "headers": JSON_HEADERS} | params]
+
+        files = list(attachments or ())
+        chunks = (
+            chunk_message(message, self.MAX_MESSAGE_LENGTH, overflow)
+            if message or not files
+            else []
+        )
+        if chunks is None:
+            files.insert(
+                0, Attachment(message.encode(), filename="message.txt", content_type="text/plain")
+            )
+            chunks = []
+
+        if len(files) > self.MAX_ATTACHMENTS:
+            raise ValueError(
+                f"Discord allows at most {self.MAX_ATTACHMENTS} attachments per message"
+            )
+        total = sum(size for file in files if (size := file.size()) is not None)
+        if total > self.MAX_ATTACHMENT_BYTES:
+            raise MessageTooLongError(total, self.MAX_ATTACHMENT_BYTES)
+
+        requests: list[dict[str, Any]] = [{"json": {"content": chunk}} for chunk in chunks]
+        if files:
+            # Attachments go with the last part of a split message so they follow the text.
+            payload = requests.pop()["json"] if requests else {}
+            payload["attachments"] = [
+                {"id": i, "filename": file.name}
+                | ({"description": file.description} if file.description else {})
+                for i, file in enumerate(files)
+            ]
+            requests.append(
+                {
+                    "multipart": MultipartBody(
+                        [("payload_json", "application/json", dumps(payload))],
+                        [(f"files[{i}]", file) for i, file in enumerate(files)],
+                    )
+                }
+            )
+
+        return [request | params for request in requests]
+
 
 class AsyncDiscordClient(_DiscordClientBase):
     """Async client to send messages to Discord.
 
     Args:
         webhook_url: URL for the webhook created in Discord.
+        limiter: Adaptive concurrency limiter shared by sends through this client. Defaults to None
+        transport: The httpx2 transport requests are sent with, for example a `LocalTransport` to
+            load test or dry run without posting to the webhook. Defaults to the network
+        keepalive_expiry: Seconds a pooled connection can sit idle before it is closed instead of
+            reused. Keep this below the idle timeout of any load balancer or proxy in between so
+            requests aren't sent on connections it has already dropped. None never closes idle
+            connections. Defaults to 5.0
+        coordinator: Shares a rate limit, deduplication and a circuit breaker for the webhook with
+            every sender using the same backend, see `Coordinator`. Defaults to None
     """
 
-    def __init__(self, webhook_url: str) -> None:
-        self._client = AsyncClient()
+    def __init__(
+        self,
+        webhook_url: str,
+        limiter: AdaptiveLimiter | None = None,
+        transport: AsyncBaseTransport | None = None,
+        keepalive_expiry: float | None = 5.0,
+        coordinator: Coordinator | None = None,
+    ) -> None:
+        self._client = AsyncClient(transport=transport, limits=pool_limits(keepalive_expiry))
+        self._limiter = limiter
+        self._coordinator = coordinator
 
         super().__init__(webhook_url=webhook_url)
 
@@ -50,21 +163,128 @@ class AsyncDiscordClient(_DiscordClientBase):
 
         await self._client.aclose()
 
-    async def send_message(self, message: str) -> None:
+    async def warm_up(self) -> None:
+        """Open a pooled connection to Discord and check the webhook exists.
+
+        The webhook is fetched, which Discord allows with the token in the URL, so the first
+        message doesn't pay for the TLS handshake and a wrong URL fails here instead.
+
+        Examples:
+            >>> from message_sender.discord import AsyncDiscordClient
+            >>>
+            >>> async with AsyncDiscordClient("https://your-webhook-url.com") as client:
+            >>>     await client.warm_up()
+        """
+
+        response = await self._client.get(self.webhook_url)
+        response.raise_for_status()
+
+    async def send_message(
+        self,
+        message: str | bytes,
+        overflow: Overflow = "split",
+        thread_id: str | None = None,
+        attachments: Sequence[Attachment] | None = None,
+        wait: bool = False,
+        dedup_key: str | None = None,
+    ) -> SendResult:
         """Send a message to the Discord webhook.
 
         Args:
-            message: The message to send
+            message: The message to send, or a payload from `encode_message` which is sent as is
+            overflow: What to do if the message is longer than Discord's 2,000 character limit.
+                "split" sends it as ordered messages broken on line or word boundaries, "attach"
+                uploads it as a message.txt file and "error" raises `MessageTooLongError`. The
+                message is checked before anything is sent. Defaults to "split"
+            thread_id: Send to this thread in the webhook's channel. Defaults to None
+            attachments: Files to upload with the message, up to 10 and 10 MiB in total. The files
+                are streamed rather than read into memory and the message can be empty when there
+                are attachments. Defaults to None
+            wait: Wait for Discord to create the message and return it, including its id, in the
+                result's response. Defaults to False
+            dedup_key: Identifies the message so it is sent once across every sender sharing the
+                client's coordinator, later sends with the same key are skipped and return a
+                result with 0 attempts. Ignored without a coordinator. Defaults to None
+
+        Returns:
+            The status, response, bytes sent and timings of the send. For a split message the
+            status and response are from the last part.
 
         Examples:
             >>> from message_sender.discord import AsyncDiscordClient
             >>>
             >>> async with AsyncDiscordClient("https://your-webhook-url.com") as client:
             >>>     await client.send_message("Some test message")
+            >>>
+            >>> from message_sender.attachments import Attachment
+            >>>
+            >>> async with AsyncDiscordClient("https://your-webhook-url.com") as client:
+            >>>     await client.send_message(
+            >>>         "Deploy failed", attachments=[Attachment("deploy.log")]
+            >>>     )
         """
 
-        response = await self._client.post(self.webhook_url, json={"content": message})
-        response.raise_for_status()
+        result = SendResult()
+        with result.phase("build"):
+            requests = self._requests(message, overflow, thread_id, attachments, wait)
+
+        coordinator = self._coordinator
+        if coordinator is not None:
+            with result.phase("wait"):
+                if not await coordinator.begin(self.webhook_url, dedup_key):
+                    result.attempts = 0
+                    return result
+
+        try:
+            for request in requests:
+                if body := request.pop("multipart", None):
+                    request.update(content=body.aiter_bytes(), headers=body.headers)
+
+                start = time.perf_counter()
+                if coordinator is not None:
+                    await coordinator.acquire(self.webhook_url)
+                async with self._limiter.acquire() if self._limiter else nullcontext():
+                    result.add("wait", time.perf_counter() - start)
+                    with result.phase("send"):
+                        try:
+                            response = await self._client.post(self.webhook_url, **request)
+                        except STALE_CONNECTION_ERRORS:
+                            if body:
+                                raise
+                            result.attempts += 1
+                            response = await self._client.post(self.webhook_url, **request)
+                    response.raise_for_status()
+                record_response(result, response, body.bytes_sent if body else None)
+        except Exception as error:
+            if coordinator is not None:
+                await coordinator.failed(self.webhook_url, dedup_key, error)
+            raise
+
+        return result
+
+    def send_stream(
+        self, messages: AsyncIterable[str] | Iterable[str], max_in_flight: int = 10
+    ) -> AsyncIterator[StreamResult[str]]:
+        """Send every message from a source to the Discord webhook.
+
+        Messages are only read from the source as sends finish so memory stays flat for any size
+        of source. Results are yielded in the order the sends complete and failed sends are
+        yielded with their error instead of stopping the stream.
+
+        Args:
+            messages: An iterable or async iterable of messages to send
+            max_in_flight: The maximum number of sends running at once. Defaults to 10
+
+        Examples:
+            >>> from message_sender.discord import AsyncDiscordClient
+            >>>
+            >>> async with AsyncDiscordClient("https://your-webhook-url.com") as client:
+            >>>     async for result in client.send_stream(read_alerts()):
+            >>>         if not result.ok:
+            >>>             print(result.item, result.error)
+        """
+
+        return stream_sends(messages, self.send_message, max_in_flight=max_in_flight)
 
 
 class DiscordClient(_DiscordClientBase):
@@ -72,10 +292,21 @@ class DiscordClient(_DiscordClientBase):
 
     Args:
         webhook_url: URL for the webhook created in Discord.
+        transport: The httpx2 transport requests are sent with, for example a `LocalTransport` to
+            load test or dry run without posting to the webhook. Defaults to the network
+        keepalive_expiry: Seconds a pooled connection can sit idle before it is closed instead of
+            reused. Keep this below the idle timeout of any load balancer or proxy in between so
+            requests aren't sent on connections it has already dropped. None never closes idle
+            connections. Defaults to 5.0
     """
 
-    def __init__(self, webhook_url: str) -> None:
-        self._client = Client()
+    def __init__(
+        self,
+        webhook_url: str,
+        transport: BaseTransport | None = None,
+        keepalive_expiry: float | None = 5.0,
+    ) -> None:
+        self._client = Client(transport=transport, limits=pool_limits(keepalive_expiry))
 
         super().__init__(webhook_url=webhook_url)
 
@@ -104,18 +335,81 @@ class DiscordClient(_DiscordClientBase):
 
         self._client.close()
 
-    def send_message(self, message: str) -> None:
+    def warm_up(self) -> None:
+        """Open a pooled connection to Discord and check the webhook exists.
+
+        The webhook is fetched, which Discord allows with the token in the URL, so the first
+        message doesn't pay for the TLS handshake and a wrong URL fails here instead.
+
+        Examples:
+            >>> from message_sender.discord import DiscordClient
+            >>>
+            >>> with DiscordClient("https://your-webhook-url.com") as client:
+            >>>     client.warm_up()
+        """
+
+        response = self._client.get(self.webhook_url)
+        response.raise_for_status()
+
+    def send_message(
+        self,
+        message: str | bytes,
+        overflow: Overflow = "split",
+        thread_id: str | None = None,
+        attachments: Sequence[Attachment] | None = None,
+        wait: bool = False,
+    ) -> SendResult:
         """Send a message to the Discord webhook.
 
         Args:
-            message: The message to send
+            message: The message to send, or a payload from `encode_message` which is sent as is
+            overflow: What to do if the message is longer than Discord's 2,000 character limit.
+                "split" sends it as ordered messages broken on line or word boundaries, "attach"
+                uploads it as a message.txt file and "error" raises `MessageTooLongError`. The
+                message is checked before anything is sent. Defaults to "split"
+            thread_id: Send to this thread in the webhook's channel. Defaults to None
+            attachments: Files to upload with the message, up to 10 and 10 MiB in total. The files
+                are streamed rather than read into memory and the message can be empty when there
+                are attachments. Defaults to None
+            wait: Wait for Discord to create the message and return it, including its id, in the
+                result's response. Defaults to False
+
+        Returns:
+            The status, response, bytes sent and timings of the send. For a split message the
+            status and response are from the last part.
 
         Examples:
             >>> from message_sender.discord import DiscordClient
             >>>
             >>> with DiscordClient("https://your-webhook-url.com") as client:
             >>>     client.send_message("Some test message")
+            >>>
+            >>> from message_sender.attachments import Attachment
+            >>>
+            >>> with DiscordClient("https://your-webhook-url.com") as client:
+            >>>     client.send_message("Deploy failed", attachments=[Attachment("deploy.log")])
         """
 
-        response = self._client.post(self.webhook_url, json={"content": message})
-        response.raise_for_status()
+        if any(isinstance(attachment.file, AsyncIterable) for attachment in attachments or ()):
+            raise TypeError("Async iterators can only be sent by AsyncDiscordClient")
+
+        result = SendResult()
+        with result.phase("build"):
+            requests = self._requests(message, overflow, thread_id, attachments, wait)
+
+        for request in requests:
+            if body := request.pop("multipart", None):
+                request.update(content=body.iter_bytes(), headers=body.headers)
+
+            with result.phase("send"):
+                try:
+                    response = self._client.post(self.webhook_url, **request)
+                except STALE_CONNECTION_ERRORS:
+                    if body:
+                        raise
+                    result.attempts += 1
+                    response = self._client.post(self.webhook_url, **request)
+            response.raise_for_status()
+            record_response(result, response, body.bytes_sent if body else None)
+
+        return result
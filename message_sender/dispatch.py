@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Mapping
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Final, Literal, Self
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+
+class Priority(IntEnum):
+    """Priority lanes for queued sends. Lower values are served first."""
+
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    BULK = 3
+
+
+_DEFAULT_WEIGHTS: Final = {
+    Priority.CRITICAL: 8,
+    Priority.HIGH: 4,
+    Priority.NORMAL: 2,
+    Priority.BULK: 1,
+}
+
+
+class _Job:
+    __slots__ = ("args", "future", "kwargs")
+
+    def __init__(
+        self, args: tuple[Any, ...], kwargs: dict[str, Any], future: asyncio.Future[Any]
+    ) -> None:
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+
+
+class PriorityDispatcher:
+    """Dispatches sends from an async client through priority lanes.
+
+    Sends are queued per `Priority` and handed to a fixed number of workers, so the number of
+    concurrent sends (and connections) never grows past `concurrency`. Workers set aside with
+    `reserved` only ever serve the CRITICAL lane, which keeps critical latency flat while the other
+    lanes are saturated with bulk traffic.
+
+    Args:
+        send: The async send method to dispatch to, for example `client.send_message` or
+            `client.send_email`.
+        concurrency: The total number of sends that can be in flight at once. Defaults to 4
+        reserved: How many of the `concurrency` workers only serve the CRITICAL lane. Defaults to 1
+        scheduling: "strict" always serves the highest priority lane that has work. "weighted"
+            shares the general workers between lanes in proportion to `weights`. Defaults to
+            "strict"
+        weights: The share each lane gets when `scheduling` is "weighted". Defaults to 8, 4, 2, 1
+            from CRITICAL to BULK
+
+    Examples:
+        >>> from message_sender.discord import AsyncDiscordClient
+        >>> from message_sender.dispatch import Priority, PriorityDispatcher
+        >>>
+        >>> async with AsyncDiscordClient("https://your-webhook-url.com") as client:
+        >>>     async with PriorityDispatcher(client.send_message) as dispatcher:
+        >>>         await dispatcher.submit("Disk full", priority=Priority.CRITICAL)
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., Awaitable[Any]],
+        *,
+        concurrency: int = 4,
+        reserved: int = 1,
+        scheduling: Literal["strict", "weighted"] = "strict",
+        weights: Mapping[Priority, int] | None = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if not 0 <= reserved < concurrency:
+            raise ValueError("reserved must be at least 0 and less than concurrency")
+        if scheduling not in ("strict", "weighted"):
+            raise ValueError("scheduling must be 'strict' or 'weighted'")
+
+        self.send = send
+        self.concurrency = concurrency
+        self.reserved = reserved
+        self.scheduling = scheduling
+        self.weights = {**_DEFAULT_WEIGHTS, **(weights or {})}
+        if any(weight < 1 for weight in self.weights.values()):
+            raise ValueError("weights must be at least 1")
+
+        self._lanes: dict[Priority, deque[_Job]] = {priority: deque() for priority in Priority}
+        self._credits = dict.fromkeys(Priority, 0)
+        self._wakeup: asyncio.Event | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._closing = False
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    def queue_depths(self) -> dict[Priority, int]:
+        """The number of sends waiting in each lane."""
+
+        return {priority: len(lane) for priority, lane in self._lanes.items()}
+
+    def start(self) -> None:
+        """Start the workers.
+
+        This is only needed if you don't use a context manager.
+        """
+
+        if self._workers:
+            return
+
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._work(critical_only=i < self.reserved))
+            for i in range(self.concurrency)
+        ]
+
+    async def close(self) -> None:
+        """Stop accepting sends, wait for the queued sends to finish, then stop the workers.
+
+        This is only needed if you don't use a context manager.
+        """
+
+        if self._wakeup is None:
+            return
+
+        self._closing = True
+        self._wakeup.set()
+
+        await asyncio.gather(*self._workers)
+        self._workers = []
+        self._wakeup = None
+
+    def submit_nowait(
+        self, *args: Any, priority: Priority = Priority.NORMAL, **kwargs: Any
+    ) -> asyncio.Future[Any]:
+        """Queue a send and return a future for its result without waiting.
+
+        Args:
+            *args: Positional arguments passed to `send`.
+            priority: The lane to queue the send in. Defaults to Priority.NORMAL
+            **kwargs: Keyword arguments passed to `send`.
+        """
+
+        if self._wakeup is None or self._closing:
+            raise RuntimeError("The dispatcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        self._lanes[Priority(priority)].append(_Job(args, kwargs, future))
+        self._wakeup.set()
+
+        return future
+
+    async def submit(self, *args: Any, priority: Priority = Priority.NORMAL, **kwargs: Any) -> Any:
+        """Queue a send and wait for its result.
+
+        Args:
+            *args: Positional arguments passed to `send`.
+            priority: The lane to queue the send in. Defaults to Priority.NORMAL
+            **kwargs: Keyword arguments passed to `send`.
+        """
+
+        return await self.submit_nowait(*args, priority=priority, **kwargs)
+
+    def _next_job(self, critical_only: bool) -> _Job | None:
+        if critical_only:
+            lane = self._lanes[Priority.CRITICAL]
+            return lane.popleft() if lane else None
+
+        ready = [priority for priority, lane in self._lanes.items() if lane]
+        if not ready:
+            return None
+
+        if self.scheduling == "strict":
+            return self._lanes[ready[0]].popleft()
+
+        # Smooth weighted round robin between the lanes that have work.
+        total = 0
+        for priority in ready:
+            self._credits[priority] += self.weights[priority]
+            total += self.weights[priority]
+        chosen = max(ready, key=self._credits.__getitem__)
+        self._credits[chosen] -= total
+
+        return self._lanes[chosen].popleft()
+
+    async def _work(self, *, critical_only: bool) -> None:
+        wakeup = self._wakeup
+        if wakeup is None:
+            return
+
+        while True:
+            job = self._next_job(critical_only)
+            if job is None:
+                if self._closing:
+                    return
+
+                # Nothing is awaited between checking the lanes and clearing the event, so a
+                # submit can't slip in unnoticed.
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+
+            if job.future.cancelled():
+                continue
+
+            try:
+                result = await self.send(*job.args, **job.kwargs)
+            except Exception as e:
+                if not job.future.cancelled():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.cancelled():
+                    job.future.set_result(result)
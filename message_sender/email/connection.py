@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import asyncio
+import smtplib
+import socket
+import ssl
+import threading
+import time
+from functools import cache
+from typing import TYPE_CHECKING, Any, Final
+
+from aiosmtplib import SMTP, SMTPConnectError, SMTPConnectTimeoutError
+
+if TYPE_CHECKING:
+    from aiosmtplib import SMTPResponse
+
+_AddressInfo = tuple[socket.AddressFamily, socket.SocketKind, int, str, tuple[Any, ...]]
+
+
+class ConnectionStats:
+    """Counters for the DNS and TLS work done when opening SMTP connections.
+
+    Use these to measure how much the caches save, for example comparing
+    `average_handshake_seconds` with `tls_resumed` at zero and after sessions start being resumed.
+    """
+
+    __slots__ = ("dns_hits", "dns_misses", "handshake_seconds", "tls_handshakes", "tls_resumed")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def __repr__(self) -> str:
+        return (
+            f"ConnectionStats(dns_hits={self.dns_hits}, dns_misses={self.dns_misses}, "
+            f"tls_handshakes={self.tls_handshakes}, tls_resumed={self.tls_resumed}, "
+            f"handshake_seconds={self.handshake_seconds:.6f})"
+        )
+
+    @property
+    def average_handshake_seconds(self) -> float:
+        """The mean time spent on a TLS handshake."""
+
+        return self.handshake_seconds / self.tls_handshakes if self.tls_handshakes else 0.0
+
+    def record_handshake(self, seconds: float, resumed: bool) -> None:
+        self.tls_handshakes += 1
+        self.handshake_seconds += seconds
+        if resumed:
+            self.tls_resumed += 1
+
+    def reset(self) -> None:
+        """Set all the counters back to zero."""
+
+        self.dns_hits = 0
+        self.dns_misses = 0
+        self.tls_handshakes = 0
+        self.tls_resumed = 0
+        self.handshake_seconds = 0.0
+
+
+stats: Final = ConnectionStats()
+
+
+class DNSCache:
+    """TTL bounded cache of resolved SMTP server addresses.
+
+    Args:
+        ttl: How many seconds a lookup is reused for. Defaults to 300
+        max_entries: The most hosts kept, the oldest lookup is dropped when full. Defaults to 1024
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[tuple[str, int], tuple[float, list[_AddressInfo]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, host: str, port: int) -> list[_AddressInfo] | None:
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry is not None and entry[0] > time.monotonic():
+                stats.dns_hits += 1
+                return entry[1]
+
+            stats.dns_misses += 1
+            return None
+
+    def _set(self, host: str, port: int, addresses: list[_AddressInfo]) -> None:
+        with self._lock:
+            self._entries.pop((host, port), None)
+            if len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._entries[(host, port)] = (time.monotonic() + self.ttl, addresses)
+
+    def invalidate(self, host: str, port: int) -> None:
+        """Forget the addresses for a host, for example after connecting to them failed."""
+
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self) -> None:
+        """Forget all cached addresses."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def resolve(self, host: str, port: int) -> list[_AddressInfo]:
+        """Resolve a host, using the cached addresses when they haven't expired."""
+
+        addresses = self._get(host, port)
+        if addresses is None:
+            addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            self._set(host, port, addresses)
+
+        return addresses
+
+    async def resolve_async(self, host: str, port: int) -> list[_AddressInfo]:
+        """Resolve a host without blocking the event loop, using the cached addresses when they
+        haven't expired.
+        """
+
+        addresses = self._get(host, port)
+        if addresses is None:
+            loop = asyncio.get_running_loop()
+            addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            self._set(host, port, addresses)
+
+        return addresses
+
+
+dns_cache: Final = DNSCache()
+
+
+class ResumingTLSContext(ssl.SSLContext):
+    """Client TLS context that resumes the last session for a host on new connections.
+
+    Resuming skips the full key exchange so reconnecting to a server is much cheaper. The context
+    has to be shared between connections since sessions can only be resumed by the context that
+    created them.
+    """
+
+    def __new__(cls, protocol: int = ssl.PROTOCOL_TLS_CLIENT) -> ResumingTLSContext:
+        return super().__new__(cls, protocol)
+
+    def __init__(self, protocol: int = ssl.PROTOCOL_TLS_CLIENT) -> None:
+        self._sessions: dict[str, ssl.SSLSession] = {}
+        self.load_default_certs()
+
+    def remember(self, server_hostname: str | None, ssl_object: Any) -> None:
+        """Store the TLS session of a connection so the next connection to the host can resume it.
+
+        Args:
+            server_hostname: The host the connection is to.
+            ssl_object: The `ssl.SSLSocket` or `ssl.SSLObject` of the connection.
+        """
+
+        session = getattr(ssl_object, "session", None)
+        if server_hostname and session is not None:
+            self._sessions[server_hostname] = session
+
+    def wrap_socket(  # type: ignore[override]
+        self,
+        sock: socket.socket,
+        server_side: bool = False,
+        do_handshake_on_connect: bool = True,
+        suppress_ragged_eofs: bool = True,
+        server_hostname: str | None = None,
+        session: ssl.SSLSession | None = None,
+    ) -> ssl.SSLSocket:
+        if session is None and server_hostname:
+            session = self._sessions.get(server_hostname)
+
+        start = time.perf_counter()
+        ssl_sock = super().wrap_socket(
+            sock,
+            server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname,
+            session=session,
+        )
+        if do_handshake_on_connect:
+            stats.record_handshake(time.perf_counter() - start, ssl_sock.session_reused)
+            self.remember(server_hostname, ssl_sock)
+
+        return ssl_sock
+
+    def wrap_bio(  # type: ignore[override]
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: str | None = None,
+        session: ssl.SSLSession | None = None,
+    ) -> ssl.SSLObject:
+        if session is None and server_hostname:
+            session = self._sessions.get(server_hostname)
+
+        return super().wrap_bio(
+            incoming,
+            outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session,
+        )
+
+
+@cache
+def shared_tls_context() -> ResumingTLSContext:
+    """The TLS context shared by every SMTP connection in the process."""
+
+    return ResumingTLSContext()
+
+
+def _connect(
+    host: str, port: int, timeout: float | None, source_address: tuple[str, int] | None
+) -> socket.socket:
+    error: OSError | None = None
+    for *_, address in dns_cache.resolve(host, port):
+        try:
+            # The address is numeric so this doesn't go back out to DNS.
+            return socket.create_connection(address[:2], timeout, source_address)
+        except OSError as e:
+            error = e
+
+    dns_cache.invalidate(host, port)
+    raise error or OSError(f"No addresses found for {host}")
+
+
+class CachedSMTP(smtplib.SMTP):
+    """`smtplib.SMTP` that resolves the server through the shared DNS cache and saves the TLS
+    session when the connection closes.
+
+    The size of the last message sent and the server's reply to it are kept in
+    `last_message_size`, `last_reply_code` and `last_reply_message`.
+    """
+
+    last_message_size: int = 0
+    last_reply_code: int | None = None
+    last_reply_message: str | None = None
+
+    def data(self, msg: Any) -> tuple[int, bytes]:
+        code, message = super().data(msg)
+        self.last_message_size = len(msg)
+        self.last_reply_code = code
+        self.last_reply_message = message.decode(errors="replace")
+
+        return code, message
+
+    def _get_socket(self, host: str, port: int, timeout: float) -> socket.socket:
+        if timeout is not None and not timeout:
+            raise ValueError("Non-blocking socket (timeout=0) is not supported")
+
+        return _connect(host, port, timeout, self.source_address)
+
+    def close(self) -> None:
+        if isinstance(self.sock, ssl.SSLSocket) and isinstance(
+            self.sock.context, ResumingTLSContext
+        ):
+            self.sock.context.remember(self._host, self.sock)
+
+        super().close()
+
+
+class CachedSMTPSSL(smtplib.SMTP_SSL, CachedSMTP):
+    """`smtplib.SMTP_SSL` that resolves the server through the shared DNS cache and saves the TLS
+    session when the connection closes.
+    """
+
+
+class CachedAsyncSMTP(SMTP):
+    """`aiosmtplib.SMTP` that resolves the server through the shared DNS cache, times the TLS
+    handshake and saves the TLS session when the connection closes.
+
+    For implicit TLS the handshake time includes waiting for the server greeting. The size of the
+    last message sent and the server's reply to it are kept in `last_message_size`,
+    `last_reply_code` and `last_reply_message`.
+    """
+
+    def __init__(self, *, hostname: str, port: int, **kwargs: Any) -> None:
+        super().__init__(hostname=hostname, port=port, **kwargs)
+        self._remote = (hostname, port)
+        self.last_message_size = 0
+        self.last_reply_code: int | None = None
+        self.last_reply_message: str | None = None
+
+    async def data(self, message: str | bytes, /, **kwargs: Any) -> SMTPResponse:
+        response = await super().data(message, **kwargs)
+        self.last_message_size = len(message)
+        self.last_reply_code = response.code
+        self.last_reply_message = response.message
+
+        return response
+
+    async def connect(self, **kwargs: Any) -> SMTPResponse:
+        host, port = self._remote
+        timeout = kwargs.get("timeout", self.timeout)
+        sock = await self._open_socket(host, port, timeout)
+
+        start = time.perf_counter()
+        try:
+            # aiosmtplib rejects a port alongside an already connected socket.
+            response = await super().connect(sock=sock, port=None, **kwargs)
+        except BaseException:
+            sock.close()
+            raise
+
+        if self.use_tls:
+            self._record_handshake(time.perf_counter() - start)
+
+        return response
+
+    async def starttls(self, **kwargs: Any) -> SMTPResponse:
+        start = time.perf_counter()
+        response = await super().starttls(**kwargs)
+        self._record_handshake(time.perf_counter() - start)
+
+        return response
+
+    def close(self) -> None:
+        ssl_object = self.transport.get_extra_info("ssl_object") if self.transport else None
+        if ssl_object is not None and isinstance(ssl_object.context, ResumingTLSContext):
+            ssl_object.context.remember(self._remote[0], ssl_object)
+
+        super().close()
+
+    def _record_handshake(self, seconds: float) -> None:
+        ssl_object = self.get_transport_info("ssl_object")
+        stats.record_handshake(seconds, bool(ssl_object and ssl_object.session_reused))
+
+    @staticmethod
+    async def _open_socket(host: str, port: int, timeout: float | None) -> socket.socket:
+        loop = asyncio.get_running_loop()
+        error: OSError | None = None
+        try:
+            async with asyncio.timeout(timeout):
+                for family, kind, proto, _, address in await dns_cache.resolve_async(host, port):
+                    sock = socket.socket(family, kind, proto)
+                    sock.setblocking(False)
+                    try:
+                        await loop.sock_connect(sock, address)
+                        return sock
+                    except OSError as e:
+                        error = e
+                        sock.close()
+        except TimeoutError as e:
+            dns_cache.invalidate(host, port)
+            raise SMTPConnectTimeoutError(f"Timed out connecting to {host} on port {port}") from e
+        except OSError as e:
+            error = e
+
+        dns_cache.invalidate(host, port)
+        raise SMTPConnectError(f"Error connecting to {host} on port {port}: {error}")
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import asyncio
+import ssl
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import TYPE_CHECKING, Final
+
+from aiosmtplib import (
+    SMTPConnectError,
+    SMTPConnectTimeoutError,
+    SMTPRecipientsRefused,
+    SMTPResponseException,
+    SMTPServerDisconnected,
+)
+
+from message_sender.email.connection import CachedAsyncSMTP, shared_tls_context
+from message_sender.email.models import Email
+from message_sender.results import SendResult, record_reply
+from message_sender.streaming import StreamResult
+
+if TYPE_CHECKING:
+    from message_sender.transports import LocalAsyncSMTP, LocalTransport
+
+
+@dataclass(frozen=True, slots=True)
+class MXRecord:
+    """A mail exchanger for a domain.
+
+    Args:
+        preference: Lower values are tried first.
+        host: The host name of the mail server.
+        ttl: How many seconds the record can be cached for. Defaults to 300
+    """
+
+    preference: int
+    host: str
+    ttl: float = 300.0
+
+
+MXResolver = Callable[[str], Awaitable[list[MXRecord]]]
+
+
+async def resolve_mx(domain: str) -> list[MXRecord]:
+    """Look up the MX records for a domain with dnspython.
+
+    When a domain has no MX records the domain itself is used as the mail server, as RFC 5321
+    requires. Install with `pip install message-sender[dns]` to use this resolver.
+
+    Args:
+        domain: The domain to look up.
+    """
+
+    try:
+        import dns.asyncresolver
+        import dns.resolver
+    except ImportError as e:  # pragma: no cover
+        raise ImportError(
+            "dnspython is required for MX lookups, install with `pip install message-sender[dns]`"
+        ) from e
+
+    try:
+        answer = await dns.asyncresolver.resolve(domain, "MX")
+    except dns.resolver.NoAnswer:
+        return [MXRecord(preference=0, host=domain)]
+
+    ttl = answer.rrset.ttl if answer.rrset is not None else 300
+    return [
+        MXRecord(preference=record.preference, host=record.exchange.to_text(True), ttl=ttl)
+        for record in answer
+    ]
+
+
+def _is_temporary(error: Exception) -> bool:
+    if isinstance(error, SMTPRecipientsRefused):
+        return all(400 <= response.code < 500 for response in error.recipients)
+
+    if isinstance(error, SMTPResponseException):
+        return 400 <= error.code < 500
+
+    return isinstance(error, (SMTPServerDisconnected, SMTPConnectError, SMTPConnectTimeoutError))
+
+
+class _Delivery:
+    __slots__ = ("attempts", "email")
+
+    def __init__(self, email: Email) -> None:
+        self.email = email
+        self.attempts = 0
+
+
+class AsyncDirectSMTPClient:
+    """Async client that delivers emails straight to each recipient domain's mail servers.
+
+    This skips the hop through a relay. Emails are grouped by recipient domain so each connection
+    to a domain's MX server carries many messages, the number of connections per domain is capped,
+    and temporary failures (4xx replies and dropped connections) are retried with exponential
+    backoff, moving on to the next MX server when one can't be reached.
+
+    STARTTLS is used whenever the receiving server offers it.
+
+    Args:
+        email_from: The email address for sending emails
+        resolver: Async function returning the MX records for a domain. Defaults to `resolve_mx`
+            which needs dnspython
+        port: The port mail servers listen on. Defaults to 25
+        local_hostname: The host name sent in EHLO. This should resolve back to the sending IP.
+            Defaults to the fully qualified name of this machine
+        max_connections_per_domain: The most connections open to one domain at once. Defaults to 2
+        max_domains: The most domains being delivered to at once. Defaults to 20
+        messages_per_connection: The most emails sent over one connection before reconnecting.
+            Defaults to 100
+        max_attempts: How many times an email is tried before giving up. Defaults to 3
+        backoff: Seconds to wait before the first retry, doubled for each retry. Defaults to 1.0
+        tls_context: The TLS context used for STARTTLS. Defaults to the shared context
+        transport: A `LocalTransport` to hand emails to instead of connecting to mail servers, for
+            load testing or dry runs. MX lookups still go through the resolver. Defaults to None
+    """
+
+    _MX_CACHE_SIZE: Final = 4096
+
+    def __init__(
+        self,
+        email_from: str,
+        resolver: MXResolver | None = None,
+        port: int = 25,
+        local_hostname: str | None = None,
+        max_connections_per_domain: int = 2,
+        max_domains: int = 20,
+        messages_per_connection: int = 100,
+        max_attempts: int = 3,
+        backoff: float = 1.0,
+        tls_context: ssl.SSLContext | None = None,
+        transport: LocalTransport | None = None,
+    ) -> None:
+        if max_connections_per_domain < 1 or max_domains < 1 or messages_per_connection < 1:
+            raise ValueError("connection and domain limits must be at least 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.email_from = email_from
+        self.resolver = resolver or resolve_mx
+        self.port = port
+        self.local_hostname = local_hostname
+        self.max_connections_per_domain = max_connections_per_domain
+        self.max_domains = max_domains
+        self.messages_per_connection = messages_per_connection
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.tls_context = tls_context
+        self._transport = transport
+
+        self._mx_cache: dict[str, tuple[float, list[MXRecord]]] = {}
+
+    def _build_message(self, email: Email) -> EmailMessage:
+        msg = EmailMessage()
+        msg["Subject"] = email.subject
+        msg["From"] = self.email_from
+        msg["To"] = email.email_to
+        msg.set_content(email.message)
+
+        if email.html_content:
+            msg.add_alternative(email.html_content, subtype="html")
+
+        return msg
+
+    async def mx_hosts(self, domain: str) -> list[str]:
+        """The mail servers for a domain in the order they should be tried.
+
+        Lookups are cached for the TTL of the records.
+
+        Args:
+            domain: The recipient domain.
+        """
+
+        domain = domain.lower()
+        cached = self._mx_cache.get(domain)
+        if cached is not None and cached[0] > time.monotonic():
+            return [record.host for record in cached[1]]
+
+        records = sorted(await self.resolver(domain), key=lambda record: record.preference)
+        if not records:
+            records = [MXRecord(preference=0, host=domain)]
+
+        if len(self._mx_cache) >= self._MX_CACHE_SIZE:
+            del self._mx_cache[next(iter(self._mx_cache))]
+        ttl = min(record.ttl for record in records)
+        self._mx_cache[domain] = (time.monotonic() + ttl, records)
+
+        return [record.host for record in records]
+
+    async def warm_up(self, domains: Iterable[str] = ()) -> None:
+        """Look up and cache the mail servers for domains before sending to them.
+
+        Mail servers can only be connected to once there is an email for them, so only the MX
+        lookups are done ahead of time.
+
+        Args:
+            domains: The recipient domains that will be sent to. Defaults to no domains
+
+        Examples:
+            >>> from message_sender.email.direct import AsyncDirectSMTPClient
+            >>>
+            >>> client = AsyncDirectSMTPClient(email_from="send_from@example.com")
+            >>> await client.warm_up(["gmail.com", "outlook.com"])
+        """
+
+        await asyncio.gather(*(self.mx_hosts(domain) for domain in set(domains)))
+
+    async def send_email(
+        self,
+        *,
+        message: str,
+        email_to: str,
+        subject: str,
+        html_content: str | None = None,
+    ) -> SendResult:
+        """Deliver the email directly to the recipient's mail server.
+
+        Args:
+            message: The message body. If not html_content is provided or the receiving client does
+                not support HTML this is used.
+            email_to: The email address where the email should be sent
+            subject: The subject of the email
+            html_content: The message body with HTML markup. Defaults to None
+
+        Returns:
+            The reply code, reply text, attempts, message size and timings of the delivery.
+
+        Examples:
+            >>> from message_sender.email.direct import AsyncDirectSMTPClient
+            >>>
+            >>> client = AsyncDirectSMTPClient(email_from="send_from@example.com")
+            >>> await client.send_email(
+            >>>     message="Your message body",
+            >>>     email_to="someone@email.com",
+            >>>     subject="Example",
+            >>>     html_content="<p>Your HTML message body</p>",
+            >>> )
+        """
+
+        email = Email(
+            message=message, email_to=email_to, subject=subject, html_content=html_content
+        )
+        (result,) = await self.send_many([email])
+        if result.error is not None:
+            raise result.error
+
+        return result.result
+
+    async def send_many(self, emails: Iterable[Email]) -> list[StreamResult[Email]]:
+        """Deliver many emails, grouped by recipient domain.
+
+        Args:
+            emails: The emails to send.
+
+        Returns:
+            A result for each email in the order the deliveries finished. Successful deliveries
+            have a `SendResult` and failed deliveries the error from the last attempt.
+
+        Examples:
+            >>> from message_sender.email.direct import AsyncDirectSMTPClient
+            >>> from message_sender.email.models import Email
+            >>>
+            >>> client = AsyncDirectSMTPClient(email_from="send_from@example.com")
+            >>> results = await client.send_many(
+            >>>     Email(message="Hello", email_to=email_to, subject="Example")
+            >>>     for email_to in recipients
+            >>> )
+        """
+
+        by_domain: dict[str, deque[_Delivery]] = {}
+        for email in emails:
+            domain = email.email_to.rpartition("@")[2].lower()
+            by_domain.setdefault(domain, deque()).append(_Delivery(email))
+
+        results: list[StreamResult[Email]] = []
+        domains = asyncio.Semaphore(self.max_domains)
+
+        async def deliver(domain: str, queue: deque[_Delivery]) -> None:
+            async with domains:
+                await self._deliver_domain(domain, queue, results)
+
+        await asyncio.gather(*(deliver(domain, queue) for domain, queue in by_domain.items()))
+
+        return results
+
+    async def _deliver_domain(
+        self, domain: str, queue: deque[_Delivery], results: list[StreamResult[Email]]
+    ) -> None:
+        try:
+            hosts = await self.mx_hosts(domain)
+        except Exception as e:
+            while queue:
+                results.append(StreamResult(queue.popleft().email, error=e))
+            return
+
+        connections = min(self.max_connections_per_domain, len(queue))
+        await asyncio.gather(
+            *(self._deliver_connection(hosts, queue, results) for _ in range(connections))
+        )
+
+    async def _open(self, hosts: list[str]) -> CachedAsyncSMTP | LocalAsyncSMTP:
+        error: Exception | None = None
+        for host in hosts:
+            smtp: CachedAsyncSMTP | LocalAsyncSMTP
+            if self._transport is not None:
+                smtp = self._transport.async_smtp()
+            else:
+                smtp = CachedAsyncSMTP(
+                    hostname=host,
+                    port=self.port,
+                    local_hostname=self.local_hostname,
+                    start_tls=None,
+                    tls_context=self.tls_context or shared_tls_context(),
+                )
+            try:
+                await smtp.connect()
+                return smtp
+            except (SMTPConnectError, SMTPConnectTimeoutError, SMTPResponseException) as e:
+                error = e
+
+        raise error or SMTPConnectError("No mail servers found")
+
+    async def _deliver_connection(
+        self, hosts: list[str], queue: deque[_Delivery], results: list[StreamResult[Email]]
+    ) -> None:
+        failures = 0
+        while queue:
+            try:
+                smtp = await self._open(hosts)
+            except Exception as e:
+                failures += 1
+                if failures >= self.max_attempts:
+                    while queue:
+                        results.append(StreamResult(queue.popleft().email, error=e))
+                    return
+                await asyncio.sleep(self.backoff * 2 ** (failures - 1))
+                continue
+
+            failures = 0
+            try:
+                await self._send_over(smtp, queue, results)
+            finally:
+                if smtp.is_connected:
+                    try:
+                        await smtp.quit()
+                    except Exception:
+                        smtp.close()
+
+    async def _send_over(
+        self,
+        smtp: CachedAsyncSMTP | LocalAsyncSMTP,
+        queue: deque[_Delivery],
+        results: list[StreamResult[Email]],
+    ) -> None:
+        for _ in range(self.messages_per_connection):
+            if not queue:
+                return
+
+            delivery = queue.popleft()
+            delivery.attempts += 1
+            result = SendResult(attempts=delivery.attempts)
+            try:
+                with result.phase("build"):
+                    msg = self._build_message(delivery.email)
+                with result.phase("send"):
+                    await smtp.send_message(msg)
+            except Exception as e:
+                if _is_temporary(e) and delivery.attempts < self.max_attempts:
+                    queue.append(delivery)
+                    await asyncio.sleep(self.backoff * 2 ** (delivery.attempts - 1))
+                else:
+                    results.append(StreamResult(delivery.email, error=e))
+
+                if not smtp.is_connected:
+                    return
+            else:
+                record_reply(result, smtp)
+                results.append(StreamResult(delivery.email, result=result))
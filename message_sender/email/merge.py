@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import csv
+import html
+import os
+import string
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, TextIO
+
+from message_sender.email.models import Email
+
+Recipients = (
+    Mapping[str, Sequence[Any]] | Iterable[Mapping[str, Any]] | str | os.PathLike[str] | TextIO
+)
+"""Recipient variables for a mail merge.
+
+- A mapping of column name to a sequence of values, for example `pyarrow.Table.to_pydict()` or a
+  dict of lists.
+- An iterable of mappings with one mapping per recipient, for example a list of dicts or a
+  database cursor returning dicts.
+- The path of a CSV file, or an open text file, with a header row naming the columns.
+"""
+
+
+class Template:
+    """A template compiled once into static text and the variables between it.
+
+    Variables are written as `{name}` and `{{` and `}}` produce literal braces, the same as
+    `str.format`, but only plain names are allowed so a template can't reach into attributes of
+    the values or format them.
+
+    Args:
+        source: The template text.
+        escape: HTML escape the values, for HTML bodies. Defaults to False
+
+    Examples:
+        >>> from message_sender.email.merge import Template
+        >>>
+        >>> Template("Hi {name}, your code is {code}").render({"name": "Ann", "code": "A1"})
+        'Hi Ann, your code is A1'
+    """
+
+    __slots__ = ("_head", "_segments", "escape", "fields", "source")
+
+    def __init__(self, source: str, escape: bool = False) -> None:
+        static: list[str] = []
+        variables: list[str] = []
+        text: list[str] = []
+        for literal, name, spec, conversion in string.Formatter().parse(source):
+            text.append(literal)
+            if name is None:
+                continue
+            if not name.isidentifier() or spec or conversion:
+                raise ValueError(f"Template variables must be plain names, got {{{name}}}")
+            static.append("".join(text))
+            variables.append(name)
+            text = []
+        static.append("".join(text))
+
+        self.source = source
+        self.escape = escape
+        self.fields = frozenset(variables)
+        self._head = static[0]
+        self._segments = tuple(zip(variables, static[1:], strict=True))
+
+    def __repr__(self) -> str:
+        return f"Template({self.source!r}, escape={self.escape!r})"
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Fill in the variables.
+
+        Args:
+            values: The value of each variable.
+        """
+
+        parts = [self._head]
+        for name, text in self._segments:
+            value = str(values[name])
+            parts.append(html.escape(value) if self.escape else value)
+            parts.append(text)
+
+        return "".join(parts)
+
+
+def iter_recipients(recipients: Recipients) -> Iterator[Mapping[str, Any]]:
+    """Read recipient variables one recipient at a time.
+
+    Args:
+        recipients: The recipient variables, see `Recipients`.
+
+    Examples:
+        >>> from message_sender.email.merge import iter_recipients
+        >>>
+        >>> list(iter_recipients({"email": ["a@example.com"], "name": ["Ann"]}))
+        [{'email': 'a@example.com', 'name': 'Ann'}]
+    """
+
+    if isinstance(recipients, (str, os.PathLike)):
+        with open(recipients, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f, restval="")
+    elif hasattr(recipients, "read"):
+        yield from csv.DictReader(recipients, restval="")  # type: ignore[arg-type]
+    elif isinstance(recipients, Mapping):
+        names = list(recipients)
+        for values in zip(*recipients.values(), strict=True):
+            yield dict(zip(names, values, strict=True))
+    else:
+        yield from recipients  # type: ignore[misc]
+
+
+class MailMerge:
+    """One email layout personalized for many recipients.
+
+    The templates are compiled once when the merge is created and each email is rendered only when
+    it is about to be sent, so a merge to any number of recipients keeps memory flat.
+
+    Args:
+        subject: The subject template.
+        message: The plain text body template.
+        html_content: The HTML body template, values are HTML escaped. Defaults to None
+        email_to: The column holding each recipient's email address. Defaults to "email"
+
+    Examples:
+        >>> from message_sender.email.merge import MailMerge
+        >>>
+        >>> merge = MailMerge(
+        >>>     subject="Your invoice, {name}",
+        >>>     message="Hi {name}, your invoice is at {link}",
+        >>>     html_content="<p>Hi {name}, your invoice is <a href='{link}'>here</a></p>",
+        >>> )
+        >>> for email in merge.emails("recipients.csv"):
+        >>>     print(email.email_to, email.subject)
+    """
+
+    def __init__(
+        self,
+        subject: str,
+        message: str,
+        html_content: str | None = None,
+        email_to: str = "email",
+    ) -> None:
+        self.subject = Template(subject)
+        self.message = Template(message)
+        self.html_content = Template(html_content, escape=True) if html_content else None
+        self.email_to = email_to
+        self.fields = (
+            self.subject.fields
+            | self.message.fields
+            | (self.html_content.fields if self.html_content else frozenset())
+            | {email_to}
+        )
+
+    def render(self, recipient: Mapping[str, Any]) -> Email:
+        """Render the email for one recipient.
+
+        Args:
+            recipient: The recipient's variables.
+        """
+
+        missing = self.fields.difference(recipient.keys())
+        if missing:
+            raise ValueError(f"Recipient is missing {', '.join(sorted(missing))}")
+
+        return Email(
+            message=self.message.render(recipient),
+            email_to=str(recipient[self.email_to]),
+            subject=self.subject.render(recipient),
+            html_content=self.html_content.render(recipient) if self.html_content else None,
+        )
+
+    def emails(self, recipients: Recipients) -> Iterator[Email]:
+        """Render an email for each recipient as it is requested.
+
+        Args:
+            recipients: The recipient variables, see `Recipients`.
+        """
+
+        for recipient in iter_recipients(recipients):
+            yield self.render(recipient)
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Email:
+    """An email waiting to be sent, the fields match the keyword arguments of `send_email`.
+
+    Args:
+        message: The message body. If not html_content is provided or the receiving client does
+            not support HTML this is used.
+        email_to: The email address where the email should be sent
+        subject: The subject of the email
+        html_content: The message body with HTML markup. Defaults to None
+    """
+
+    message: str
+    email_to: str
+    subject: str
+    html_content: str | None = None
@@ -1,15 +1,35 @@
 from __future__ import annotations
 
+import asyncio
 import smtplib
+import threading
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from contextlib import AsyncExitStack, ExitStack, nullcontext, suppress
 from email.message import EmailMessage
-from typing import Final
+from typing import TYPE_CHECKING, Final, Self
 
-from aiosmtplib import SMTP
+from aiosmtplib import SMTPException, SMTPServerDisconnected
+
+from message_sender._pacer import AsyncPacer, Pacer
+from message_sender.email.connection import CachedAsyncSMTP, CachedSMTP, shared_tls_context
+from message_sender.results import SendResult, record_reply
+from message_sender.streaming import StreamResult, stream_sends
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from message_sender.coordination import Coordinator
+    from message_sender.email.merge import MailMerge, Recipients
+    from message_sender.email.models import Email
+    from message_sender.limiter import AdaptiveLimiter
+    from message_sender.transports import LocalAsyncSMTP, LocalSMTP, LocalTransport
 
 
 class _ProtonEmailBase:
     _SMTP_SERVER: Final = "smtp.protonmail.ch"
     _SMTP_PORT: Final = 587
+    _PACER_BURST: Final = 5
 
     def __init__(
         self,
@@ -19,24 +39,187 @@ class _ProtonEmailBase:
         self.email_address = email_address
         self.smtp_token = smtp_token
 
+    def _build_message(
+        self, *, message: str, email_to: str, subject: str, html_content: str | None
+    ) -> EmailMessage:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.email_address
+        msg["To"] = email_to
+        msg.set_content(message)
+
+        if html_content:
+            msg.add_alternative(html_content, subtype="html")
+
+        return msg
+
 
 class AsyncProtonEmailClient(_ProtonEmailBase):
     """Async client for sending proton emails.
 
     For setup instructions see https://proton.me/support/smtp-submission
 
+    When used as a context manager one authenticated SMTP session is kept open and reused for
+    every email sent inside the block. If Proton drops the connection the session is
+    re-established automatically. Outside of a context manager each email opens its own
+    connection.
+
     Args:
         email_address: The email address used when setting up the Proton SMTP token
         smtp_token: The token generated by Proton when setting up SMTP
+        messages_per_second: The maximum rate emails are sent at so Proton's sending limits are
+            not hit. Set to None to disable pacing. Defaults to 1.0
+        limiter: Adaptive concurrency limiter shared by sends through this client. Defaults to None
+        transport: A `LocalTransport` to hand emails to instead of connecting to Proton, for load
+            testing or dry runs. Defaults to None
+        coordinator: Shares a rate limit, deduplication and a circuit breaker for the server
+            with every sender using the same backend, see `Coordinator`. Defaults to None
     """
 
     def __init__(
         self,
         email_address: str,
         smtp_token: str,
+        messages_per_second: float | None = 1.0,
+        limiter: AdaptiveLimiter | None = None,
+        transport: LocalTransport | None = None,
+        coordinator: Coordinator | None = None,
     ) -> None:
+        self._limiter = limiter
+        self._transport = transport
+        self._coordinator = coordinator
+        self._pacer = (
+            AsyncPacer(messages_per_second, burst=self._PACER_BURST)
+            if messages_per_second
+            else None
+        )
+        self._smtp: CachedAsyncSMTP | LocalAsyncSMTP | None = None
+        self._session_lock = asyncio.Lock()
+        self._session = False
+        self._last_used = 0.0
+
         super().__init__(email_address=email_address, smtp_token=smtp_token)
 
+    async def __aenter__(self) -> Self:
+        await self.warm_up()
+        return self
+
+    async def __aexit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes the SMTP session.
+
+        This is only needed if you opened a session without using a context manager.
+
+        Examples:
+            >>> from message_sender.email.proton import AsyncProtonEmailClient
+            >>>
+            >>> client = AsyncProtonEmailClient(
+            >>>     email_address="smtp_setup_email@proton.me", smtp_token="your-token"
+            >>> )
+            >>> await client.close()
+        """
+
+        async with self._session_lock:
+            self._session = False
+            if self._smtp is None:
+                return
+
+            smtp, self._smtp = self._smtp, None
+            try:
+                await smtp.quit()
+            except SMTPException:
+                smtp.close()
+
+    async def warm_up(self) -> None:
+        """Open and authenticate the SMTP session before the first email.
+
+        The connection, STARTTLS and login happen here so bad credentials fail before any traffic
+        and the first email goes over the open session. The session stays open until `close` is
+        called, the same as entering the client as a context manager.
+
+        Examples:
+            >>> from message_sender.email.proton import AsyncProtonEmailClient
+            >>>
+            >>> client = AsyncProtonEmailClient(
+            >>>     email_address="smtp_setup_email@proton.me", smtp_token="your-token"
+            >>> )
+            >>> await client.warm_up()
+        """
+
+        async with self._session_lock:
+            if self._smtp is None or not self._smtp.is_connected:
+                await self._connect()
+            self._session = True
+            self._last_used = time.monotonic()
+
+    async def maintain(self, idle_timeout: float | None = None) -> None:
+        """Keep the open session healthy, for calling periodically from a background task such as
+        `AsyncConnectionMaintainer`.
+
+        A session with no emails sent for longer than `idle_timeout` is closed and reopened by the
+        next email. Otherwise the server is sent a NOOP so it doesn't time the session out, and the
+        session is reconnected if it was already dropped. Nothing is done outside of a session.
+
+        Args:
+            idle_timeout: Seconds without an email before the session is closed. Defaults to None
+        """
+
+        if not self._session:
+            return
+
+        async with self._session_lock:
+            smtp = self._smtp
+            if idle_timeout is not None and time.monotonic() - self._last_used >= idle_timeout:
+                if smtp is not None:
+                    self._smtp = None
+                    try:
+                        await smtp.quit()
+                    except SMTPException:
+                        smtp.close()
+                return
+
+            if smtp is not None and smtp.is_connected:
+                try:
+                    await smtp.noop()
+                    return
+                except SMTPException:
+                    pass
+
+            # If reconnecting fails the next email tries again and raises the error.
+            with suppress(SMTPException, OSError):
+                await self._connect()
+
+    def _new_smtp(self) -> CachedAsyncSMTP | LocalAsyncSMTP:
+        if self._transport is not None:
+            return self._transport.async_smtp()
+
+        return CachedAsyncSMTP(
+            hostname=self._SMTP_SERVER,
+            port=self._SMTP_PORT,
+            username=self.email_address,
+            password=self.smtp_token,
+            start_tls=True,
+            tls_context=shared_tls_context(),
+        )
+
+    async def _connect(self) -> CachedAsyncSMTP | LocalAsyncSMTP:
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+
+        smtp = self._new_smtp()
+        await smtp.connect()
+        self._smtp = smtp
+
+        return smtp
+
     async def send_email(
         self,
         *,
@@ -44,7 +227,8 @@ class AsyncProtonEmailClient(_ProtonEmailBase):
         email_to: str,
         subject: str,
         html_content: str | None = None,
-    ) -> None:
+        dedup_key: str | None = None,
+    ) -> SendResult:
         """Send the email through Proton.
 
         Args:
@@ -53,6 +237,12 @@ class AsyncProtonEmailClient(_ProtonEmailBase):
             email_to: The email address where the email should be sent
             subject: The subject of the email
             html_content: The message body with HTML markup. Defaults to None
+            dedup_key: Identifies the email so it is sent once across every sender sharing the
+                client's coordinator, later sends with the same key are skipped and return a
+                result with 0 attempts. Ignored without a coordinator. Defaults to None
+
+        Returns:
+            The reply code, reply text, attempts, message size and timings of the send.
 
         Examples:
             >>> from message_sender.email.proton import AsyncProtonEmailClient
@@ -68,23 +258,132 @@ class AsyncProtonEmailClient(_ProtonEmailBase):
             >>> )
         """
 
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = self.email_address
-        msg["To"] = email_to
-        msg.set_content(message)
+        result = SendResult()
+        with result.phase("build"):
+            msg = self._build_message(
+                message=message, email_to=email_to, subject=subject, html_content=html_content
+            )
 
-        if html_content:
-            msg.add_alternative(html_content, subtype="html")
+        coordinator = self._coordinator
+        if coordinator is None:
+            return await self._send(result, msg)
 
-        async with SMTP(
-            hostname=self._SMTP_SERVER,
-            port=self._SMTP_PORT,
-            username=self.email_address,
-            password=self.smtp_token,
-            start_tls=True,
-        ) as smtp:
-            await smtp.send_message(msg)
+        key = f"{self._SMTP_SERVER}:{self._SMTP_PORT}:{self.email_address}"
+        with result.phase("wait"):
+            if not await coordinator.begin(key, dedup_key):
+                result.attempts = 0
+                return result
+
+        try:
+            return await self._send(result, msg, key)
+        except Exception as error:
+            await coordinator.failed(key, dedup_key, error)
+            raise
+
+    async def _send(
+        self, result: SendResult, msg: EmailMessage, key: str | None = None
+    ) -> SendResult:
+        start = time.perf_counter()
+        if self._coordinator is not None and key is not None:
+            await self._coordinator.acquire(key)
+        if self._pacer:
+            await self._pacer.wait()
+
+        async with self._limiter.acquire() if self._limiter else nullcontext():
+            if not self._session:
+                result.add("wait", time.perf_counter() - start)
+                async with AsyncExitStack() as stack:
+                    with result.phase("connect"):
+                        smtp = await stack.enter_async_context(self._new_smtp())
+                    with result.phase("send"):
+                        await smtp.send_message(msg)
+                    record_reply(result, smtp)
+                return result
+
+            async with self._session_lock:
+                result.add("wait", time.perf_counter() - start)
+                smtp = self._smtp
+                if smtp is None or not smtp.is_connected:
+                    with result.phase("connect"):
+                        smtp = await self._connect()
+
+                try:
+                    with result.phase("send"):
+                        await smtp.send_message(msg)
+                except SMTPServerDisconnected:
+                    result.attempts += 1
+                    with result.phase("connect"):
+                        smtp = await self._connect()
+                    with result.phase("send"):
+                        await smtp.send_message(msg)
+                record_reply(result, smtp)
+                self._last_used = time.monotonic()
+
+        return result
+
+    def send_stream(
+        self, emails: AsyncIterable[Email] | Iterable[Email], max_in_flight: int = 10
+    ) -> AsyncIterator[StreamResult[Email]]:
+        """Send every email from a source through Proton.
+
+        Emails are only read from the source as sends finish so memory stays flat for any size of
+        source. Results are yielded in the order the sends complete and failed sends are yielded
+        with their error instead of stopping the stream.
+
+        Args:
+            emails: An iterable or async iterable of emails to send
+            max_in_flight: The maximum number of sends running at once. Defaults to 10
+
+        Examples:
+            >>> from message_sender.email.proton import AsyncProtonEmailClient
+            >>>
+            >>> client = AsyncProtonEmailClient(
+            >>>     email_address="smtp_setup_email@proton.me", smtp_token="your-token"
+            >>> )
+            >>> async for result in client.send_stream(read_emails()):
+            >>>     if not result.ok:
+            >>>         print(result.item.email_to, result.error)
+        """
+
+        return stream_sends(emails, self._send_queued, max_in_flight=max_in_flight)
+
+    def send_merge(
+        self, merge: MailMerge, recipients: Recipients, max_in_flight: int = 10
+    ) -> AsyncIterator[StreamResult[Email]]:
+        """Send a mail merge, one personalized email to each recipient through Proton.
+
+        Each email is rendered from the merge's precompiled templates only when a send slot is
+        free, so memory stays flat for any number of recipients. Results are yielded in the order
+        the sends complete with the rendered `Email` as the item.
+
+        Args:
+            merge: The templates to render
+            recipients: The variables for each recipient, a mapping of columns, an iterable of
+                mappings or a CSV file
+            max_in_flight: The maximum number of sends running at once. Defaults to 10
+
+        Examples:
+            >>> from message_sender.email.merge import MailMerge
+            >>> from message_sender.email.proton import AsyncProtonEmailClient
+            >>>
+            >>> merge = MailMerge(subject="Hi {name}", message="Your link is {link}")
+            >>> async with AsyncProtonEmailClient(
+            >>>     email_address="smtp_setup_email@proton.me", smtp_token="your-token"
+            >>> ) as client:
+            >>>     async for result in client.send_merge(merge, "recipients.csv"):
+            >>>         if not result.ok:
+            >>>             print(result.item.email_to, result.error)
+        """
+
+        return self.send_stream(merge.emails(recipients), max_in_flight=max_in_flight)
+
+    async def _send_queued(self, email: Email) -> SendResult:
+        return await self.send_email(
+            message=email.message,
+            email_to=email.email_to,
+            subject=email.subject,
+            html_content=email.html_content,
+        )
 
 
 class ProtonEmailClient(_ProtonEmailBase):
@@ -92,18 +391,159 @@ class ProtonEmailClient(_ProtonEmailBase):
 
     For setup instructions see https://proton.me/support/smtp-submission
 
+    When used as a context manager one authenticated SMTP session is kept open and reused for
+    every email sent inside the block. If Proton drops the connection the session is
+    re-established automatically. Outside of a context manager each email opens its own
+    connection.
+
     Args:
         email_address: The email address used when setting up the Proton SMTP token
         smtp_token: The token generated by Proton when setting up SMTP
+        messages_per_second: The maximum rate emails are sent at so Proton's sending limits are
+            not hit. Set to None to disable pacing. Defaults to 1.0
+        transport: A `LocalTransport` to hand emails to instead of connecting to Proton, for load
+            testing or dry runs. Defaults to None
     """
 
     def __init__(
         self,
         email_address: str,
         smtp_token: str,
+        messages_per_second: float | None = 1.0,
+        transport: LocalTransport | None = None,
     ) -> None:
+        self._transport = transport
+        self._pacer = (
+            Pacer(messages_per_second, burst=self._PACER_BURST) if messages_per_second else None
+        )
+        self._smtp: CachedSMTP | LocalSMTP | None = None
+        self._session_lock = threading.Lock()
+        self._session = False
+        self._last_used = 0.0
+
         super().__init__(email_address=email_address, smtp_token=smtp_token)
 
+    def __enter__(self) -> Self:
+        self.warm_up()
+        return self
+
+    def __exit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the SMTP session.
+
+        This is only needed if you opened a session without using a context manager.
+
+        Examples:
+            >>> from message_sender.email.proton import ProtonEmailClient
+            >>>
+            >>> client = ProtonEmailClient(
+            >>>     email_address="smtp_setup_email@proton.me", smtp_token="your-token"
+            >>> )
+            >>> client.close()
+        """
+
+        with self._session_lock:
+            self._session = False
+            if self._smtp is None:
+                return
+
+            smtp, self._smtp = self._smtp, None
+            try:
+                smtp.quit()
+            except smtplib.SMTPException:
+                smtp.close()
+
+    def warm_up(self) -> None:
+        """Open and authenticate the SMTP session before the first email.
+
+        The connection, STARTTLS and login happen here so bad credentials fail before any traffic
+        and the first email goes over the open session. The session stays open until `close` is
+        called, the same as entering the client as a context manager.
+
+        Examples:
+            >>> from message_sender.email.proton import ProtonEmailClient
+            >>>
+            >>> client = ProtonEmailClient(
+            >>>     email_address="smtp_setup_email@proton.me", smtp_token="your-token"
+            >>> )
+            >>> client.warm_up()
+        """
+
+        with self._session_lock:
+            if self._smtp is None:
+                self._connect()
+            self._session = True
+            self._last_used = time.monotonic()
+
+    def maintain(self, idle_timeout: float | None = None) -> None:
+        """Keep the open session healthy, for calling periodically from a background thread such
+        as `ConnectionMaintainer`.
+
+        A session with no emails sent for longer than `idle_timeout` is closed and reopened by the
+        next email. Otherwise the server is sent a NOOP so it doesn't time the session out, and the
+        session is reconnected if it was already dropped. Nothing is done outside of a session.
+
+        Args:
+            idle_timeout: Seconds without an email before the session is closed. Defaults to None
+        """
+
+        if not self._session:
+            return
+
+        with self._session_lock:
+            smtp = self._smtp
+            if idle_timeout is not None and time.monotonic() - self._last_used >= idle_timeout:
+                if smtp is not None:
+                    self._smtp = None
+                    try:
+                        smtp.quit()
+                    except smtplib.SMTPException:
+                        smtp.close()
+                return
+
+            if smtp is not None:
+                try:
+                    smtp.noop()
+                    return
+                except (smtplib.SMTPException, OSError):
+                    pass
+
+            # If reconnecting fails the next email tries again and raises the error.
+            with suppress(smtplib.SMTPException, OSError):
+                self._connect()
+
+    def _login(self, smtp: CachedSMTP | LocalSMTP) -> None:
+        smtp.starttls(context=shared_tls_context())
+        smtp.login(self.email_address, self.smtp_token)
+
+    def _new_smtp(self) -> CachedSMTP | LocalSMTP:
+        if self._transport is not None:
+            return self._transport.smtp()
+
+        return CachedSMTP(self._SMTP_SERVER, self._SMTP_PORT)
+
+    def _connect(self) -> CachedSMTP | LocalSMTP:
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+
+        smtp = self._new_smtp()
+        try:
+            self._login(smtp)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+        return smtp
+
     def send_email(
         self,
         *,
@@ -111,7 +551,7 @@ class ProtonEmailClient(_ProtonEmailBase):
         email_to: str,
         subject: str,
         html_content: str | None = None,
-    ) -> None:
+    ) -> SendResult:
         """Send the email through Proton.
 
         Args:
@@ -121,6 +561,9 @@ class ProtonEmailClient(_ProtonEmailBase):
             subject: The subject of the email
             html_content: The message body with HTML markup. Defaults to None
 
+        Returns:
+            The reply code, reply text, attempts, message size and timings of the send.
+
         Examples:
             >>> from message_sender.email.proton import ProtonEmailClient
             >>>
@@ -135,16 +578,84 @@ class ProtonEmailClient(_ProtonEmailBase):
             >>> )
         """
 
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = self.email_address
-        msg["To"] = email_to
-        msg.set_content(message)
+        result = SendResult()
+        with result.phase("build"):
+            msg = self._build_message(
+                message=message, email_to=email_to, subject=subject, html_content=html_content
+            )
 
-        if html_content:
-            msg.add_alternative(html_content, subtype="html")
+        if self._pacer:
+            with result.phase("wait"):
+                self._pacer.wait()
+
+        if not self._session:
+            with ExitStack() as stack:
+                with result.phase("connect"):
+                    smtp = stack.enter_context(self._new_smtp())
+                    self._login(smtp)
+                with result.phase("send"):
+                    smtp.send_message(msg)
+                record_reply(result, smtp)
+            return result
+
+        with result.phase("wait"):
+            self._session_lock.acquire()
+        try:
+            smtp = self._smtp
+            if smtp is None:
+                with result.phase("connect"):
+                    smtp = self._connect()
+            try:
+                with result.phase("send"):
+                    smtp.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                result.attempts += 1
+                with result.phase("connect"):
+                    smtp = self._connect()
+                with result.phase("send"):
+                    smtp.send_message(msg)
+            record_reply(result, smtp)
+            self._last_used = time.monotonic()
+        finally:
+            self._session_lock.release()
+
+        return result
+
+    def send_merge(self, merge: MailMerge, recipients: Recipients) -> Iterator[StreamResult[Email]]:
+        """Send a mail merge, one personalized email to each recipient through Proton.
+
+        Each email is rendered from the merge's precompiled templates only when it is sent, so
+        memory stays flat for any number of recipients. Failed sends are yielded with their error
+        instead of stopping the merge. Use the client as a
+        context manager so every email goes over one session.
+
+        Args:
+            merge: The templates to render
+            recipients: The variables for each recipient, a mapping of columns, an iterable of
+                mappings or a CSV file
+
+        Examples:
+            >>> from message_sender.email.merge import MailMerge
+            >>> from message_sender.email.proton import ProtonEmailClient
+            >>>
+            >>> merge = MailMerge(subject="Hi {name}", message="Your link is {link}")
+            >>> client = ProtonEmailClient(
+            >>>     email_address="smtp_setup_email@proton.me", smtp_token="your-token"
+            >>> )
+            >>> for result in client.send_merge(merge, "recipients.csv"):
+            >>>     if not result.ok:
+            >>>         print(result.item.email_to, result.error)
+        """
 
-        with smtplib.SMTP(self._SMTP_SERVER, self._SMTP_PORT) as smtp:
-            smtp.starttls()
-            smtp.login(self.email_address, self.smtp_token)
-            smtp.send_message(msg)
+        for email in merge.emails(recipients):
+            try:
+                result = self.send_email(
+                    message=email.message,
+                    email_to=email.email_to,
+                    subject=email.subject,
+                    html_content=email.html_content,
+                )
+            except Exception as e:
+                yield StreamResult(email, error=e)
+            else:
+                yield StreamResult(email, result=result)
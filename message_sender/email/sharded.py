@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+from collections.abc import Callable, Iterable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, Final, Self
+
+from message_sender.email.smtp import AsyncSMTPClient
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+    from types import TracebackType
+
+    from message_sender.email.models import Email
+
+_STOP: Final = None
+
+
+@dataclass(slots=True)
+class WorkerStats:
+    """Totals reported by one worker process.
+
+    Args:
+        pid: The process id of the worker.
+        sent: The number of emails sent.
+        failed: The number of emails that failed to send.
+        elapsed: The number of seconds the worker spent sending.
+        failures: The sequence number and error for each email that failed to send.
+    """
+
+    pid: int
+    sent: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    failures: list[tuple[int, str]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ShardedSendReport:
+    """The combined results from all worker processes.
+
+    Args:
+        sent: The number of emails sent.
+        failed: The number of emails that failed to send.
+        elapsed: The number of seconds from starting the workers to the last one finishing.
+        failures: The sequence number and error for each email that failed to send. Sequence numbers
+            count up from 0 in the order the emails were submitted.
+        workers: The totals reported by each worker process.
+    """
+
+    sent: int
+    failed: int
+    elapsed: float
+    failures: list[tuple[int, str]]
+    workers: list[WorkerStats]
+
+    @property
+    def emails_per_second(self) -> float:
+        """The overall send rate."""
+
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+
+class ShardedSMTPSender:
+    """Spreads sending a large number of emails over multiple processes.
+
+    Building MIME messages and TLS encryption are CPU bound, so one event loop can only use one
+    core. Each worker process runs its own event loop with `connections_per_process`
+    `AsyncSMTPClient` sessions and takes batches of emails from a shared queue, so throughput
+    scales with the number of cores. The queue is bounded and `submit` blocks when the workers fall
+    behind.
+
+    Args:
+        smtp_server: The SMTP server for the email provider
+        smtp_port: The SMTP port for the email provider. Port 465 uses implicit TLS,
+            other ports use STARTTLS.
+        email_from: The email address for sending emails
+        user_name: The user name to use for sending SMTP emails. Defaults to None
+        password: The password to use for sending SMTP emails. Defaults to None
+        processes: The number of worker processes. Defaults to the number of CPUs
+        connections_per_process: The number of SMTP sessions each worker keeps open. Defaults to 4
+        batch_size: The number of emails handed to a worker at a time. Defaults to 100
+        client_factory: A picklable callable returning the async client each session uses. Defaults
+            to an `AsyncSMTPClient` built from the settings above
+        start_method: The multiprocessing start method. Defaults to the platform default
+
+    Examples:
+        >>> from message_sender.email.models import Email
+        >>> from message_sender.email.sharded import ShardedSMTPSender
+        >>>
+        >>> sender = ShardedSMTPSender(
+        >>>     smtp_server="smtp.server.com",
+        >>>     smtp_port=587,
+        >>>     email_from="send_from@email.com",
+        >>>     user_name="smtp_user",
+        >>>     password="smtp_password",
+        >>> )
+        >>> report = sender.send_many(
+        >>>     Email(message="Hello", email_to=email_to, subject="Example") for email_to in recipients
+        >>> )
+        >>> print(report.sent, report.failed)
+    """
+
+    def __init__(
+        self,
+        smtp_server: str,
+        smtp_port: int,
+        email_from: str,
+        user_name: str | None = None,
+        password: str | None = None,
+        processes: int | None = None,
+        connections_per_process: int = 4,
+        batch_size: int = 100,
+        client_factory: Callable[[], Any] | None = None,
+        start_method: str | None = None,
+    ) -> None:
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be at least 1")
+        if connections_per_process < 1:
+            raise ValueError("connections_per_process must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.processes = processes or os.cpu_count() or 1
+        self.connections_per_process = connections_per_process
+        self.batch_size = batch_size
+        self.client_factory = client_factory or partial(
+            AsyncSMTPClient,
+            smtp_server=smtp_server,
+            smtp_port=smtp_port,
+            email_from=email_from,
+            user_name=user_name,
+            password=password,
+        )
+        self.report: ShardedSendReport | None = None
+
+        self._context = multiprocessing.get_context(start_method)
+        self._workers: list[BaseProcess] = []
+        self._tasks: Any = None
+        self._results: Any = None
+        self._batch: list[tuple[int, Email]] = []
+        self._sequence = 0
+        self._started_at = 0.0
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start the worker processes.
+
+        This is only needed if you don't use a context manager or `send_many`.
+        """
+
+        if self._workers:
+            return
+
+        self.report = None
+        self._batch = []
+        self._sequence = 0
+        self._tasks = self._context.Queue(maxsize=self.processes * 2)
+        self._results = self._context.Queue()
+        self._started_at = time.perf_counter()
+        self._workers = [
+            self._context.Process(
+                target=_run_worker,
+                args=(
+                    self.client_factory,
+                    self.connections_per_process,
+                    self._tasks,
+                    self._results,
+                ),
+                daemon=True,
+            )
+            for _ in range(self.processes)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, email: Email) -> int:
+        """Queue an email to be sent by one of the workers.
+
+        Blocks while the queue is full.
+
+        Args:
+            email: The email to send.
+
+        Returns:
+            The sequence number of the email, used to match it with failures in the report.
+        """
+
+        if not self._workers:
+            raise RuntimeError("The sender is not running")
+
+        sequence = self._sequence
+        self._sequence += 1
+        self._batch.append((sequence, email))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+        return sequence
+
+    def close(self) -> ShardedSendReport:
+        """Wait for every queued email to be sent, then stop the workers.
+
+        This is only needed if you don't use a context manager or `send_many`.
+
+        Returns:
+            The combined results from all the workers.
+        """
+
+        if not self._workers:
+            if self.report is None:
+                raise RuntimeError("The sender was never started")
+            return self.report
+
+        self._flush()
+        for _ in self._workers:
+            self._tasks.put(_STOP)
+
+        stats: list[WorkerStats] = []
+        while len(stats) < len(self._workers):
+            try:
+                stats.append(self._results.get(timeout=0.1))
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in self._workers) and self._results.empty():
+                    break
+
+        for worker in self._workers:
+            worker.join()
+        elapsed = time.perf_counter() - self._started_at
+        lost = len(self._workers) - len(stats)
+        self._workers = []
+
+        failures = sorted(failure for worker_stats in stats for failure in worker_stats.failures)
+        self.report = ShardedSendReport(
+            sent=sum(worker_stats.sent for worker_stats in stats),
+            failed=sum(worker_stats.failed for worker_stats in stats),
+            elapsed=elapsed,
+            failures=failures,
+            workers=stats,
+        )
+        if lost:
+            raise RuntimeError(f"{lost} worker process(es) exited without reporting results")
+
+        return self.report
+
+    def send_many(self, emails: Iterable[Email]) -> ShardedSendReport:
+        """Send all the emails and wait for them to finish.
+
+        Args:
+            emails: The emails to send. This can be a generator so the emails don't all have to be
+                held in memory.
+
+        Returns:
+            The combined results from all the workers.
+        """
+
+        self.start()
+        try:
+            for email in emails:
+                self.submit(email)
+        finally:
+            report = self.close()
+
+        return report
+
+    def _flush(self) -> None:
+        if self._batch:
+            self._tasks.put(self._batch)
+            self._batch = []
+
+
+def _run_worker(
+    client_factory: Callable[[], Any], connections: int, tasks: Any, results: Any
+) -> None:
+    results.put(asyncio.run(_work(client_factory, connections, tasks)))
+
+
+async def _work(client_factory: Callable[[], Any], connections: int, tasks: Any) -> WorkerStats:
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Queue[tuple[int, Email] | None] = asyncio.Queue(maxsize=connections * 2)
+    stats = WorkerStats(pid=os.getpid())
+    start = time.perf_counter()
+
+    async def read() -> None:
+        while True:
+            batch = await loop.run_in_executor(None, tasks.get)
+            if batch is _STOP:
+                for _ in range(connections):
+                    await pending.put(_STOP)
+                return
+
+            for item in batch:
+                await pending.put(item)
+
+    async def send() -> None:
+        async with AsyncExitStack() as stack:
+            client: Any = None
+            connect_error: Exception | None = None
+            try:
+                client = await stack.enter_async_context(client_factory())
+            except Exception as e:
+                # Keep draining the queue so the reader never blocks, failing what this session
+                # would have sent.
+                connect_error = e
+
+            while (item := await pending.get()) is not _STOP:
+                sequence, email = item
+                try:
+                    if connect_error is not None:
+                        raise connect_error
+                    await client.send_email(
+                        message=email.message,
+                        email_to=email.email_to,
+                        subject=email.subject,
+                        html_content=email.html_content,
+                    )
+                except Exception as e:
+                    stats.failed += 1
+                    stats.failures.append((sequence, repr(e)))
+                else:
+                    stats.sent += 1
+
+    await asyncio.gather(read(), *(send() for _ in range(connections)))
+    stats.elapsed = time.perf_counter() - start
+
+    return stats
@@ -1,9 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import smtplib
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from contextlib import AsyncExitStack, ExitStack, nullcontext, suppress
 from email.message import EmailMessage
+from typing import TYPE_CHECKING, Self
 
-from aiosmtplib import SMTP
+from aiosmtplib import SMTPException, SMTPServerDisconnected
+
+from message_sender.email.connection import (
+    CachedAsyncSMTP,
+    CachedSMTP,
+    CachedSMTPSSL,
+    shared_tls_context,
+)
+from message_sender.results import SendResult, record_reply
+from message_sender.streaming import StreamResult, stream_sends
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from message_sender.coordination import Coordinator
+    from message_sender.email.merge import MailMerge, Recipients
+    from message_sender.email.models import Email
+    from message_sender.limiter import AdaptiveLimiter
+    from message_sender.transports import LocalAsyncSMTP, LocalSMTP, LocalTransport
 
 
 class _SMTPBase:
@@ -28,10 +51,28 @@ class _SMTPBase:
         """
         return self.smtp_port == 465
 
+    def _build_message(
+        self, *, message: str, email_to: str, subject: str, html_content: str | None
+    ) -> EmailMessage:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.email_from
+        msg["To"] = email_to
+        msg.set_content(message)
+
+        if html_content:
+            msg.add_alternative(html_content, subtype="html")
+
+        return msg
+
 
 class AsyncSMTPClient(_SMTPBase):
     """Async client for sending SMTP emails.
 
+    When used as a context manager one authenticated SMTP session is kept open and reused for
+    every email sent inside the block, reconnecting automatically if the server drops it. Outside
+    of a context manager each email opens its own connection.
+
     Args:
         smtp_server: The SMTP server for the email provider
         smtp_port: The SMTP port for the email provider. Port 465 uses implicit TLS,
@@ -39,6 +80,11 @@ class AsyncSMTPClient(_SMTPBase):
         email_from: The email address for sending emails
         user_name: The user name to use for sending SMTP emails. Defaults to None
         password: The password to use for sending SMTP emails. Defaults to None
+        limiter: Adaptive concurrency limiter shared by sends through this client. Defaults to None
+        transport: A `LocalTransport` to hand emails to instead of connecting to the server, for
+            load testing or dry runs. Defaults to None
+        coordinator: Shares a rate limit, deduplication and a circuit breaker for the server
+            with every sender using the same backend, see `Coordinator`. Defaults to None
     """
 
     def __init__(
@@ -48,7 +94,18 @@ class AsyncSMTPClient(_SMTPBase):
         email_from: str,
         user_name: str | None = None,
         password: str | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        transport: LocalTransport | None = None,
+        coordinator: Coordinator | None = None,
     ) -> None:
+        self._limiter = limiter
+        self._transport = transport
+        self._coordinator = coordinator
+        self._smtp: CachedAsyncSMTP | LocalAsyncSMTP | None = None
+        self._session_lock = asyncio.Lock()
+        self._session = False
+        self._last_used = 0.0
+
         super().__init__(
             smtp_server=smtp_server,
             smtp_port=smtp_port,
@@ -57,6 +114,131 @@ class AsyncSMTPClient(_SMTPBase):
             password=password,
         )
 
+    async def __aenter__(self) -> Self:
+        await self.warm_up()
+        return self
+
+    async def __aexit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes the SMTP session.
+
+        This is only needed if you opened a session without using a context manager.
+
+        Examples:
+            >>> from message_sender.email.smtp import AsyncSMTPClient
+            >>>
+            >>> client = AsyncSMTPClient(
+            >>>     smtp_server="smtp.server.com", smtp_port=587, email_from="send_from@email.com"
+            >>> )
+            >>> await client.close()
+        """
+
+        async with self._session_lock:
+            self._session = False
+            if self._smtp is None:
+                return
+
+            smtp, self._smtp = self._smtp, None
+            try:
+                await smtp.quit()
+            except SMTPException:
+                smtp.close()
+
+    async def warm_up(self) -> None:
+        """Open and authenticate the SMTP session before the first email.
+
+        The connection, STARTTLS and login happen here so bad credentials fail before any traffic
+        and the first email goes over the open session. The session stays open until `close` is
+        called, the same as entering the client as a context manager.
+
+        Examples:
+            >>> from message_sender.email.smtp import AsyncSMTPClient
+            >>>
+            >>> client = AsyncSMTPClient(
+            >>>     smtp_server="smtp.server.com",
+            >>>     smtp_port=587,
+            >>>     email_from="send_from@email.com",
+            >>>     user_name="smtp_user",
+            >>>     password="smtp_password",
+            >>> )
+            >>> await client.warm_up()
+        """
+
+        async with self._session_lock:
+            if self._smtp is None or not self._smtp.is_connected:
+                await self._connect()
+            self._session = True
+            self._last_used = time.monotonic()
+
+    async def maintain(self, idle_timeout: float | None = None) -> None:
+        """Keep the open session healthy, for calling periodically from a background task such as
+        `AsyncConnectionMaintainer`.
+
+        A session with no emails sent for longer than `idle_timeout` is closed and reopened by the
+        next email. Otherwise the server is sent a NOOP so it doesn't time the session out, and the
+        session is reconnected if it was already dropped. Nothing is done outside of a session.
+
+        Args:
+            idle_timeout: Seconds without an email before the session is closed. Defaults to None
+        """
+
+        if not self._session:
+            return
+
+        async with self._session_lock:
+            smtp = self._smtp
+            if idle_timeout is not None and time.monotonic() - self._last_used >= idle_timeout:
+                if smtp is not None:
+                    self._smtp = None
+                    try:
+                        await smtp.quit()
+                    except SMTPException:
+                        smtp.close()
+                return
+
+            if smtp is not None and smtp.is_connected:
+                try:
+                    await smtp.noop()
+                    return
+                except SMTPException:
+                    pass
+
+            # If reconnecting fails the next email tries again and raises the error.
+            with suppress(SMTPException, OSError):
+                await self._connect()
+
+    def _new_smtp(self) -> CachedAsyncSMTP | LocalAsyncSMTP:
+        if self._transport is not None:
+            return self._transport.async_smtp()
+
+        return CachedAsyncSMTP(
+            hostname=self.smtp_server,
+            port=self.smtp_port,
+            username=self.user_name,
+            password=self.password,
+            use_tls=self._use_implicit_tls(),
+            start_tls=not self._use_implicit_tls(),
+            tls_context=shared_tls_context(),
+        )
+
+    async def _connect(self) -> CachedAsyncSMTP | LocalAsyncSMTP:
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+
+        smtp = self._new_smtp()
+        await smtp.connect()
+        self._smtp = smtp
+
+        return smtp
+
     async def send_email(
         self,
         *,
@@ -64,7 +246,8 @@ class AsyncSMTPClient(_SMTPBase):
         email_to: str,
         subject: str,
         html_content: str | None = None,
-    ) -> None:
+        dedup_key: str | None = None,
+    ) -> SendResult:
         """Send the email through the SMTP server.
 
         Args:
@@ -73,6 +256,12 @@ class AsyncSMTPClient(_SMTPBase):
             email_to: The email address where the email should be sent
             subject: The subject of the email
             html_content: The message body with HTML markup. Defaults to None
+            dedup_key: Identifies the email so it is sent once across every sender sharing the
+                client's coordinator, later sends with the same key are skipped and return a
+                result with 0 attempts. Ignored without a coordinator. Defaults to None
+
+        Returns:
+            The reply code, reply text, attempts, message size and timings of the send.
 
         Examples:
             >>> from message_sender.email.smtp import AsyncSMTPClient
@@ -92,24 +281,133 @@ class AsyncSMTPClient(_SMTPBase):
             >>> )
         """
 
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = self.email_from
-        msg["To"] = email_to
-        msg.set_content(message)
+        result = SendResult()
+        with result.phase("build"):
+            msg = self._build_message(
+                message=message, email_to=email_to, subject=subject, html_content=html_content
+            )
 
-        if html_content:
-            msg.add_alternative(html_content, subtype="html")
+        coordinator = self._coordinator
+        if coordinator is None:
+            return await self._send(result, msg)
 
-        async with SMTP(
-            hostname=self.smtp_server,
-            port=self.smtp_port,
-            username=self.user_name,
-            password=self.password,
-            use_tls=self._use_implicit_tls(),
-            start_tls=not self._use_implicit_tls(),
-        ) as smtp:
-            await smtp.send_message(msg)
+        key = f"{self.smtp_server}:{self.smtp_port}:{self.user_name}"
+        with result.phase("wait"):
+            if not await coordinator.begin(key, dedup_key):
+                result.attempts = 0
+                return result
+
+        try:
+            return await self._send(result, msg, key)
+        except Exception as error:
+            await coordinator.failed(key, dedup_key, error)
+            raise
+
+    async def _send(
+        self, result: SendResult, msg: EmailMessage, key: str | None = None
+    ) -> SendResult:
+        start = time.perf_counter()
+        if self._coordinator is not None and key is not None:
+            await self._coordinator.acquire(key)
+        async with self._limiter.acquire() if self._limiter else nullcontext():
+            if not self._session:
+                result.add("wait", time.perf_counter() - start)
+                async with AsyncExitStack() as stack:
+                    with result.phase("connect"):
+                        smtp = await stack.enter_async_context(self._new_smtp())
+                    with result.phase("send"):
+                        await smtp.send_message(msg)
+                    record_reply(result, smtp)
+                return result
+
+            async with self._session_lock:
+                result.add("wait", time.perf_counter() - start)
+                smtp = self._smtp
+                if smtp is None or not smtp.is_connected:
+                    with result.phase("connect"):
+                        smtp = await self._connect()
+
+                try:
+                    with result.phase("send"):
+                        await smtp.send_message(msg)
+                except SMTPServerDisconnected:
+                    result.attempts += 1
+                    with result.phase("connect"):
+                        smtp = await self._connect()
+                    with result.phase("send"):
+                        await smtp.send_message(msg)
+                record_reply(result, smtp)
+                self._last_used = time.monotonic()
+
+        return result
+
+    def send_stream(
+        self, emails: AsyncIterable[Email] | Iterable[Email], max_in_flight: int = 10
+    ) -> AsyncIterator[StreamResult[Email]]:
+        """Send every email from a source through the SMTP server.
+
+        Emails are only read from the source as sends finish so memory stays flat for any size of
+        source. Results are yielded in the order the sends complete and failed sends are yielded
+        with their error instead of stopping the stream.
+
+        Args:
+            emails: An iterable or async iterable of emails to send
+            max_in_flight: The maximum number of sends running at once. Defaults to 10
+
+        Examples:
+            >>> from message_sender.email.smtp import AsyncSMTPClient
+            >>>
+            >>> client = AsyncSMTPClient(
+            >>>     smtp_server="smtp.server.com", smtp_port=587, email_from="send_from@email.com"
+            >>> )
+            >>> async for result in client.send_stream(read_emails()):
+            >>>     if not result.ok:
+            >>>         print(result.item.email_to, result.error)
+        """
+
+        return stream_sends(emails, self._send_queued, max_in_flight=max_in_flight)
+
+    def send_merge(
+        self, merge: MailMerge, recipients: Recipients, max_in_flight: int = 10
+    ) -> AsyncIterator[StreamResult[Email]]:
+        """Send a mail merge, one personalized email to each recipient through the SMTP server.
+
+        Each email is rendered from the merge's precompiled templates only when a send slot is
+        free, so memory stays flat for any number of recipients. Results are yielded in the order
+        the sends complete with the rendered `Email` as the item.
+
+        Args:
+            merge: The templates to render
+            recipients: The variables for each recipient, a mapping of columns, an iterable of
+                mappings or a CSV file
+            max_in_flight: The maximum number of sends running at once. Defaults to 10
+
+        Examples:
+            >>> from message_sender.email.merge import MailMerge
+            >>> from message_sender.email.smtp import AsyncSMTPClient
+            >>>
+            >>> merge = MailMerge(subject="Hi {name}", message="Your link is {link}")
+            >>> async with AsyncSMTPClient(
+            >>>     smtp_server="smtp.server.com",
+            >>>     smtp_port=587,
+            >>>     email_from="send_from@email.com",
+            >>>     user_name="smtp_user",
+            >>>     password="smtp_password",
+            >>> ) as client:
+            >>>     async for result in client.send_merge(merge, "recipients.csv"):
+            >>>         if not result.ok:
+            >>>             print(result.item.email_to, result.error)
+        """
+
+        return self.send_stream(merge.emails(recipients), max_in_flight=max_in_flight)
+
+    async def _send_queued(self, email: Email) -> SendResult:
+        return await self.send_email(
+            message=email.message,
+            email_to=email.email_to,
+            subject=email.subject,
+            html_content=email.html_content,
+        )
 
 
 class SMTPClient(_SMTPBase):
@@ -122,6 +420,8 @@ class SMTPClient(_SMTPBase):
         email_from: The email address for sending emails
         user_name: The user name to use for sending SMTP emails
         password: The password to use for sending SMTP emails
+        transport: A `LocalTransport` to hand emails to instead of connecting to the server, for
+            load testing or dry runs. Defaults to None
     """
 
     def __init__(
@@ -131,7 +431,10 @@ class SMTPClient(_SMTPBase):
         email_from: str,
         user_name: str | None = None,
         password: str | None = None,
+        transport: LocalTransport | None = None,
     ) -> None:
+        self._transport = transport
+
         super().__init__(
             smtp_server=smtp_server,
             smtp_port=smtp_port,
@@ -140,6 +443,45 @@ class SMTPClient(_SMTPBase):
             password=password,
         )
 
+    def _open(self, stack: ExitStack) -> smtplib.SMTP | LocalSMTP:
+        smtp: smtplib.SMTP | LocalSMTP
+        if self._transport is not None:
+            smtp = stack.enter_context(self._transport.smtp())
+        elif self._use_implicit_tls():
+            smtp = stack.enter_context(
+                CachedSMTPSSL(self.smtp_server, self.smtp_port, context=shared_tls_context())
+            )
+        else:
+            smtp = stack.enter_context(CachedSMTP(self.smtp_server, self.smtp_port))
+            smtp.starttls(context=shared_tls_context())
+        if self.user_name and self.password:
+            smtp.login(self.user_name, self.password)
+
+        return smtp
+
+    def warm_up(self) -> None:
+        """Connect and log in once to check the credentials before the first email.
+
+        This client opens a connection for each email so the connection is closed again, but the
+        server's address and TLS session are cached so later connections skip the DNS lookup and
+        resume TLS instead of doing a full handshake.
+
+        Examples:
+            >>> from message_sender.email.smtp import SMTPClient
+            >>>
+            >>> client = SMTPClient(
+            >>>     smtp_server="smtp.server.com",
+            >>>     smtp_port=587,
+            >>>     email_from="send_from@email.com",
+            >>>     user_name="smtp_user",
+            >>>     password="smtp_password",
+            >>> )
+            >>> client.warm_up()
+        """
+
+        with ExitStack() as stack:
+            self._open(stack)
+
     def send_email(
         self,
         *,
@@ -147,7 +489,7 @@ class SMTPClient(_SMTPBase):
         email_to: str,
         subject: str,
         html_content: str | None = None,
-    ) -> None:
+    ) -> SendResult:
         """Send the email through the SMTP server.
 
         Args:
@@ -157,6 +499,9 @@ class SMTPClient(_SMTPBase):
             subject: The subject of the email
             html_content: The message body with HTML markup. Defaults to None
 
+        Returns:
+            The reply code, reply text, attempts, message size and timings of the send.
+
         Examples:
             >>> from message_sender.email.smtp import SMTPClient
             >>>
@@ -175,23 +520,60 @@ class SMTPClient(_SMTPBase):
             >>> )
         """
 
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = self.email_from
-        msg["To"] = email_to
-        msg.set_content(message)
+        result = SendResult()
+        with result.phase("build"):
+            msg = self._build_message(
+                message=message, email_to=email_to, subject=subject, html_content=html_content
+            )
 
-        if html_content:
-            msg.add_alternative(html_content, subtype="html")
+        with ExitStack() as stack:
+            with result.phase("connect"):
+                smtp = self._open(stack)
 
-        if self._use_implicit_tls():
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as smtp:
-                if self.user_name and self.password:
-                    smtp.login(self.user_name, self.password)
-                smtp.send_message(msg)
-        else:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as smtp:
-                smtp.starttls()
-                if self.user_name and self.password:
-                    smtp.login(self.user_name, self.password)
+            with result.phase("send"):
                 smtp.send_message(msg)
+            record_reply(result, smtp)
+
+        return result
+
+    def send_merge(self, merge: MailMerge, recipients: Recipients) -> Iterator[StreamResult[Email]]:
+        """Send a mail merge, one personalized email to each recipient through the SMTP server.
+
+        Each email is rendered from the merge's precompiled templates only when it is sent, so
+        memory stays flat for any number of recipients. Failed sends are yielded with their error
+        instead of stopping the merge.
+
+        Args:
+            merge: The templates to render
+            recipients: The variables for each recipient, a mapping of columns, an iterable of
+                mappings or a CSV file
+
+        Examples:
+            >>> from message_sender.email.merge import MailMerge
+            >>> from message_sender.email.smtp import SMTPClient
+            >>>
+            >>> merge = MailMerge(subject="Hi {name}", message="Your link is {link}")
+            >>> client = SMTPClient(
+            >>>     smtp_server="smtp.server.com",
+            >>>     smtp_port=587,
+            >>>     email_from="send_from@email.com",
+            >>>     user_name="smtp_user",
+            >>>     password="smtp_password",
+            >>> )
+            >>> for result in client.send_merge(merge, "recipients.csv"):
+            >>>     if not result.ok:
+            >>>         print(result.item.email_to, result.error)
+        """
+
+        for email in merge.emails(recipients):
+            try:
+                result = self.send_email(
+                    message=email.message,
+                    email_to=email.email_to,
+                    subject=email.subject,
+                    html_content=email.html_content,
+                )
+            except Exception as e:
+                yield StreamResult(email, error=e)
+            else:
+                yield StreamResult(email, result=result)
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import os
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Final, Self
+
+import tomllib
+
+from message_sender.discord import AsyncDiscordClient, DiscordClient
+from message_sender.email.direct import AsyncDirectSMTPClient
+from message_sender.email.proton import AsyncProtonEmailClient, ProtonEmailClient
+from message_sender.email.smtp import AsyncSMTPClient, SMTPClient
+from message_sender.google_chat import AsyncGoogleChatClient, GoogleChatClient
+from message_sender.limiter import AdaptiveLimiter
+from message_sender.transports import LocalTransport
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+AsyncMessageClient = (
+    AsyncDiscordClient
+    | AsyncGoogleChatClient
+    | AsyncSMTPClient
+    | AsyncProtonEmailClient
+    | AsyncDirectSMTPClient
+)
+MessageClient = DiscordClient | GoogleChatClient | SMTPClient | ProtonEmailClient
+
+_ASYNC_CLIENTS: Final[dict[str, type[AsyncMessageClient]]] = {
+    "discord": AsyncDiscordClient,
+    "google_chat": AsyncGoogleChatClient,
+    "smtp": AsyncSMTPClient,
+    "proton": AsyncProtonEmailClient,
+    "direct": AsyncDirectSMTPClient,
+}
+_CLIENTS: Final[dict[str, type[MessageClient]]] = {
+    "discord": DiscordClient,
+    "google_chat": GoogleChatClient,
+    "smtp": SMTPClient,
+    "proton": ProtonEmailClient,
+}
+# Settings given as a table are built into these objects before being passed to the client.
+_NESTED: Final[dict[str, type[Any]]] = {"limiter": AdaptiveLimiter, "transport": LocalTransport}
+_BOOLEANS: Final = {
+    "1": True,
+    "true": True,
+    "yes": True,
+    "on": True,
+    "0": False,
+    "false": False,
+    "no": False,
+    "off": False,
+}
+
+
+def _coerce(value: Any, annotation: Any) -> Any:
+    """Convert a string setting, such as one read from the environment, to the parameter's type."""
+
+    if not isinstance(value, str) or not isinstance(annotation, str):
+        return value
+
+    types = {part.strip() for part in annotation.split("|")}
+    if "str" in types:
+        return value
+    if "None" in types and value.lower() in ("", "none"):
+        return None
+    if "bool" in types:
+        if value.lower() not in _BOOLEANS:
+            raise ValueError(f"Expected a boolean, got {value!r}")
+        return _BOOLEANS[value.lower()]
+    if "int" in types:
+        return int(value)
+    if "float" in types:
+        return float(value)
+
+    return value
+
+
+def _build(cls: type[Any], name: str, settings: Mapping[str, Any]) -> Any:
+    signature = inspect.signature(cls)
+    parameters = signature.parameters
+    kwargs: dict[str, Any] = {}
+    for key, value in settings.items():
+        if key not in parameters:
+            raise ValueError(f"Unknown setting {key!r} for {name!r}")
+        if key in _NESTED and isinstance(value, Mapping):
+            value = _build(_NESTED[key], f"{name}.{key}", value)
+        try:
+            kwargs[key] = _coerce(value, parameters[key].annotation)
+        except ValueError as e:
+            raise ValueError(f"Invalid setting {key!r} for {name!r}: {e}") from None
+
+    try:
+        signature.bind(**kwargs)
+    except TypeError as e:
+        raise ValueError(f"Invalid settings for {name!r}: {e}") from None
+
+    return cls(**kwargs)
+
+
+class _ClientFactoryBase:
+    _TYPES: Mapping[str, type[Any]]
+
+    def __init__(self, config: Mapping[str, Mapping[str, Any]]) -> None:
+        self.clients: dict[str, Any] = {
+            name: self._create(name, settings) for name, settings in config.items()
+        }
+
+    def _create(self, name: str, settings: Mapping[str, Any]) -> Any:
+        settings = dict(settings)
+        client_type = settings.pop("type", None)
+        if client_type not in self._TYPES:
+            raise ValueError(
+                f"Client {name!r} has unknown type {client_type!r}, expected one of "
+                f"{', '.join(self._TYPES)}"
+            )
+
+        return _build(self._TYPES[client_type], name, settings)
+
+    @classmethod
+    def from_toml(cls, path: str | os.PathLike[str]) -> Self:
+        """Build the clients from the `clients` table of a TOML file.
+
+        Args:
+            path: The path of the TOML file.
+
+        Examples:
+            >>> from message_sender.factory import AsyncClientFactory
+            >>>
+            >>> factory = AsyncClientFactory.from_toml("message_sender.toml")
+        """
+
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+
+        return cls(config.get("clients", {}))
+
+    @classmethod
+    def from_env(
+        cls, prefix: str = "MESSAGE_SENDER_", environ: Mapping[str, str] | None = None
+    ) -> Self:
+        """Build the clients from environment variables.
+
+        Each variable is named after the prefix, the client name and the setting separated by
+        double underscores, for example `MESSAGE_SENDER_ALERTS__TYPE=discord` and
+        `MESSAGE_SENDER_ALERTS__WEBHOOK_URL=...`. Limiter and transport settings add one more
+        level, for example `MESSAGE_SENDER_ALERTS__LIMITER__MAX_LIMIT=20`. Names are lowercased
+        and values are converted to the type of the setting.
+
+        Args:
+            prefix: Only variables starting with this are read. Defaults to "MESSAGE_SENDER_"
+            environ: The variables to read. Defaults to `os.environ`
+
+        Examples:
+            >>> from message_sender.factory import AsyncClientFactory
+            >>>
+            >>> factory = AsyncClientFactory.from_env()
+        """
+
+        config: dict[str, dict[str, Any]] = {}
+        for key, value in (os.environ if environ is None else environ).items():
+            if not key.startswith(prefix):
+                continue
+
+            name, _, setting = key[len(prefix) :].lower().partition("__")
+            if not setting:
+                continue
+
+            settings = config.setdefault(name, {})
+            setting, _, nested = setting.partition("__")
+            if nested:
+                settings.setdefault(setting, {})[nested] = value
+            else:
+                settings[setting] = value
+
+        return cls(config)
+
+
+class AsyncClientFactory(_ClientFactoryBase):
+    """Builds async clients from a declarative config.
+
+    The config maps a name for each client to its settings. `type` picks the client, one of
+    "discord", "google_chat", "smtp", "proton" or "direct", and every other setting is passed to
+    the client's constructor. `limiter` and `transport` can be tables of `AdaptiveLimiter` and
+    `LocalTransport` settings. Every client is built when the factory is, so a bad config fails at
+    startup.
+
+    Call `warm_up` after a deploy so connections are open and credentials are checked before the
+    first message is sent.
+
+    Args:
+        config: The settings for each client by name.
+
+    Examples:
+        >>> from message_sender.factory import AsyncClientFactory
+        >>>
+        >>> async with AsyncClientFactory(
+        >>>     {
+        >>>         "alerts": {"type": "discord", "webhook_url": "https://your-webhook-url.com"},
+        >>>         "mail": {
+        >>>             "type": "smtp",
+        >>>             "smtp_server": "smtp.server.com",
+        >>>             "smtp_port": 587,
+        >>>             "email_from": "send_from@email.com",
+        >>>             "limiter": {"max_limit": 20},
+        >>>         },
+        >>>     }
+        >>> ) as factory:
+        >>>     await factory.warm_up()
+        >>>     await factory["alerts"].send_message("Deployed")
+    """
+
+    _TYPES = _ASYNC_CLIENTS
+
+    clients: dict[str, AsyncMessageClient]
+
+    def __getitem__(self, name: str) -> AsyncMessageClient:
+        return self.clients[name]
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def warm_up(self, *names: str) -> None:
+        """Open connections and check credentials for the clients before any traffic.
+
+        Clients are warmed up concurrently. Webhook clients open a pooled connection, SMTP and
+        Proton clients open and authenticate their session, which then stays open until `close`,
+        and direct delivery clients have nothing to connect to ahead of time.
+
+        Args:
+            *names: The clients to warm up. Defaults to all of them
+
+        Examples:
+            >>> from message_sender.factory import AsyncClientFactory
+            >>>
+            >>> async with AsyncClientFactory.from_toml("message_sender.toml") as factory:
+            >>>     await factory.warm_up()
+        """
+
+        await asyncio.gather(*(self.clients[name].warm_up() for name in names or self.clients))
+
+    async def close(self) -> None:
+        """Close every client.
+
+        This is only needed if you don't use a context manager.
+        """
+
+        await asyncio.gather(
+            *(
+                client.close()
+                for client in self.clients.values()
+                if not isinstance(client, AsyncDirectSMTPClient)
+            )
+        )
+
+
+class ClientFactory(_ClientFactoryBase):
+    """Builds clients from a declarative config.
+
+    The config maps a name for each client to its settings. `type` picks the client, one of
+    "discord", "google_chat", "smtp" or "proton", and every other setting is passed to the
+    client's constructor. `transport` can be a table of `LocalTransport` settings. Every client is
+    built when the factory is, so a bad config fails at startup.
+
+    Call `warm_up` after a deploy so connections are open and credentials are checked before the
+    first message is sent.
+
+    Args:
+        config: The settings for each client by name.
+
+    Examples:
+        >>> from message_sender.factory import ClientFactory
+        >>>
+        >>> with ClientFactory.from_env() as factory:
+        >>>     factory.warm_up()
+        >>>     factory["alerts"].send_message("Deployed")
+    """
+
+    _TYPES = _CLIENTS
+
+    clients: dict[str, MessageClient]
+
+    def __getitem__(self, name: str) -> MessageClient:
+        return self.clients[name]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def warm_up(self, *names: str) -> None:
+        """Open connections and check credentials for the clients before any traffic.
+
+        Webhook clients open a pooled connection, Proton clients open and authenticate their
+        session, which then stays open until `close`, and SMTP clients log in once.
+
+        Args:
+            *names: The clients to warm up. Defaults to all of them
+
+        Examples:
+            >>> from message_sender.factory import ClientFactory
+            >>>
+            >>> with ClientFactory.from_toml("message_sender.toml") as factory:
+            >>>     factory.warm_up()
+        """
+
+        for name in names or self.clients:
+            self.clients[name].warm_up()
+
+    def close(self) -> None:
+        """Close every client.
+
+        This is only needed if you don't use a context manager.
+        """
+
+        for client in self.clients.values():
+            if not isinstance(client, SMTPClient):
+                client.close()
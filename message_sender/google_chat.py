@@ -1,17 +1,85 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Self
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Final, Self
+from uuid import uuid4
 
-from httpx2 import AsyncClient, Client
+from httpx2 import AsyncBaseTransport, AsyncClient, BaseTransport, Client
+
+from message_sender.maintenance import STALE_CONNECTION_ERRORS, pool_limits
+from message_sender.payloads import JSON_HEADERS, dumps
+from message_sender.results import SendResult, record_response
+from message_sender.splitting import Overflow, chunk_message
+from message_sender.streaming import StreamResult, stream_sends
 
 if TYPE_CHECKING:
     from types import TracebackType
 
+    from message_sender.coordination import Coordinator
+    from message_sender.limiter import AdaptiveLimiter
+
 
 class _GoogleChatClientBase:
+    MAX_MESSAGE_LENGTH: Final = 4096
+
     def __init__(self, webhook_url: str) -> None:
         self.webhook_url = webhook_url
 
+    @classmethod
+    def encode_message(cls, message: str, thread_key: str | None = None) -> bytes:
+        """Serialize a message once so it can be sent to many webhooks without encoding it again.
+
+        The message is checked against Google Chat's limits here, so it must fit in one message.
+
+        Args:
+            message: The message to encode
+            thread_key: Reply in the thread with this key. Pass the same key to `send_message`.
+                Defaults to None
+
+        Examples:
+            >>> import asyncio
+            >>> from message_sender.google_chat import AsyncGoogleChatClient
+            >>>
+            >>> payload = AsyncGoogleChatClient.encode_message("Some test message")
+            >>> await asyncio.gather(*(client.send_message(payload) for client in clients))
+        """
+
+        chunk_message(message, cls.MAX_MESSAGE_LENGTH, "error")
+        if thread_key:
+            return dumps({"text": message, "thread": {"threadKey": thread_key}})
+
+        return dumps({"text": message})
+
+    def _requests(
+        self, message: str | bytes, overflow: Overflow, thread_key: str | None
+    ) -> list[dict[str, Any]]:
+        if isinstance(message, bytes):
+            request: dict[str, Any] = {"content": message, "headers": JSON_HEADERS}
+            if thread_key:
+                request["params"] = {"messageReplyOption": "REPLY_MESSAGE_FALLBACK_TO_NEW_THREAD"}
+            return [request]
+
+        if overflow == "attach":
+            raise ValueError("Google Chat webhooks can't upload attachments")
+
+        chunks = chunk_message(message, self.MAX_MESSAGE_LENGTH, overflow) or []
+        if len(chunks) > 1 and not thread_key:
+            # Keep the parts of a split message together in their own thread.
+            thread_key = uuid4().hex
+
+        if not thread_key:
+            return [{"json": {"text": chunk}} for chunk in chunks]
+
+        return [
+            {
+                "json": {"text": chunk, "thread": {"threadKey": thread_key}},
+                "params": {"messageReplyOption": "REPLY_MESSAGE_FALLBACK_TO_NEW_THREAD"},
+            }
+            for chunk in chunks
+        ]
+
 
 class AsyncGoogleChatClient(_GoogleChatClientBase):
     """Async client to send messages to Google Chat.
@@ -19,10 +87,28 @@ class AsyncGoogleChatClient(_GoogleChatClientBase):
     Args:
         webhook_url: URL for the webhook created in Google. To set this up creat a "space" in
             Google Chat then go to Apps & integrations and create a new webhook
+        limiter: Adaptive concurrency limiter shared by sends through this client. Defaults to None
+        transport: The httpx2 transport requests are sent with, for example a `LocalTransport` to
+            load test or dry run without posting to the webhook. Defaults to the network
+        keepalive_expiry: Seconds a pooled connection can sit idle before it is closed instead of
+            reused. Keep this below the idle timeout of any load balancer or proxy in between so
+            requests aren't sent on connections it has already dropped. None never closes idle
+            connections. Defaults to 5.0
+        coordinator: Shares a rate limit, deduplication and a circuit breaker for the webhook with
+            every sender using the same backend, see `Coordinator`. Defaults to None
     """
 
-    def __init__(self, webhook_url: str) -> None:
-        self._client = AsyncClient()
+    def __init__(
+        self,
+        webhook_url: str,
+        limiter: AdaptiveLimiter | None = None,
+        transport: AsyncBaseTransport | None = None,
+        keepalive_expiry: float | None = 5.0,
+        coordinator: Coordinator | None = None,
+    ) -> None:
+        self._client = AsyncClient(transport=transport, limits=pool_limits(keepalive_expiry))
+        self._limiter = limiter
+        self._coordinator = coordinator
 
         super().__init__(webhook_url=webhook_url)
 
@@ -51,11 +137,45 @@ class AsyncGoogleChatClient(_GoogleChatClientBase):
 
         await self._client.aclose()
 
-    async def send_message(self, message: str) -> None:
+    async def warm_up(self) -> None:
+        """Open a pooled connection to Google Chat so the first message doesn't pay for the TLS
+        handshake.
+
+        Google Chat can't check a webhook without posting to it, so the response is ignored.
+
+        Examples:
+            >>> from message_sender.google_chat import AsyncGoogleChatClient
+            >>>
+            >>> async with AsyncGoogleChatClient("https://your-webhook-url.com") as client:
+            >>>     await client.warm_up()
+        """
+
+        await self._client.head(self.webhook_url)
+
+    async def send_message(
+        self,
+        message: str | bytes,
+        overflow: Overflow = "split",
+        thread_key: str | None = None,
+        dedup_key: str | None = None,
+    ) -> SendResult:
         """Send a message to the Google Chat webhook.
 
         Args:
-            message: The message to send
+            message: The message to send, or a payload from `encode_message` which is sent as is
+            overflow: What to do if the message is longer than Google Chat's 4,096 character
+                limit. "split" sends it as ordered replies in one thread broken on line or word
+                boundaries and "error" raises `MessageTooLongError`. The message is checked before
+                anything is sent. Defaults to "split"
+            thread_key: Reply in the thread with this key, starting it if it doesn't exist.
+                Defaults to None
+            dedup_key: Identifies the message so it is sent once across every sender sharing the
+                client's coordinator, later sends with the same key are skipped and return a
+                result with 0 attempts. Ignored without a coordinator. Defaults to None
+
+        Returns:
+            The status, created message, bytes sent and timings of the send. For a split message
+            the status and response are from the last part.
 
         Examples:
             >>> from message_sender.google_chat import AsyncGoogleChatClient
@@ -64,8 +184,62 @@ class AsyncGoogleChatClient(_GoogleChatClientBase):
             >>>     await client.send_message("Some test message")
         """
 
-        result = await self._client.post(self.webhook_url, json={"text": message})
-        result.raise_for_status()
+        result = SendResult()
+        with result.phase("build"):
+            requests = self._requests(message, overflow, thread_key)
+
+        coordinator = self._coordinator
+        if coordinator is not None:
+            with result.phase("wait"):
+                if not await coordinator.begin(self.webhook_url, dedup_key):
+                    result.attempts = 0
+                    return result
+
+        try:
+            for request in requests:
+                start = time.perf_counter()
+                if coordinator is not None:
+                    await coordinator.acquire(self.webhook_url)
+                async with self._limiter.acquire() if self._limiter else nullcontext():
+                    result.add("wait", time.perf_counter() - start)
+                    with result.phase("send"):
+                        try:
+                            response = await self._client.post(self.webhook_url, **request)
+                        except STALE_CONNECTION_ERRORS:
+                            result.attempts += 1
+                            response = await self._client.post(self.webhook_url, **request)
+                    response.raise_for_status()
+                record_response(result, response)
+        except Exception as error:
+            if coordinator is not None:
+                await coordinator.failed(self.webhook_url, dedup_key, error)
+            raise
+
+        return result
+
+    def send_stream(
+        self, messages: AsyncIterable[str] | Iterable[str], max_in_flight: int = 10
+    ) -> AsyncIterator[StreamResult[str]]:
+        """Send every message from a source to the Google Chat webhook.
+
+        Messages are only read from the source as sends finish so memory stays flat for any size
+        of source. Results are yielded in the order the sends complete and failed sends are
+        yielded with their error instead of stopping the stream.
+
+        Args:
+            messages: An iterable or async iterable of messages to send
+            max_in_flight: The maximum number of sends running at once. Defaults to 10
+
+        Examples:
+            >>> from message_sender.google_chat import AsyncGoogleChatClient
+            >>>
+            >>> async with AsyncGoogleChatClient("https://your-webhook-url.com") as client:
+            >>>     async for result in client.send_stream(read_alerts()):
+            >>>         if not result.ok:
+            >>>             print(result.item, result.error)
+        """
+
+        return stream_sends(messages, self.send_message, max_in_flight=max_in_flight)
 
 
 class GoogleChatClient(_GoogleChatClientBase):
@@ -74,10 +248,21 @@ class GoogleChatClient(_GoogleChatClientBase):
     Args:
         webhook_url: URL for the webhook created in Google. To set this up creat a "space" in
             Google Chat then go to Apps & integrations and create a new webhook
+        transport: The httpx2 transport requests are sent with, for example a `LocalTransport` to
+            load test or dry run without posting to the webhook. Defaults to the network
+        keepalive_expiry: Seconds a pooled connection can sit idle before it is closed instead of
+            reused. Keep this below the idle timeout of any load balancer or proxy in between so
+            requests aren't sent on connections it has already dropped. None never closes idle
+            connections. Defaults to 5.0
     """
 
-    def __init__(self, webhook_url: str) -> None:
-        self._client = Client()
+    def __init__(
+        self,
+        webhook_url: str,
+        transport: BaseTransport | None = None,
+        keepalive_expiry: float | None = 5.0,
+    ) -> None:
+        self._client = Client(transport=transport, limits=pool_limits(keepalive_expiry))
 
         super().__init__(webhook_url=webhook_url)
 
@@ -106,11 +291,38 @@ class GoogleChatClient(_GoogleChatClientBase):
 
         self._client.close()
 
-    def send_message(self, message: str) -> None:
+    def warm_up(self) -> None:
+        """Open a pooled connection to Google Chat so the first message doesn't pay for the TLS
+        handshake.
+
+        Google Chat can't check a webhook without posting to it, so the response is ignored.
+
+        Examples:
+            >>> from message_sender.google_chat import GoogleChatClient
+            >>>
+            >>> with GoogleChatClient("https://your-webhook-url.com") as client:
+            >>>     client.warm_up()
+        """
+
+        self._client.head(self.webhook_url)
+
+    def send_message(
+        self, message: str | bytes, overflow: Overflow = "split", thread_key: str | None = None
+    ) -> SendResult:
         """Send a message to the Google Chat webhook.
 
         Args:
-            message: The message to send
+            message: The message to send, or a payload from `encode_message` which is sent as is
+            overflow: What to do if the message is longer than Google Chat's 4,096 character
+                limit. "split" sends it as ordered replies in one thread broken on line or word
+                boundaries and "error" raises `MessageTooLongError`. The message is checked before
+                anything is sent. Defaults to "split"
+            thread_key: Reply in the thread with this key, starting it if it doesn't exist.
+                Defaults to None
+
+        Returns:
+            The status, created message, bytes sent and timings of the send. For a split message
+            the status and response are from the last part.
 
         Examples:
             >>> from message_sender.google_chat import GoogleChatClient
@@ -119,5 +331,18 @@ class GoogleChatClient(_GoogleChatClientBase):
             >>>     client.send_message("Some test message")
         """
 
-        result = self._client.post(self.webhook_url, json={"text": message})
-        result.raise_for_status()
+        result = SendResult()
+        with result.phase("build"):
+            requests = self._requests(message, overflow, thread_key)
+
+        for request in requests:
+            with result.phase("send"):
+                try:
+                    response = self._client.post(self.webhook_url, **request)
+                except STALE_CONNECTION_ERRORS:
+                    result.attempts += 1
+                    response = self._client.post(self.webhook_url, **request)
+            response.raise_for_status()
+            record_response(result, response)
+
+        return result
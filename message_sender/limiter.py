@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Final
+
+from aiosmtplib import SMTPResponseException
+from httpx2 import HTTPStatusError
+
+_THROTTLE_HTTP_STATUSES: Final = frozenset({429, 503})
+_THROTTLE_SMTP_CODES: Final = frozenset({421, 451})
+
+
+def is_throttled(error: BaseException) -> bool:
+    """Determine if an error means the destination is asking us to slow down.
+
+    HTTP 429 and 503 responses from webhooks, and SMTP 421 and 451 replies are treated as
+    throttling.
+
+    Args:
+        error: The error raised by the send.
+    """
+
+    if isinstance(error, HTTPStatusError):
+        return error.response.status_code in _THROTTLE_HTTP_STATUSES
+
+    if isinstance(error, SMTPResponseException):
+        return error.code in _THROTTLE_SMTP_CODES
+
+    return False
+
+
+class AdaptiveLimiter:
+    """Adaptive concurrency limiter for async clients.
+
+    The number of sends allowed in flight grows by one each time a full window of sends completes
+    without the latency rising, and is cut multiplicatively when the destination throttles (see
+    `is_throttled`) or the latency climbs past `latency_tolerance` times the best latency seen.
+    This lets the concurrency converge to what the destination can sustain.
+
+    Args:
+        initial_limit: The number of sends allowed in flight to start with. Defaults to 4
+        min_limit: The lowest the limit will go. Defaults to 1
+        max_limit: The highest the limit will go. Defaults to 100
+        backoff: The factor the limit is multiplied by when backing off. Defaults to 0.5
+        latency_tolerance: How many times the best observed latency a send can take before it is
+            treated as a sign of overload. Defaults to 2.0
+        throttled: Function deciding if an error is a throttling signal. Defaults to `is_throttled`
+
+    Examples:
+        >>> from message_sender.discord import AsyncDiscordClient
+        >>> from message_sender.limiter import AdaptiveLimiter
+        >>>
+        >>> limiter = AdaptiveLimiter(initial_limit=2, max_limit=50)
+        >>> async with AsyncDiscordClient("https://your-webhook-url.com", limiter=limiter) as client:
+        >>>     await client.send_message("Some test message")
+        >>> print(limiter.limit)
+    """
+
+    _BASELINE_DRIFT: Final = 0.01
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        throttled: Callable[[BaseException], bool] = is_throttled,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        if latency_tolerance <= 1:
+            raise ValueError("latency_tolerance must be greater than 1")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.throttled = throttled
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baseline: float | None = None
+        self._slot_freed = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        """The number of sends currently allowed in flight."""
+
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of sends currently in flight."""
+
+        return self._in_flight
+
+    @property
+    def baseline_latency(self) -> float | None:
+        """The best recent latency in seconds, None until a send has completed."""
+
+        return self._baseline
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """Wait for a free slot, then time the send made inside the block.
+
+        Errors raised inside the block are re-raised after being checked for throttling.
+        """
+
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if self.throttled(e):
+                self._decrease()
+            raise
+        else:
+            self._record_latency(time.perf_counter() - start)
+        finally:
+            async with self._slot_freed:
+                self._in_flight -= 1
+                self._slot_freed.notify_all()
+
+    def _record_latency(self, latency: float) -> None:
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            # Let the baseline creep up so a lasting change in the destination's latency is
+            # eventually accepted as the new normal.
+            self._baseline += (latency - self._baseline) * self._BASELINE_DRIFT
+
+        if latency > self._baseline * self.latency_tolerance:
+            self._decrease()
+        else:
+            # Additive increase, one extra slot per full window of healthy sends.
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def _decrease(self) -> None:
+        self._limit = max(self.min_limit, self._limit * self.backoff)
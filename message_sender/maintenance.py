@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Iterable
+from typing import TYPE_CHECKING, Final, Protocol, Self
+
+from httpx2 import Limits, ReadError, RemoteProtocolError, WriteError
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+STALE_CONNECTION_ERRORS: Final = (RemoteProtocolError, ReadError, WriteError)
+"""Errors from reusing a pooled connection the server or a load balancer already closed.
+
+Webhook requests that fail with one of these are retried once on a new connection, unless the
+body was streamed and can't be sent again.
+"""
+
+
+def pool_limits(keepalive_expiry: float | None) -> Limits:
+    """The httpx2 pool limits for the webhook clients.
+
+    Args:
+        keepalive_expiry: Seconds a pooled connection can sit idle before the pool closes it.
+    """
+
+    return Limits(
+        max_connections=100, max_keepalive_connections=20, keepalive_expiry=keepalive_expiry
+    )
+
+
+class _AsyncMaintainable(Protocol):
+    def maintain(self, idle_timeout: float | None = None) -> Awaitable[None]: ...
+
+
+class _Maintainable(Protocol):
+    def maintain(self, idle_timeout: float | None = None) -> None: ...
+
+
+class _ConnectionMaintainerBase:
+    def __init__(self, interval: float, idle_timeout: float | None) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError("idle_timeout must be greater than 0")
+
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+
+
+class AsyncConnectionMaintainer(_ConnectionMaintainerBase):
+    """Background task that keeps the SMTP sessions of async clients healthy.
+
+    Every `interval` seconds each client's `maintain` is called: sessions idle for longer than
+    `idle_timeout` are closed and reopened by the next email, and the rest are sent a NOOP so the
+    server doesn't time them out, reconnecting if it has already dropped them. Keep `interval`
+    shorter than the server's idle timeout, which is usually a few minutes.
+
+    Webhook clients don't need maintaining, their pools close connections idle for longer than
+    `keepalive_expiry` and requests that fail on a stale connection are retried.
+
+    Args:
+        clients: The clients to maintain, for example `AsyncSMTPClient` and
+            `AsyncProtonEmailClient` sessions.
+        interval: Seconds between maintenance runs. Defaults to 60.0
+        idle_timeout: Seconds without an email before a session is closed. None keeps sessions
+            open for as long as the client is. Defaults to 300.0
+
+    Examples:
+        >>> from message_sender.email.smtp import AsyncSMTPClient
+        >>> from message_sender.maintenance import AsyncConnectionMaintainer
+        >>>
+        >>> async with AsyncSMTPClient(
+        >>>     smtp_server="smtp.server.com", smtp_port=587, email_from="send_from@email.com"
+        >>> ) as client:
+        >>>     async with AsyncConnectionMaintainer([client], interval=30.0):
+        >>>         await serve_forever(client)
+    """
+
+    def __init__(
+        self,
+        clients: Iterable[_AsyncMaintainable],
+        interval: float = 60.0,
+        idle_timeout: float | None = 300.0,
+    ) -> None:
+        self.clients = list(clients)
+        self._task: asyncio.Task[None] | None = None
+
+        super().__init__(interval=interval, idle_timeout=idle_timeout)
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    def start(self) -> None:
+        """Start the background task.
+
+        This is only needed if you don't use a context manager.
+        """
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task, waiting for a running maintenance pass to be cancelled."""
+
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def run_once(self) -> None:
+        """Maintain every client once, concurrently."""
+
+        await asyncio.gather(*(client.maintain(self.idle_timeout) for client in self.clients))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+
+class ConnectionMaintainer(_ConnectionMaintainerBase):
+    """Background thread that keeps the SMTP sessions of clients healthy.
+
+    Every `interval` seconds each client's `maintain` is called: sessions idle for longer than
+    `idle_timeout` are closed and reopened by the next email, and the rest are sent a NOOP so the
+    server doesn't time them out, reconnecting if it has already dropped them. Keep `interval`
+    shorter than the server's idle timeout, which is usually a few minutes.
+
+    Args:
+        clients: The clients to maintain, for example `ProtonEmailClient` sessions.
+        interval: Seconds between maintenance runs. Defaults to 60.0
+        idle_timeout: Seconds without an email before a session is closed. None keeps sessions
+            open for as long as the client is. Defaults to 300.0
+
+    Examples:
+        >>> from message_sender.email.proton import ProtonEmailClient
+        >>> from message_sender.maintenance import ConnectionMaintainer
+        >>>
+        >>> with ProtonEmailClient(
+        >>>     email_address="smtp_setup_email@proton.me", smtp_token="your-token"
+        >>> ) as client:
+        >>>     with ConnectionMaintainer([client], interval=30.0):
+        >>>         serve_forever(client)
+    """
+
+    def __init__(
+        self,
+        clients: Iterable[_Maintainable],
+        interval: float = 60.0,
+        idle_timeout: float | None = 300.0,
+    ) -> None:
+        self.clients = list(clients)
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        super().__init__(interval=interval, idle_timeout=idle_timeout)
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start the background thread.
+
+        This is only needed if you don't use a context manager.
+        """
+
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread, waiting for a running maintenance pass to finish."""
+
+        if self._thread is None:
+            return
+
+        thread, self._thread = self._thread, None
+        self._stopped.set()
+        thread.join()
+
+    def run_once(self) -> None:
+        """Maintain every client once."""
+
+        for client in self.clients:
+            client.maintain(self.idle_timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.run_once()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Final
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+JSON_HEADERS: Final = {"Content-Type": "application/json"}
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize a JSON payload to bytes.
+
+    orjson is used when it is installed, install with `pip install message-sender[orjson]`,
+    otherwise the standard library json module.
+
+    Args:
+        payload: The payload to serialize.
+
+    Examples:
+        >>> from message_sender.payloads import dumps
+        >>>
+        >>> dumps({"content": "Some test message"})
+        b'{"content":"Some test message"}'
+    """
+
+    if orjson is not None:
+        return orjson.dumps(payload)
+
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
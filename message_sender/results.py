@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from httpx2 import Response
+
+    from message_sender.email.connection import CachedAsyncSMTP, CachedSMTP
+    from message_sender.transports import LocalAsyncSMTP, LocalSMTP
+
+
+class SendResult:
+    """What happened when a message was sent.
+
+    Timings are recorded per phase: "build" for preparing the message, "wait" for time spent
+    waiting on pacing, concurrency limits or a shared session, "connect" for opening a connection
+    and "send" for transferring the message and waiting for the server to accept it. Phases that
+    didn't happen are left out.
+
+    Args:
+        status: The HTTP status code or SMTP reply code of the final response. Defaults to None
+        response: What the service sent back, the decoded JSON body for webhooks or the reply text
+            for SMTP which usually contains the queue id. Defaults to None
+        attempts: How many tries the send took. Defaults to 1
+        bytes_sent: The size of the request bodies or messages sent. Defaults to 0
+        timings: Seconds spent in each phase. Defaults to None
+    """
+
+    __slots__ = ("attempts", "bytes_sent", "response", "status", "timings")
+
+    def __init__(
+        self,
+        status: int | None = None,
+        response: Any = None,
+        attempts: int = 1,
+        bytes_sent: int = 0,
+        timings: dict[str, float] | None = None,
+    ) -> None:
+        self.status = status
+        self.response = response
+        self.attempts = attempts
+        self.bytes_sent = bytes_sent
+        self.timings = timings if timings is not None else {}
+
+    def __repr__(self) -> str:
+        return (
+            f"SendResult(status={self.status!r}, response={self.response!r}, "
+            f"attempts={self.attempts}, bytes_sent={self.bytes_sent}, timings={self.timings!r})"
+        )
+
+    @property
+    def elapsed(self) -> float:
+        """The total seconds across all phases."""
+
+        return sum(self.timings.values())
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add time to a phase."""
+
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Time the block and add it to a phase."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+
+def record_response(result: SendResult, response: Response, bytes_sent: int | None = None) -> None:
+    """Update a result from a webhook response.
+
+    Args:
+        result: The result to update.
+        response: The HTTP response.
+        bytes_sent: The size of the request body if it was streamed. Defaults to the
+            Content-Length of the request
+    """
+
+    result.status = response.status_code
+    result.bytes_sent += (
+        bytes_sent
+        if bytes_sent is not None
+        else int(response.request.headers.get("Content-Length", 0))
+    )
+    if not response.content:
+        result.response = None
+        return
+
+    try:
+        result.response = response.json()
+    except ValueError:
+        result.response = response.text
+
+
+def record_reply(
+    result: SendResult, smtp: CachedSMTP | CachedAsyncSMTP | LocalSMTP | LocalAsyncSMTP
+) -> None:
+    """Update a result from the reply to the last message sent over an SMTP connection.
+
+    Args:
+        result: The result to update.
+        smtp: The connection the message was sent over.
+    """
+
+    result.status = smtp.last_reply_code
+    result.response = smtp.last_reply_message
+    result.bytes_sent = smtp.last_message_size
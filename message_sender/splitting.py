@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Literal
+
+Overflow = Literal["split", "attach", "error"]
+"""What to do with a message longer than the service allows.
+
+- `split`: Send the message as ordered chunks broken on line or word boundaries.
+- `attach`: Upload the message as a text file attachment, where the service supports it.
+- `error`: Raise `MessageTooLongError` without sending anything.
+"""
+
+
+class MessageTooLongError(ValueError):
+    """Raised before sending when a message is over the service's size limit.
+
+    Args:
+        length: The length of the message.
+        limit: The most the service accepts.
+    """
+
+    def __init__(self, length: int, limit: int) -> None:
+        self.length = length
+        self.limit = limit
+        super().__init__(f"Message length {length} is over the limit of {limit}")
+
+
+def split_message(message: str, limit: int) -> list[str]:
+    """Split a message into ordered chunks no longer than `limit` characters.
+
+    Each chunk is broken at the last newline that fits, then the last space, and only cut mid-word
+    when a single word is longer than the limit. The whitespace the message is broken on is
+    dropped.
+
+    Args:
+        message: The message to split.
+        limit: The most characters in one chunk.
+
+    Examples:
+        >>> from message_sender.splitting import split_message
+        >>>
+        >>> split_message("first line\\nsecond line", 15)
+        ['first line', 'second line']
+    """
+
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    chunks: list[str] = []
+    start = 0
+    while len(message) - start > limit:
+        end = start + limit
+        cut = message.rfind("\n", start + 1, end + 1)
+        if cut == -1:
+            cut = message.rfind(" ", start + 1, end + 1)
+
+        if cut == -1:
+            chunks.append(message[start:end])
+            start = end
+        else:
+            chunks.append(message[start:cut])
+            start = cut + 1
+
+    if start < len(message):
+        chunks.append(message[start:])
+
+    return chunks
+
+
+def chunk_message(message: str, limit: int, overflow: Overflow) -> list[str] | None:
+    """Check a message against a size limit before anything is sent.
+
+    Args:
+        message: The message to send.
+        limit: The most characters the service accepts in one message.
+        overflow: What to do if the message is over the limit.
+
+    Returns:
+        The messages to send in order, or None if the message should be sent as an attachment.
+    """
+
+    if not message:
+        raise ValueError("Can't send an empty message")
+
+    if len(message) <= limit:
+        return [message]
+
+    if overflow == "split":
+        return split_message(message, limit)
+
+    if overflow == "attach":
+        return None
+
+    if overflow == "error":
+        raise MessageTooLongError(len(message), limit)
+
+    raise ValueError(f"Unknown overflow option: {overflow!r}")
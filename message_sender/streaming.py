@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+)
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class StreamResult(Generic[T]):
+    """The outcome of one send from a stream.
+
+    Args:
+        item: The item from the source that was sent.
+        result: The value returned by the send, None if it failed.
+        error: The error raised by the send, None if it succeeded.
+    """
+
+    __slots__ = ("error", "item", "result")
+
+    def __init__(self, item: T, result: Any = None, error: Exception | None = None) -> None:
+        self.item = item
+        self.result = result
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"StreamResult(item={self.item!r}, result={self.result!r}, error={self.error!r})"
+
+    @property
+    def ok(self) -> bool:
+        """True if the send succeeded."""
+
+        return self.error is None
+
+
+async def _iterate(source: AsyncIterable[T] | Iterable[T]) -> AsyncGenerator[T, None]:
+    if isinstance(source, AsyncIterable):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+
+async def stream_sends(
+    source: AsyncIterable[T] | Iterable[T],
+    send: Callable[[T], Awaitable[Any]],
+    *,
+    max_in_flight: int = 10,
+) -> AsyncIterator[StreamResult[T]]:
+    """Send every item from a source with bounded concurrency, yielding results as they complete.
+
+    At most `max_in_flight` sends run at once and the next item is only pulled from the source
+    when one finishes, so memory use stays flat no matter how large the source is and a slow
+    transport slows down reading from the source. Failed sends are yielded with their error
+    instead of stopping the stream.
+
+    Args:
+        source: An iterable or async iterable of items to send, for example a database cursor.
+        send: The async function called with each item.
+        max_in_flight: The maximum number of sends running at once. Defaults to 10
+    """
+
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    items = _iterate(source)
+    in_flight: dict[asyncio.Task[Any], T] = {}
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    item = await anext(items)
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    in_flight[asyncio.ensure_future(send(item))] = item
+
+            if not in_flight:
+                return
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = in_flight.pop(task)
+                error = task.exception()
+                if error is None:
+                    yield StreamResult(item, result=task.result())
+                elif isinstance(error, Exception):
+                    yield StreamResult(item, error=error)
+                else:
+                    raise error
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        await items.aclose()
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import smtplib
+import time
+from typing import TYPE_CHECKING, Any, Self
+
+import aiosmtplib
+from httpx2 import AsyncBaseTransport, BaseTransport, Request, Response
+
+if TYPE_CHECKING:
+    from email.message import EmailMessage
+    from types import TracebackType
+
+
+class LocalTransport(BaseTransport, AsyncBaseTransport):
+    """In-process stand-in for the network, for load testing and dry runs.
+
+    Pass it as `transport` to any client. The webhook clients use it as their httpx2 transport and
+    the email clients open `LocalSMTP` or `LocalAsyncSMTP` connections on it instead of connecting
+    to a server, so nothing leaves the process and the time measured is the library's own
+    overhead plus whatever latency is injected.
+
+    Emails are not serialized, so `SendResult.bytes_sent` is 0 for emails sent through it.
+
+    Args:
+        status_code: The HTTP status returned for requests that don't fail. Defaults to 200
+        latency: Seconds every request or email takes. Defaults to 0.0
+        jitter: Up to this many extra seconds are added to the latency at random. Defaults to 0.0
+        failure_rate: The fraction of requests and emails that fail, from 0 to 1. Defaults to 0.0
+        failure_status: The HTTP status returned for failed requests. Defaults to 503
+        failure_reply: The SMTP reply code raised for failed emails. Defaults to 451
+        record: Keep every request and email in `requests` and `messages`. Defaults to False
+        seed: Seed for the random jitter and failures so runs can be repeated. Defaults to None
+    """
+
+    def __init__(
+        self,
+        *,
+        status_code: int = 200,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        failure_reply: int = 451,
+        record: bool = False,
+        seed: int | None = None,
+    ) -> None:
+        if latency < 0 or jitter < 0:
+            raise ValueError("latency and jitter can't be negative")
+        if not 0 <= failure_rate <= 1:
+            raise ValueError("failure_rate must be between 0 and 1")
+
+        self.status_code = status_code
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.failure_reply = failure_reply
+        self.record = record
+        self.requests: list[Request] = []
+        self.messages: list[EmailMessage] = []
+        self.delivered = 0
+        self.failed = 0
+
+        self._random = random.Random(seed)
+
+    def _delay(self) -> float:
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _fails(self) -> bool:
+        failed = bool(self.failure_rate) and self._random.random() < self.failure_rate
+        if failed:
+            self.failed += 1
+        else:
+            self.delivered += 1
+
+        return failed
+
+    def _respond(self, request: Request) -> Response:
+        if self.record:
+            self.requests.append(request)
+
+        status_code = self.failure_status if self._fails() else self.status_code
+
+        return Response(status_code, request=request)
+
+    def handle_request(self, request: Request) -> Response:
+        request.read()
+        if delay := self._delay():
+            time.sleep(delay)
+
+        return self._respond(request)
+
+    async def handle_async_request(self, request: Request) -> Response:
+        await request.aread()
+        if delay := self._delay():
+            await asyncio.sleep(delay)
+
+        return self._respond(request)
+
+    def _deliver(self, msg: EmailMessage) -> None:
+        if self.record:
+            self.messages.append(msg)
+
+        if self._fails():
+            raise smtplib.SMTPResponseException(self.failure_reply, b"Injected failure")
+
+    def smtp(self) -> LocalSMTP:
+        """Open a blocking SMTP stand-in connection."""
+
+        return LocalSMTP(self)
+
+    def async_smtp(self) -> LocalAsyncSMTP:
+        """Create an async SMTP stand-in connection."""
+
+        return LocalAsyncSMTP(self)
+
+
+class NullTransport(LocalTransport):
+    """Accepts every request and email instantly without doing anything with it.
+
+    Args:
+        status_code: The HTTP status returned. Defaults to 200
+    """
+
+    def __init__(self, status_code: int = 200) -> None:
+        super().__init__(status_code=status_code)
+
+
+class RecordingTransport(LocalTransport):
+    """Accepts every request and email instantly, keeping them in `requests` and `messages`.
+
+    Args:
+        status_code: The HTTP status returned. Defaults to 200
+    """
+
+    def __init__(self, status_code: int = 200) -> None:
+        super().__init__(status_code=status_code, record=True)
+
+
+class LatencyTransport(LocalTransport):
+    """Accepts every request and email after a delay, to see how the pipeline behaves against a
+    slow service.
+
+    Args:
+        latency: Seconds every request or email takes.
+        jitter: Up to this many extra seconds are added at random. Defaults to 0.0
+        seed: Seed for the random jitter. Defaults to None
+    """
+
+    def __init__(self, latency: float, jitter: float = 0.0, seed: int | None = None) -> None:
+        super().__init__(latency=latency, jitter=jitter, seed=seed)
+
+
+class FailureTransport(LocalTransport):
+    """Fails a share of requests and emails at random, to exercise error handling and retries.
+
+    Failed requests get `failure_status` and failed emails raise an SMTP error with
+    `failure_reply`. The defaults look like throttling to `AdaptiveLimiter`.
+
+    Args:
+        failure_rate: The fraction of requests and emails that fail, from 0 to 1.
+        failure_status: The HTTP status returned for failed requests. Defaults to 503
+        failure_reply: The SMTP reply code raised for failed emails. Defaults to 451
+        seed: Seed for the random failures. Defaults to None
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        failure_status: int = 503,
+        failure_reply: int = 451,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__(
+            failure_rate=failure_rate,
+            failure_status=failure_status,
+            failure_reply=failure_reply,
+            seed=seed,
+        )
+
+
+class LocalSMTP:
+    """Blocking SMTP connection that hands messages to a `LocalTransport`.
+
+    Args:
+        transport: The transport messages are delivered to.
+    """
+
+    last_message_size = 0
+    last_reply_code: int | None = None
+    last_reply_message: str | None = None
+
+    def __init__(self, transport: LocalTransport) -> None:
+        self.transport = transport
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def starttls(self, **kwargs: Any) -> tuple[int, bytes]:
+        return 220, b"Ready to start TLS"
+
+    def login(self, user: str, password: str) -> tuple[int, bytes]:
+        return 235, b"Authentication successful"
+
+    def noop(self) -> tuple[int, bytes]:
+        return 250, b"OK"
+
+    def send_message(self, msg: EmailMessage, **kwargs: Any) -> dict[str, tuple[int, bytes]]:
+        if delay := self.transport._delay():
+            time.sleep(delay)
+        try:
+            self.transport._deliver(msg)
+        except smtplib.SMTPResponseException as e:
+            self.last_reply_code = e.smtp_code
+            raise
+
+        self.last_reply_code = 250
+        self.last_reply_message = "2.0.0 Ok: queued"
+
+        return {}
+
+    def quit(self) -> tuple[int, bytes]:
+        return 221, b"Bye"
+
+    def close(self) -> None:
+        pass
+
+
+class LocalAsyncSMTP:
+    """Async SMTP connection that hands messages to a `LocalTransport`.
+
+    Args:
+        transport: The transport messages are delivered to.
+    """
+
+    def __init__(self, transport: LocalTransport) -> None:
+        self.transport = transport
+        self.is_connected = False
+        self.last_message_size = 0
+        self.last_reply_code: int | None = None
+        self.last_reply_message: str | None = None
+
+    async def __aenter__(self) -> Self:
+        await self.connect()
+        return self
+
+    async def __aexit__(
+        self,
+        et: type[BaseException] | None,
+        ev: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.quit()
+
+    async def connect(self, **kwargs: Any) -> aiosmtplib.SMTPResponse:
+        self.is_connected = True
+        return aiosmtplib.SMTPResponse(220, "localhost ready")
+
+    async def noop(self, **kwargs: Any) -> aiosmtplib.SMTPResponse:
+        if not self.is_connected:
+            raise aiosmtplib.SMTPServerDisconnected("Not connected")
+
+        return aiosmtplib.SMTPResponse(250, "OK")
+
+    async def send_message(
+        self, message: EmailMessage, **kwargs: Any
+    ) -> tuple[dict[str, aiosmtplib.SMTPResponse], str]:
+        if not self.is_connected:
+            raise aiosmtplib.SMTPServerDisconnected("Not connected")
+
+        if delay := self.transport._delay():
+            await asyncio.sleep(delay)
+        try:
+            self.transport._deliver(message)
+        except smtplib.SMTPResponseException as e:
+            self.last_reply_code = e.smtp_code
+            raise aiosmtplib.SMTPResponseException(e.smtp_code, e.smtp_error.decode()) from None
+
+        self.last_reply_code = 250
+        self.last_reply_message = "2.0.0 Ok: queued"
+
+        return {}, self.last_reply_message
+
+    async def quit(self, **kwargs: Any) -> aiosmtplib.SMTPResponse:
+        self.is_connected = False
+        return aiosmtplib.SMTPResponse(221, "Bye")
+
+    def close(self) -> None:
+        self.is_connected = False
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import defaultdict
+
+import pytest
+
+
+class SMTPSink:
+    """Local SMTP server that accepts everything unless told otherwise.
+
+    `rcpt_replies` maps a recipient to the reply codes to give for it, one per attempt, before
+    accepting it.
+    """
+
+    def __init__(self) -> None:
+        self.port = 0
+        self.received: list[tuple[list[str], bytes]] = []
+        self.connections = 0
+        self.rcpt_replies: dict[str, list[int]] = defaultdict(list)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        recipients: list[str] = []
+        writer.write(b"220 localhost ready\r\n")
+        while line := await reader.readline():
+            command = line.decode().strip()
+            upper = command.upper()
+            if upper.startswith("EHLO"):
+                writer.write(b"250-localhost\r\n250 8BITMIME\r\n")
+            elif upper.startswith("RCPT"):
+                address = command.partition(":")[2].strip().strip("<>")
+                replies = self.rcpt_replies[address]
+                code = replies.pop(0) if replies else 250
+                if code == 250:
+                    recipients.append(address)
+                writer.write(f"{code} {'ok' if code == 250 else 'rejected'}\r\n".encode())
+            elif upper == "DATA":
+                writer.write(b"354 go ahead\r\n")
+                await writer.drain()
+                self.received.append((recipients, await reader.readuntil(b"\r\n.\r\n")))
+                recipients = []
+                writer.write(b"250 2.0.0 Ok: queued as ABC123\r\n")
+            elif upper == "RSET":
+                recipients = []
+                writer.write(b"250 ok\r\n")
+            elif upper == "QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+async def smtp_sink():
+    sink = SMTPSink()
+    server = await asyncio.start_server(sink.handle, "127.0.0.1", 0)
+    sink.port = server.sockets[0].getsockname()[1]
+    yield sink
+    server.close()
+    await server.wait_closed()
+
+
+class _Simple(str):
+    pass
+
+
+class RESPServer:
+    """Local server speaking enough of the Redis protocol for `RedisBackend`.
+
+    Keys expire, WATCH/MULTI/EXEC transactions abort when a watched key changed and `password`
+    makes AUTH required. `commands` records every command received.
+    """
+
+    def __init__(self, password: str | None = None) -> None:
+        self.port = 0
+        self.password = password
+        self.commands: list[list[str]] = []
+        self.connections = 0
+        self._values: dict[str, tuple[str, float | None]] = {}
+        self._versions: dict[str, int] = defaultdict(int)
+
+    @property
+    def url(self) -> str:
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{self.port}/0"
+
+    def _get(self, key: str) -> str | None:
+        entry = self._values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            self._delete(key)
+            return None
+        return entry[0] if entry else None
+
+    def _set(self, key: str, value: str, expires: float | None) -> None:
+        self._values[key] = (value, expires)
+        self._versions[key] += 1
+
+    def _delete(self, key: str) -> int:
+        self._versions[key] += 1
+        return int(self._values.pop(key, None) is not None)
+
+    def _run(self, name: str, args: list[str]) -> object:
+        if name == "PING":
+            return _Simple("PONG")
+        if name in ("SELECT", "UNWATCH"):
+            return _Simple("OK")
+        if name == "GET":
+            return self._get(args[0])
+        if name == "SET":
+            key, value, *options = args
+            options = [option.upper() for option in options]
+            if "NX" in options and self._get(key) is not None:
+                return None
+            ms = int(options[options.index("PX") + 1]) if "PX" in options else None
+            self._set(key, value, time.time() + ms / 1000 if ms is not None else None)
+            return _Simple("OK")
+        if name == "DEL":
+            return sum(self._delete(key) for key in args)
+        if name == "EXISTS":
+            return sum(self._get(key) is not None for key in args)
+        if name == "INCR":
+            value = int(self._get(args[0]) or 0) + 1
+            self._set(args[0], str(value), self._values.get(args[0], ("", None))[1])
+            return value
+        if name == "PEXPIRE":
+            key, ms, *options = args
+            value = self._get(key)
+            if value is None or ("NX" in options and self._values[key][1] is not None):
+                return 0
+            self._set(key, value, time.time() + int(ms) / 1000)
+            return 1
+        if name == "TIME":
+            now = time.time()
+            return [str(int(now)), str(int(now % 1 * 1_000_000))]
+        return ValueError(f"ERR unknown command '{name}'")
+
+    async def _read(self, reader: asyncio.StreamReader) -> list[str] | None:
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(size + 2))[:-2].decode())
+        return args
+
+    @classmethod
+    def _encode(cls, reply: object) -> bytes:
+        if isinstance(reply, Exception):
+            return f"-{reply}\r\n".encode()
+        if isinstance(reply, _Simple):
+            return f"+{reply}\r\n".encode()
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, list):
+            return f"*{len(reply)}\r\n".encode() + b"".join(cls._encode(item) for item in reply)
+        data = str(reply).encode()
+        return b"$%d\r\n%b\r\n" % (len(data), data)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        authenticated = self.password is None
+        watched: dict[str, int] = {}
+        queued: list[list[str]] | None = None
+        while (command := await self._read(reader)) is not None:
+            self.commands.append(command)
+            name, args = command[0].upper(), command[1:]
+            reply: object
+            if name == "AUTH":
+                authenticated = args[-1] == self.password
+                reply = _Simple("OK") if authenticated else ValueError("WRONGPASS invalid")
+            elif not authenticated:
+                reply = ValueError("NOAUTH Authentication required.")
+            elif name == "WATCH":
+                watched.update((key, self._versions[key]) for key in args)
+                reply = _Simple("OK")
+            elif name == "MULTI":
+                queued = []
+                reply = _Simple("OK")
+            elif name == "DISCARD":
+                queued, watched = None, {}
+                reply = _Simple("OK")
+            elif name == "EXEC":
+                for key in watched:
+                    self._get(key)
+                if any(self._versions[key] != version for key, version in watched.items()):
+                    reply = None
+                else:
+                    reply = [self._run(item[0].upper(), item[1:]) for item in queued or []]
+                queued, watched = None, {}
+            elif queued is not None:
+                queued.append(command)
+                reply = _Simple("QUEUED")
+            else:
+                reply = self._run(name, args)
+                if name == "UNWATCH":
+                    watched = {}
+            writer.write(self._encode(reply))
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+async def resp_server():
+    resp = RESPServer()
+    server = await asyncio.start_server(resp.handle, "127.0.0.1", 0)
+    resp.port = server.sockets[0].getsockname()[1]
+    yield resp
+    server.close()
+    await server.wait_closed()
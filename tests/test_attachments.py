@@ -0,0 +1,102 @@
+import io
+from email.parser import BytesParser
+from email.policy import HTTP
+
+import pytest
+
+from message_sender.attachments import Attachment, MultipartBody
+
+
+def _parse(body, data):
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {body.headers['Content-Type']}\r\n\r\n".encode() + data
+    )
+    return [
+        (part.get_param("name", header="content-disposition"), part.get_filename(), part)
+        for part in message.iter_parts()
+    ]
+
+
+def test_attachment_name_and_media_type(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_bytes(b"{}")
+
+    assert Attachment(path).name == "report.json"
+    assert Attachment(path).media_type == "application/json"
+    assert Attachment(b"data").name == "file"
+    assert Attachment(b"data").media_type == "application/octet-stream"
+    assert Attachment(b"data", filename="a.png").media_type == "image/png"
+    assert Attachment(b"data", content_type="text/csv").media_type == "text/csv"
+
+
+def test_attachment_size(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"x" * 100)
+    f = io.BytesIO(b"y" * 50)
+    f.seek(10)
+
+    async def chunks():
+        yield b"z"
+
+    assert Attachment(str(path)).size() == 100
+    assert Attachment(b"abc").size() == 3
+    assert Attachment(f).size() == 40
+    assert f.tell() == 10
+    assert Attachment(chunks()).size() is None
+
+
+def test_attachment_iter_bytes_chunks(tmp_path):
+    path = tmp_path / "big.bin"
+    path.write_bytes(b"x" * 200_000)
+
+    chunks = list(Attachment(path).iter_bytes())
+
+    assert len(chunks) == 4
+    assert all(len(chunk) <= 64 * 1024 for chunk in chunks)
+    assert b"".join(chunks) == b"x" * 200_000
+
+
+def test_attachment_iter_bytes_async_iterator():
+    async def chunks():
+        yield b"z"
+
+    with pytest.raises(TypeError):
+        list(Attachment(chunks()).iter_bytes())
+
+
+def test_multipart_body(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"line 1\nline 2\n")
+    body = MultipartBody(
+        [("payload_json", "application/json", b'{"content": "hi"}')],
+        [("files[0]", Attachment(path)), ("files[1]", Attachment(io.BytesIO(b"\x89PNG"), "a.png"))],
+    )
+
+    length = int(body.headers["Content-Length"])
+    data = b"".join(body.iter_bytes())
+    parts = _parse(body, data)
+
+    assert length == len(data)
+    assert [(name, filename) for name, filename, _ in parts] == [
+        ("payload_json", None),
+        ("files[0]", "app.log"),
+        ("files[1]", "a.png"),
+    ]
+    assert parts[0][2].get_content_type() == "application/json"
+    assert parts[1][2].get_payload(decode=True) == b"line 1\nline 2\n"
+    assert parts[2][2].get_content_type() == "image/png"
+
+
+async def test_multipart_body_async():
+    async def chunks():
+        for i in range(3):
+            yield f"chunk {i}\n".encode()
+
+    body = MultipartBody([], [("files[0]", Attachment(chunks(), 'say "hi".txt'))])
+
+    data = b"".join([chunk async for chunk in body.aiter_bytes()])
+    ((name, filename, part),) = _parse(body, data)
+
+    assert "Content-Length" not in body.headers
+    assert b'filename="say %22hi%22.txt"' in data
+    assert part.get_payload(decode=True) == b"chunk 0\nchunk 1\nchunk 2\n"
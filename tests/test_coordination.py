@@ -0,0 +1,283 @@
+import asyncio
+import time
+
+import httpx2
+import pytest
+from aiosmtplib import SMTPResponseException, SMTPServerDisconnected
+
+from message_sender.coordination import (
+    BackendError,
+    CircuitOpenError,
+    Coordinator,
+    InMemoryBackend,
+    RedisBackend,
+    is_service_failure,
+)
+from message_sender.discord import AsyncDiscordClient
+from message_sender.email.proton import AsyncProtonEmailClient
+from message_sender.email.smtp import AsyncSMTPClient
+from message_sender.google_chat import AsyncGoogleChatClient
+from message_sender.transports import FailureTransport, RecordingTransport
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def backend(request):
+    if request.param == "memory":
+        yield InMemoryBackend()
+        return
+
+    resp_server = request.getfixturevalue("resp_server")
+    async with RedisBackend(resp_server.url) as backend:
+        yield backend
+
+
+def _status_error(status):
+    request = httpx2.Request("POST", "https://example.com")
+    return httpx2.HTTPStatusError(
+        "error", request=request, response=httpx2.Response(status, request=request)
+    )
+
+
+async def test_take_token(backend):
+    assert await backend.take_token("bucket", rate=10.0, burst=2) == 0.0
+    assert await backend.take_token("bucket", rate=10.0, burst=2) == 0.0
+
+    wait = await backend.take_token("bucket", rate=10.0, burst=2)
+    assert 0.0 < wait <= 0.1
+
+    await asyncio.sleep(wait + 0.01)
+    assert await backend.take_token("bucket", rate=10.0, burst=2) == 0.0
+
+
+async def test_set_if_absent_and_expiry(backend):
+    assert await backend.set_if_absent("key", ttl=0.05)
+    assert not await backend.set_if_absent("key", ttl=0.05)
+    assert await backend.exists("key")
+
+    await asyncio.sleep(0.06)
+    assert not await backend.exists("key")
+    assert await backend.set_if_absent("key", ttl=10.0)
+
+    await backend.delete("key")
+    assert not await backend.exists("key")
+
+
+async def test_increment_expires_from_first_increment(backend):
+    assert await backend.increment("count", ttl=0.1) == 1
+    await asyncio.sleep(0.05)
+    assert await backend.increment("count", ttl=0.1) == 2
+
+    await asyncio.sleep(0.06)
+    assert await backend.increment("count", ttl=0.1) == 1
+
+
+async def test_redis_token_bucket_is_atomic_across_connections(resp_server):
+    backends = [RedisBackend(resp_server.url) for _ in range(5)]
+
+    waits = await asyncio.gather(
+        *(backend.take_token("bucket", rate=1.0, burst=3) for backend in backends * 2)
+    )
+
+    assert waits.count(0.0) == 3
+    assert resp_server.connections == 5
+    assert sum(command[0] == "EXEC" for command in resp_server.commands) >= 3
+    for backend in backends:
+        await backend.close()
+
+
+async def test_redis_auth_and_select(resp_server):
+    resp_server.password = "secret"
+
+    async with RedisBackend(f"redis://:secret@127.0.0.1:{resp_server.port}/2") as backend:
+        assert await backend.execute(("PING",)) == ["PONG"]
+
+    assert resp_server.commands[:2] == [["AUTH", "secret"], ["SELECT", "2"]]
+
+    async with RedisBackend(f"redis://127.0.0.1:{resp_server.port}") as backend:
+        with pytest.raises(BackendError, match="NOAUTH"):
+            await backend.exists("key")
+
+
+async def test_redis_reconnects_after_connection_error(resp_server):
+    async with RedisBackend(resp_server.url) as backend:
+        await backend.set_if_absent("key", ttl=10.0)
+        backend._writer.close()
+
+        with pytest.raises(OSError):
+            await backend.exists("key")
+        assert await backend.exists("key")
+
+    assert resp_server.connections == 2
+
+
+def test_redis_rejects_other_schemes():
+    with pytest.raises(ValueError):
+        RedisBackend("http://localhost")
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (_status_error(500), True),
+        (_status_error(429), True),
+        (_status_error(400), False),
+        (httpx2.ConnectError("refused"), True),
+        (SMTPResponseException(421, "Try again later"), True),
+        (SMTPResponseException(550, "No such user"), False),
+        (SMTPServerDisconnected("gone"), True),
+        (ValueError("bad message"), False),
+    ],
+)
+def test_is_service_failure(error, expected):
+    assert is_service_failure(error) is expected
+
+
+def test_coordinator_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        Coordinator(InMemoryBackend(), rate=0)
+    with pytest.raises(ValueError):
+        Coordinator(InMemoryBackend(), burst=0)
+    with pytest.raises(ValueError):
+        Coordinator(InMemoryBackend(), failure_threshold=0)
+
+
+async def test_coordinator_hashes_keys(resp_server):
+    async with RedisBackend(resp_server.url) as backend:
+        coordinator = Coordinator(backend, namespace="alerts")
+        await coordinator.begin("https://discord.com/api/webhooks/1/token", dedup_key="a")
+
+    keys = [command[1] for command in resp_server.commands if command[0] in ("SET", "EXISTS")]
+    assert all(key.startswith(("alerts:circuit:", "alerts:sent:")) for key in keys)
+    assert not any("token" in key for key in keys)
+
+
+async def test_coordinator_rate_limit_is_shared(resp_server):
+    coordinators = [
+        Coordinator(RedisBackend(resp_server.url), rate=20.0, burst=1) for _ in range(2)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(coordinator.acquire("dest") for coordinator in coordinators * 2))
+
+    assert time.perf_counter() - start >= 0.14
+    for coordinator in coordinators:
+        await coordinator.backend.close()
+
+
+async def test_coordinator_circuit_opens_and_closes():
+    coordinator = Coordinator(
+        InMemoryBackend(), failure_threshold=2, failure_window=10.0, open_seconds=0.05
+    )
+
+    await coordinator.failed("dest", None, _status_error(400))
+    await coordinator.failed("dest", None, _status_error(503))
+    assert await coordinator.begin("dest")
+
+    await coordinator.failed("dest", None, _status_error(503))
+    with pytest.raises(CircuitOpenError) as excinfo:
+        await coordinator.begin("dest")
+    assert excinfo.value.key == "dest"
+    assert await coordinator.begin("other")
+
+    await asyncio.sleep(0.06)
+    assert await coordinator.begin("dest")
+
+
+async def test_discord_dedup_across_clients(resp_server):
+    requests = []
+    transport = httpx2.MockTransport(
+        lambda request: requests.append(request) or httpx2.Response(204)
+    )
+    clients = [
+        AsyncDiscordClient(
+            "https://discord.com/api/webhooks/1/a",
+            transport=transport,
+            coordinator=Coordinator(RedisBackend(resp_server.url)),
+        )
+        for _ in range(3)
+    ]
+
+    results = await asyncio.gather(
+        *(client.send_message("Disk full", dedup_key="disk-full") for client in clients)
+    )
+
+    assert len(requests) == 1
+    assert sorted(result.attempts for result in results) == [0, 0, 1]
+    assert all(result.status is None for result in results if not result.attempts)
+    for client in clients:
+        await client.close()
+        await client._coordinator.backend.close()
+
+
+async def test_failed_send_releases_dedup_key():
+    statuses = [500, 204]
+    transport = httpx2.MockTransport(lambda request: httpx2.Response(statuses.pop(0)))
+    coordinator = Coordinator(InMemoryBackend())
+
+    async with AsyncGoogleChatClient(
+        "https://chat.googleapis.com/v1/a", transport=transport, coordinator=coordinator
+    ) as client:
+        with pytest.raises(httpx2.HTTPStatusError):
+            await client.send_message("hi", dedup_key="alert")
+        result = await client.send_message("hi", dedup_key="alert")
+
+    assert result.status == 204
+    assert result.attempts == 1
+
+
+async def test_webhook_circuit_fails_fast():
+    requests = []
+    transport = httpx2.MockTransport(
+        lambda request: requests.append(request) or httpx2.Response(503)
+    )
+    coordinator = Coordinator(InMemoryBackend(), failure_threshold=2)
+
+    async with AsyncGoogleChatClient(
+        "https://chat.googleapis.com/v1/a", transport=transport, coordinator=coordinator
+    ) as client:
+        for _ in range(2):
+            with pytest.raises(httpx2.HTTPStatusError):
+                await client.send_message("hi")
+        with pytest.raises(CircuitOpenError):
+            await client.send_message("hi")
+
+    assert len(requests) == 2
+
+
+async def test_smtp_coordination():
+    transport = RecordingTransport()
+    coordinator = Coordinator(InMemoryBackend(), rate=1000.0)
+
+    async with AsyncSMTPClient(
+        smtp_server="smtp.server.com",
+        smtp_port=587,
+        email_from="sender@email.com",
+        transport=transport,
+        coordinator=coordinator,
+    ) as client:
+        first = await client.send_email(
+            message="Hello", email_to="a@example.com", subject="Hi", dedup_key="welcome:a"
+        )
+        second = await client.send_email(
+            message="Hello", email_to="a@example.com", subject="Hi", dedup_key="welcome:a"
+        )
+
+    assert first.status == 250
+    assert second.attempts == 0
+    assert len(transport.messages) == 1
+
+
+async def test_proton_circuit_counts_failures():
+    coordinator = Coordinator(InMemoryBackend(), failure_threshold=1)
+    client = AsyncProtonEmailClient(
+        "me@proton.me",
+        "token",
+        messages_per_second=None,
+        transport=FailureTransport(1.0, failure_reply=421),
+        coordinator=coordinator,
+    )
+
+    with pytest.raises(SMTPResponseException):
+        await client.send_email(message="Hello", email_to="a@example.com", subject="Hi")
+    with pytest.raises(CircuitOpenError):
+        await client.send_email(message="Hello", email_to="a@example.com", subject="Hi")
@@ -1,6 +1,12 @@
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx2
+import pytest
+
+from message_sender.attachments import Attachment
 from message_sender.discord import AsyncDiscordClient, DiscordClient
+from message_sender.splitting import MessageTooLongError
 
 
 def test_send_message() -> None:
@@ -57,3 +63,237 @@ async def test_async_context_manager() -> None:
             await client.send_message("test message")
 
     mock_client.aclose.assert_called_once()
+
+
+async def test_async_send_stream() -> None:
+    mock_client = MagicMock()
+    mock_client.post = AsyncMock(return_value=MagicMock())
+    mock_client.aclose = AsyncMock()
+
+    async def messages():
+        for i in range(5):
+            yield f"message {i}"
+
+    with patch("message_sender.discord.AsyncClient", return_value=mock_client):
+        async with AsyncDiscordClient("https://example.com/webhook") as client:
+            results = [result async for result in client.send_stream(messages(), max_in_flight=2)]
+
+    assert len(results) == 5
+    assert all(result.ok for result in results)
+    assert mock_client.post.call_count == 5
+
+
+def test_send_message_splits_long_message() -> None:
+    mock_client = MagicMock()
+    lines = [f"{i:04} " + "x" * 95 for i in range(40)]
+
+    with patch("message_sender.discord.Client", return_value=mock_client):
+        with DiscordClient("https://example.com/webhook") as client:
+            client.send_message("\n".join(lines), thread_id="123")
+
+    sent = [call.kwargs["json"]["content"] for call in mock_client.post.call_args_list]
+    assert len(sent) == 3
+    assert all(len(content) <= 2000 for content in sent)
+    assert "\n".join(sent).split("\n") == lines
+    assert all(
+        call.kwargs["params"] == {"thread_id": "123"} for call in mock_client.post.call_args_list
+    )
+
+
+async def test_async_send_message_attach() -> None:
+    mock_client = MagicMock()
+    mock_client.aclose = AsyncMock()
+    received = []
+
+    async def post(url, **kwargs):
+        received.append(b"".join([chunk async for chunk in kwargs["content"]]))
+        return MagicMock()
+
+    mock_client.post = post
+    message = "x" * 2001
+
+    with patch("message_sender.discord.AsyncClient", return_value=mock_client):
+        async with AsyncDiscordClient("https://example.com/webhook") as client:
+            await client.send_message(message, overflow="attach")
+
+    assert len(received) == 1
+    assert b'filename="message.txt"' in received[0]
+    assert message.encode() in received[0]
+
+
+@pytest.mark.parametrize(
+    "message, overflow, error",
+    [
+        ("x" * 2001, "error", MessageTooLongError),
+        ("x" * (10 * 1024 * 1024 + 1), "attach", MessageTooLongError),
+        ("", "split", ValueError),
+    ],
+)
+async def test_async_send_message_invalid_not_sent(message, overflow, error) -> None:
+    mock_client = MagicMock()
+    mock_client.post = AsyncMock()
+    mock_client.aclose = AsyncMock()
+
+    with patch("message_sender.discord.AsyncClient", return_value=mock_client):
+        async with AsyncDiscordClient("https://example.com/webhook") as client:
+            with pytest.raises(error):
+                await client.send_message(message, overflow=overflow)
+
+    mock_client.post.assert_not_called()
+
+
+def test_send_message_with_attachments(tmp_path) -> None:
+    mock_client = MagicMock()
+    path = tmp_path / "app.log"
+    path.write_bytes(b"error\n")
+
+    with patch("message_sender.discord.Client", return_value=mock_client):
+        with DiscordClient("https://example.com/webhook") as client:
+            client.send_message(
+                "Deploy failed",
+                attachments=[Attachment(path), Attachment(b"png", "shot.png", description="UI")],
+            )
+
+    kwargs = mock_client.post.call_args.kwargs
+    data = b"".join(kwargs["content"])
+    assert kwargs["headers"]["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert int(kwargs["headers"]["Content-Length"]) == len(data)
+    payload = json.loads(data.split(b"\r\n\r\n", 1)[1].split(b"\r\n", 1)[0])
+    assert payload == {
+        "content": "Deploy failed",
+        "attachments": [
+            {"id": 0, "filename": "app.log"},
+            {"id": 1, "filename": "shot.png", "description": "UI"},
+        ],
+    }
+    assert b"error\n" in data
+
+
+async def test_async_send_message_streams_attachment() -> None:
+    mock_client = MagicMock()
+    mock_client.aclose = AsyncMock()
+    received = []
+
+    async def post(url, **kwargs):
+        received.append(b"".join([chunk async for chunk in kwargs["content"]]))
+        return MagicMock()
+
+    mock_client.post = post
+
+    async def chunks():
+        for i in range(3):
+            yield f"chunk {i}\n".encode()
+
+    with patch("message_sender.discord.AsyncClient", return_value=mock_client):
+        async with AsyncDiscordClient("https://example.com/webhook") as client:
+            await client.send_message("", attachments=[Attachment(chunks(), "stream.log")])
+
+    assert b'"attachments":[{"id":0,"filename":"stream.log"}]' in received[0]
+    assert b"chunk 0\nchunk 1\nchunk 2\n" in received[0]
+
+
+def test_send_message_splits_with_attachments_on_last_part() -> None:
+    mock_client = MagicMock()
+
+    with patch("message_sender.discord.Client", return_value=mock_client):
+        with DiscordClient("https://example.com/webhook") as client:
+            client.send_message("word " * 500, attachments=[Attachment(b"data", "a.txt")])
+
+    first, second = mock_client.post.call_args_list
+    assert "json" in first.kwargs
+    assert b"a.txt" in b"".join(second.kwargs["content"])
+
+
+def test_send_message_too_many_attachments() -> None:
+    mock_client = MagicMock()
+
+    with patch("message_sender.discord.Client", return_value=mock_client):
+        with DiscordClient("https://example.com/webhook") as client:
+            with pytest.raises(ValueError):
+                client.send_message("hi", attachments=[Attachment(b"x")] * 11)
+
+    mock_client.post.assert_not_called()
+
+
+def test_send_message_async_iterator_attachment_not_sent() -> None:
+    mock_client = MagicMock()
+
+    async def chunks():
+        yield b"x"
+
+    with patch("message_sender.discord.Client", return_value=mock_client):
+        with DiscordClient("https://example.com/webhook") as client:
+            with pytest.raises(TypeError):
+                client.send_message("hi", attachments=[Attachment(chunks())])
+
+    mock_client.post.assert_not_called()
+
+
+async def test_async_send_encoded_message() -> None:
+    mock_client = MagicMock()
+    mock_client.post = AsyncMock(return_value=MagicMock())
+    mock_client.aclose = AsyncMock()
+    payload = AsyncDiscordClient.encode_message("Hello, World!")
+
+    with patch("message_sender.discord.AsyncClient", return_value=mock_client):
+        async with AsyncDiscordClient("https://example.com/webhook") as client:
+            await client.send_message(payload, thread_id="123")
+
+    mock_client.post.assert_called_once_with(
+        "https://example.com/webhook",
+        content=b'{"content":"Hello, World!"}',
+        headers={"Content-Type": "application/json"},
+        params={"thread_id": "123"},
+    )
+
+
+def test_encode_message_too_long() -> None:
+    with pytest.raises(MessageTooLongError):
+        DiscordClient.encode_message("x" * 2001)
+
+
+def test_send_encoded_message_with_attachments() -> None:
+    mock_client = MagicMock()
+
+    with patch("message_sender.discord.Client", return_value=mock_client):
+        with DiscordClient("https://example.com/webhook") as client:
+            with pytest.raises(ValueError):
+                client.send_message(b'{"content":"hi"}', attachments=[Attachment(b"x")])
+
+    mock_client.post.assert_not_called()
+
+
+def test_send_message_result() -> None:
+    def handler(request):
+        assert request.url.params["wait"] == "true"
+        return httpx2.Response(200, json={"id": "42", "content": "Hello"})
+
+    client = httpx2.Client(transport=httpx2.MockTransport(handler))
+
+    with patch("message_sender.discord.Client", return_value=client):
+        with DiscordClient("https://example.com/webhook") as discord:
+            result = discord.send_message("Hello", wait=True)
+
+    assert result.status == 200
+    assert result.response["id"] == "42"
+    assert result.bytes_sent == len(b'{"content":"Hello"}')
+    assert set(result.timings) == {"build", "send"}
+
+
+async def test_async_send_message_result_with_attachment() -> None:
+    received = []
+
+    async def handler(request):
+        received.append(await request.aread())
+        return httpx2.Response(204)
+
+    client = httpx2.AsyncClient(transport=httpx2.MockTransport(handler))
+
+    with patch("message_sender.discord.AsyncClient", return_value=client):
+        async with AsyncDiscordClient("https://example.com/webhook") as discord:
+            result = await discord.send_message("Hello", attachments=[Attachment(b"x" * 100)])
+
+    assert result.status == 204
+    assert result.response is None
+    assert result.bytes_sent == len(received[0])
+    assert set(result.timings) == {"build", "wait", "send"}
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from message_sender.dispatch import Priority, PriorityDispatcher
+
+
+async def test_submit_returns_result() -> None:
+    async def send(message: str, *, suffix: str) -> str:
+        return message + suffix
+
+    async with PriorityDispatcher(send) as dispatcher:
+        result = await dispatcher.submit("Hello", suffix="!")
+
+    assert result == "Hello!"
+
+
+async def test_submit_raises_send_error() -> None:
+    async def send(message: str) -> None:
+        raise ValueError(message)
+
+    async with PriorityDispatcher(send) as dispatcher:
+        with pytest.raises(ValueError, match="boom"):
+            await dispatcher.submit("boom")
+
+
+async def test_strict_scheduling_order() -> None:
+    sent = []
+    release = asyncio.Event()
+
+    async def send(message: str) -> None:
+        await release.wait()
+        sent.append(message)
+
+    dispatcher = PriorityDispatcher(send, concurrency=1, reserved=0)
+    dispatcher.start()
+    blocker = dispatcher.submit_nowait("first")
+    await asyncio.sleep(0)
+    futures = [
+        dispatcher.submit_nowait("bulk", priority=Priority.BULK),
+        dispatcher.submit_nowait("normal"),
+        dispatcher.submit_nowait("critical", priority=Priority.CRITICAL),
+    ]
+
+    assert dispatcher.queue_depths() == {
+        Priority.CRITICAL: 1,
+        Priority.HIGH: 0,
+        Priority.NORMAL: 1,
+        Priority.BULK: 1,
+    }
+
+    release.set()
+    await asyncio.gather(blocker, *futures)
+    await dispatcher.close()
+
+    assert sent == ["first", "critical", "normal", "bulk"]
+
+
+async def test_weighted_scheduling_shares_workers() -> None:
+    sent = []
+    release = asyncio.Event()
+
+    async def send(message: str) -> None:
+        await release.wait()
+        sent.append(message)
+
+    dispatcher = PriorityDispatcher(
+        send,
+        concurrency=1,
+        reserved=0,
+        scheduling="weighted",
+        weights={Priority.NORMAL: 3, Priority.BULK: 1},
+    )
+    dispatcher.start()
+    blocker = dispatcher.submit_nowait("first")
+    await asyncio.sleep(0)
+    futures = [dispatcher.submit_nowait("bulk", priority=Priority.BULK) for _ in range(4)]
+    futures += [dispatcher.submit_nowait("normal") for _ in range(4)]
+
+    release.set()
+    await asyncio.gather(blocker, *futures)
+    await dispatcher.close()
+
+    assert sent[1:5].count("bulk") == 1
+    assert sent[1:5].count("normal") == 3
+
+
+async def test_reserved_worker_serves_critical_while_saturated() -> None:
+    bulk_release = asyncio.Event()
+
+    async def send(message: str) -> str:
+        if message == "bulk":
+            await bulk_release.wait()
+        return message
+
+    async with PriorityDispatcher(send, concurrency=3, reserved=1) as dispatcher:
+        bulk = [dispatcher.submit_nowait("bulk", priority=Priority.BULK) for _ in range(10)]
+        await asyncio.sleep(0)
+
+        result = await asyncio.wait_for(
+            dispatcher.submit("alert", priority=Priority.CRITICAL), timeout=1
+        )
+
+        assert result == "alert"
+        assert dispatcher.queue_depths()[Priority.BULK] == 8
+
+        bulk_release.set()
+        await asyncio.gather(*bulk)
+
+
+async def test_close_drains_queue() -> None:
+    sent = []
+
+    async def send(message: str) -> None:
+        await asyncio.sleep(0)
+        sent.append(message)
+
+    dispatcher = PriorityDispatcher(send, concurrency=2)
+    dispatcher.start()
+    for i in range(5):
+        dispatcher.submit_nowait(str(i), priority=Priority.BULK)
+    await dispatcher.close()
+
+    assert len(sent) == 5
+    with pytest.raises(RuntimeError):
+        dispatcher.submit_nowait("late")
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"concurrency": 0},
+        {"concurrency": 2, "reserved": 2},
+        {"scheduling": "random"},
+        {"weights": {Priority.BULK: 0}},
+    ],
+)
+def test_invalid_settings(kwargs) -> None:
+    async def send() -> None:
+        pass
+
+    with pytest.raises(ValueError):
+        PriorityDispatcher(send, **kwargs)
@@ -0,0 +1,196 @@
+import asyncio
+import socket
+import ssl
+from email.message import EmailMessage
+from unittest.mock import MagicMock, patch
+
+import pytest
+from aiosmtplib import SMTPConnectError
+
+from message_sender.email.connection import (
+    CachedAsyncSMTP,
+    CachedSMTP,
+    ConnectionStats,
+    DNSCache,
+    ResumingTLSContext,
+    dns_cache,
+    shared_tls_context,
+    stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    dns_cache.clear()
+    stats.reset()
+    yield
+    dns_cache.clear()
+    stats.reset()
+
+
+def _message() -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = "Test"
+    msg["From"] = "sender@email.com"
+    msg["To"] = "recipient@example.com"
+    msg.set_content("Hello")
+    return msg
+
+
+def test_dns_cache_reuses_lookup() -> None:
+    cache = DNSCache()
+
+    with patch(
+        "message_sender.email.connection.socket.getaddrinfo", return_value=["address"]
+    ) as mock_getaddrinfo:
+        assert cache.resolve("smtp.server.com", 587) == ["address"]
+        assert cache.resolve("smtp.server.com", 587) == ["address"]
+
+    mock_getaddrinfo.assert_called_once_with("smtp.server.com", 587, type=socket.SOCK_STREAM)
+    assert stats.dns_misses == 1
+    assert stats.dns_hits == 1
+
+
+def test_dns_cache_expires() -> None:
+    cache = DNSCache(ttl=10)
+
+    with (
+        patch(
+            "message_sender.email.connection.socket.getaddrinfo", return_value=["address"]
+        ) as mock_getaddrinfo,
+        patch("message_sender.email.connection.time.monotonic", side_effect=[0, 5, 11, 11]),
+    ):
+        cache.resolve("smtp.server.com", 587)
+        cache.resolve("smtp.server.com", 587)
+        cache.resolve("smtp.server.com", 587)
+
+    assert mock_getaddrinfo.call_count == 2
+
+
+def test_dns_cache_evicts_oldest() -> None:
+    cache = DNSCache(max_entries=2)
+
+    with patch(
+        "message_sender.email.connection.socket.getaddrinfo", return_value=["address"]
+    ) as mock_getaddrinfo:
+        for host in ("a.com", "b.com", "c.com", "a.com"):
+            cache.resolve(host, 25)
+
+    assert mock_getaddrinfo.call_count == 4
+
+
+async def test_dns_cache_resolve_async() -> None:
+    cache = DNSCache()
+
+    first = await cache.resolve_async("127.0.0.1", 25)
+    second = await cache.resolve_async("127.0.0.1", 25)
+
+    assert first is second
+    assert first[0][4][:2] == ("127.0.0.1", 25)
+
+
+def test_connect_failure_invalidates_dns() -> None:
+    with (
+        patch(
+            "message_sender.email.connection.socket.create_connection",
+            side_effect=ConnectionRefusedError(),
+        ),
+        pytest.raises(ConnectionRefusedError),
+    ):
+        CachedSMTP("127.0.0.1", 1)
+
+    assert stats.dns_misses == 1
+    with patch(
+        "message_sender.email.connection.socket.getaddrinfo", return_value=[]
+    ) as mock_getaddrinfo:
+        with pytest.raises(OSError, match="No addresses"):
+            CachedSMTP("127.0.0.1", 1)
+
+    mock_getaddrinfo.assert_called_once()
+
+
+async def test_cached_smtp(smtp_sink) -> None:
+    def send() -> CachedSMTP:
+        for _ in range(2):
+            with CachedSMTP("127.0.0.1", smtp_sink.port) as smtp:
+                smtp.send_message(_message())
+        return smtp
+
+    smtp = await asyncio.to_thread(send)
+
+    assert smtp.last_reply_code == 250
+    assert smtp.last_reply_message == "2.0.0 Ok: queued as ABC123"
+    assert smtp.last_message_size == len(smtp_sink.received[-1][1]) - 3
+    assert len(smtp_sink.received) == 2
+    assert stats.dns_misses == 1
+    assert stats.dns_hits == 1
+
+
+async def test_cached_async_smtp(smtp_sink) -> None:
+    for _ in range(2):
+        async with CachedAsyncSMTP(
+            hostname="127.0.0.1", port=smtp_sink.port, start_tls=False
+        ) as smtp:
+            _, response = await smtp.send_message(_message())
+
+    assert response == "2.0.0 Ok: queued as ABC123"
+    assert smtp.last_reply_code == 250
+    assert smtp.last_reply_message == response
+    assert smtp.last_message_size > 0
+    assert len(smtp_sink.received) == 2
+    assert stats.dns_misses == 1
+    assert stats.dns_hits == 1
+
+
+async def test_cached_async_smtp_connect_error() -> None:
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+
+    with pytest.raises(SMTPConnectError):
+        await CachedAsyncSMTP(hostname="127.0.0.1", port=port, start_tls=False).connect()
+
+    assert stats.dns_misses == 1
+
+
+def test_tls_context_resumes_remembered_session() -> None:
+    context = ResumingTLSContext()
+    session = MagicMock()
+    context.remember("smtp.server.com", MagicMock(session=session))
+
+    with patch("ssl.SSLContext.wrap_bio") as mock_wrap_bio:
+        context.wrap_bio(ssl.MemoryBIO(), ssl.MemoryBIO(), server_hostname="smtp.server.com")
+        context.wrap_bio(ssl.MemoryBIO(), ssl.MemoryBIO(), server_hostname="other.server.com")
+
+    assert mock_wrap_bio.call_args_list[0].kwargs["session"] is session
+    assert mock_wrap_bio.call_args_list[1].kwargs["session"] is None
+
+
+def test_tls_context_records_handshake() -> None:
+    context = ResumingTLSContext()
+    ssl_sock = MagicMock(session_reused=True)
+
+    with patch("ssl.SSLContext.wrap_socket", return_value=ssl_sock):
+        assert context.wrap_socket(MagicMock(), server_hostname="smtp.server.com") is ssl_sock
+
+    assert stats.tls_handshakes == 1
+    assert stats.tls_resumed == 1
+    assert context._sessions["smtp.server.com"] is ssl_sock.session
+
+
+def test_shared_tls_context() -> None:
+    assert shared_tls_context() is shared_tls_context()
+    assert shared_tls_context().verify_mode == ssl.CERT_REQUIRED
+
+
+def test_connection_stats() -> None:
+    connection_stats = ConnectionStats()
+    assert connection_stats.average_handshake_seconds == 0.0
+
+    connection_stats.record_handshake(0.2, resumed=False)
+    connection_stats.record_handshake(0.1, resumed=True)
+
+    assert connection_stats.average_handshake_seconds == pytest.approx(0.15)
+    assert connection_stats.tls_resumed == 1
+    assert "tls_handshakes=2" in repr(connection_stats)
@@ -0,0 +1,180 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiosmtplib import SMTPConnectError, SMTPRecipientsRefused
+
+from message_sender.email.direct import AsyncDirectSMTPClient, MXRecord, _is_temporary
+from message_sender.email.models import Email
+
+
+def _client(port, resolver=None, **kwargs):
+    return AsyncDirectSMTPClient(
+        email_from="sender@example.com",
+        resolver=resolver or AsyncMock(return_value=[MXRecord(0, "127.0.0.1")]),
+        port=port,
+        local_hostname="localhost",
+        backoff=0,
+        **kwargs,
+    )
+
+
+async def test_send_email(smtp_sink):
+    client = _client(smtp_sink.port)
+
+    await client.send_email(message="Test", email_to="to@one.com", subject="Test")
+
+    assert len(smtp_sink.received) == 1
+    recipients, data = smtp_sink.received[0]
+    assert recipients == ["to@one.com"]
+    assert b"Subject: Test" in data
+
+
+async def test_send_many_groups_by_domain(smtp_sink):
+    resolver = AsyncMock(return_value=[MXRecord(0, "127.0.0.1")])
+    client = _client(smtp_sink.port, resolver, max_connections_per_domain=1)
+    emails = [
+        Email(message="Test", email_to=f"user{i}@{domain}", subject="Test")
+        for domain in ("one.com", "two.com")
+        for i in range(5)
+    ]
+
+    results = await client.send_many(emails)
+
+    assert len(results) == 10
+    assert all(result.ok for result in results)
+    assert {result.item for result in results} == set(emails)
+    assert smtp_sink.connections == 2
+    assert sorted(call.args[0] for call in resolver.await_args_list) == ["one.com", "two.com"]
+
+
+async def test_send_many_reconnects_after_messages_per_connection(smtp_sink):
+    client = _client(smtp_sink.port, max_connections_per_domain=1, messages_per_connection=2)
+    emails = [Email(message="Test", email_to=f"user{i}@one.com", subject="Test") for i in range(5)]
+
+    results = await client.send_many(emails)
+
+    assert all(result.ok for result in results)
+    assert smtp_sink.connections == 3
+
+
+async def test_send_many_retries_temporary_failure(smtp_sink):
+    smtp_sink.rcpt_replies["busy@one.com"] = [451]
+    client = _client(smtp_sink.port, max_connections_per_domain=1)
+
+    with patch("message_sender.email.direct.asyncio.sleep", new=AsyncMock()) as sleep:
+        results = await client.send_many(
+            [Email(message="Test", email_to="busy@one.com", subject="Test")]
+        )
+
+    assert results[0].ok
+    assert len(smtp_sink.received) == 1
+    sleep.assert_awaited_once_with(0)
+
+
+async def test_send_many_gives_up_after_max_attempts(smtp_sink):
+    smtp_sink.rcpt_replies["busy@one.com"] = [451, 451, 451]
+    client = _client(smtp_sink.port, max_attempts=2)
+
+    results = await client.send_many(
+        [
+            Email(message="Test", email_to="busy@one.com", subject="Test"),
+            Email(message="Test", email_to="ok@one.com", subject="Test"),
+        ]
+    )
+
+    failed = [result for result in results if not result.ok]
+    assert len(failed) == 1
+    assert failed[0].item.email_to == "busy@one.com"
+    assert isinstance(failed[0].error, SMTPRecipientsRefused)
+    assert smtp_sink.rcpt_replies["busy@one.com"] == [451]
+
+
+async def test_send_email_permanent_failure(smtp_sink):
+    smtp_sink.rcpt_replies["missing@one.com"] = [550, 550]
+    client = _client(smtp_sink.port)
+
+    with pytest.raises(SMTPRecipientsRefused):
+        await client.send_email(message="Test", email_to="missing@one.com", subject="Test")
+
+    assert smtp_sink.rcpt_replies["missing@one.com"] == [550]
+
+
+async def test_send_many_falls_back_to_next_mx(smtp_sink):
+    resolver = AsyncMock(
+        return_value=[MXRecord(20, "127.0.0.1"), MXRecord(10, "localhost.invalid")]
+    )
+    client = _client(smtp_sink.port, resolver)
+
+    results = await client.send_many([Email(message="Test", email_to="to@one.com", subject="Test")])
+
+    assert results[0].ok
+    assert len(smtp_sink.received) == 1
+
+
+async def test_send_many_unreachable_domain():
+    client = _client(1, max_attempts=2)
+
+    with patch("message_sender.email.direct.asyncio.sleep", new=AsyncMock()):
+        results = await client.send_many(
+            [Email(message="Test", email_to=f"user{i}@one.com", subject="Test") for i in range(3)]
+        )
+
+    assert len(results) == 3
+    assert all(isinstance(result.error, SMTPConnectError) for result in results)
+
+
+async def test_send_many_resolver_error():
+    error = RuntimeError("lookup failed")
+    client = _client(25, AsyncMock(side_effect=error))
+
+    results = await client.send_many([Email(message="Test", email_to="to@one.com", subject="Test")])
+
+    assert results[0].error is error
+
+
+async def test_mx_hosts_cached_for_ttl():
+    resolver = AsyncMock(return_value=[MXRecord(10, "mx2.one.com", 60), MXRecord(5, "mx1.one.com")])
+    client = _client(25, resolver)
+
+    with patch("message_sender.email.direct.time.monotonic", side_effect=[0, 30, 61, 61]):
+        assert await client.mx_hosts("One.com") == ["mx1.one.com", "mx2.one.com"]
+        assert await client.mx_hosts("one.com") == ["mx1.one.com", "mx2.one.com"]
+        await client.mx_hosts("one.com")
+
+    assert resolver.await_count == 2
+
+
+async def test_mx_hosts_no_records_uses_domain():
+    client = _client(25, AsyncMock(return_value=[]))
+
+    assert await client.mx_hosts("one.com") == ["one.com"]
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (SMTPRecipientsRefused([]), True),
+        (SMTPConnectError("down"), True),
+        (ValueError("bad"), False),
+    ],
+)
+def test_is_temporary(error, expected):
+    assert _is_temporary(error) is expected
+
+
+@pytest.mark.parametrize("kwargs", [{"max_domains": 0}, {"max_attempts": 0}])
+def test_invalid_limits(kwargs):
+    with pytest.raises(ValueError):
+        _client(25, **kwargs)
+
+
+async def test_send_email_result(smtp_sink):
+    client = _client(smtp_sink.port)
+
+    result = await client.send_email(message="Test", email_to="to@one.com", subject="Test")
+
+    assert result.status == 250
+    assert result.response == "2.0.0 Ok: queued as ABC123"
+    assert result.attempts == 1
+    assert result.bytes_sent > 0
+    assert set(result.timings) == {"build", "send"}
@@ -0,0 +1,165 @@
+import io
+
+import pytest
+
+from message_sender.email.merge import MailMerge, Template, iter_recipients
+from message_sender.email.models import Email
+from message_sender.email.proton import AsyncProtonEmailClient, ProtonEmailClient
+from message_sender.email.smtp import AsyncSMTPClient, SMTPClient
+from message_sender.transports import FailureTransport, RecordingTransport
+
+RECIPIENTS = [
+    {"email": "ann@example.com", "name": "Ann", "link": "https://example.com/a"},
+    {"email": "bob@example.com", "name": "Bob", "link": "https://example.com/b?x=1&y=2"},
+]
+
+
+def _merge():
+    return MailMerge(
+        subject="Hi {name}",
+        message="Hello {name}, see {link}",
+        html_content="<a href='{link}'>{name}</a>",
+    )
+
+
+def _smtp_client(cls, transport):
+    return cls(
+        smtp_server="smtp.server.com",
+        smtp_port=587,
+        email_from="sender@email.com",
+        transport=transport,
+    )
+
+
+def test_template_render():
+    template = Template("{{literal}} {greeting}, {name}! {name}")
+
+    assert template.fields == {"greeting", "name"}
+    assert template.render({"greeting": "Hi", "name": "Ann"}) == "{literal} Hi, Ann! Ann"
+    assert Template("no variables").render({}) == "no variables"
+    assert Template("{a}{b}").render({"a": 1, "b": None}) == "1None"
+
+
+def test_template_escape():
+    template = Template("<b>{name}</b>", escape=True)
+
+    assert template.render({"name": "<Ann & Bob>"}) == "<b>&lt;Ann &amp; Bob&gt;</b>"
+
+
+@pytest.mark.parametrize(
+    "source", ["{}", "{0}", "{name.attr}", "{name[0]}", "{name:>10}", "{name!r}"]
+)
+def test_template_rejects_complex_fields(source):
+    with pytest.raises(ValueError, match="plain names"):
+        Template(source)
+
+
+def test_template_rejects_unbalanced_braces():
+    with pytest.raises(ValueError):
+        Template("{name")
+
+
+def test_iter_recipients_columns():
+    rows = iter_recipients({"email": ["a@example.com", "b@example.com"], "name": ["A", "B"]})
+
+    assert list(rows) == [
+        {"email": "a@example.com", "name": "A"},
+        {"email": "b@example.com", "name": "B"},
+    ]
+
+
+def test_iter_recipients_columns_must_be_same_length():
+    with pytest.raises(ValueError):
+        list(iter_recipients({"email": ["a@example.com", "b@example.com"], "name": ["A"]}))
+
+
+def test_iter_recipients_csv(tmp_path):
+    path = tmp_path / "recipients.csv"
+    path.write_text("email,name\na@example.com,Ann\nb@example.com\n", encoding="utf-8")
+
+    assert list(iter_recipients(path)) == [
+        {"email": "a@example.com", "name": "Ann"},
+        {"email": "b@example.com", "name": ""},
+    ]
+    assert list(iter_recipients(str(path))) == list(iter_recipients(io.StringIO(path.read_text())))
+
+
+def test_iter_recipients_is_lazy():
+    def rows():
+        yield RECIPIENTS[0]
+        raise AssertionError("read too far")
+
+    assert next(iter_recipients(rows())) == RECIPIENTS[0]
+
+
+def test_mail_merge_render():
+    email = _merge().render(RECIPIENTS[1])
+
+    assert email == Email(
+        message="Hello Bob, see https://example.com/b?x=1&y=2",
+        email_to="bob@example.com",
+        subject="Hi Bob",
+        html_content="<a href='https://example.com/b?x=1&amp;y=2'>Bob</a>",
+    )
+
+
+def test_mail_merge_missing_variable():
+    merge = MailMerge(subject="Hi {name}", message="{code}", email_to="address")
+
+    assert merge.fields == {"name", "code", "address"}
+    with pytest.raises(ValueError, match="address, code"):
+        merge.render({"name": "Ann"})
+
+
+def test_mail_merge_without_html():
+    emails = list(MailMerge(subject="Hi", message="{name}").emails(RECIPIENTS))
+
+    assert [email.html_content for email in emails] == [None, None]
+    assert [email.message for email in emails] == ["Ann", "Bob"]
+
+
+async def test_async_smtp_send_merge():
+    transport = RecordingTransport()
+
+    async with _smtp_client(AsyncSMTPClient, transport) as client:
+        results = [result async for result in client.send_merge(_merge(), RECIPIENTS)]
+
+    assert all(result.ok for result in results)
+    assert {result.item.email_to for result in results} == {"ann@example.com", "bob@example.com"}
+    assert sorted(msg["Subject"] for msg in transport.messages) == ["Hi Ann", "Hi Bob"]
+
+
+async def test_async_proton_send_merge_columns():
+    transport = RecordingTransport()
+    columns = {key: [row[key] for row in RECIPIENTS] for key in RECIPIENTS[0]}
+
+    async with AsyncProtonEmailClient(
+        "me@proton.me", "token", messages_per_second=None, transport=transport
+    ) as client:
+        results = [result async for result in client.send_merge(_merge(), columns, max_in_flight=1)]
+
+    assert [result.item.email_to for result in results] == ["ann@example.com", "bob@example.com"]
+    assert transport.messages[0].get_body(("plain",)).get_content().strip() == (
+        "Hello Ann, see https://example.com/a"
+    )
+
+
+def test_sync_smtp_send_merge_reports_failures():
+    results = list(_smtp_client(SMTPClient, FailureTransport(1.0)).send_merge(_merge(), RECIPIENTS))
+
+    assert [result.ok for result in results] == [False, False]
+    assert results[0].item.email_to == "ann@example.com"
+
+
+def test_sync_proton_send_merge(tmp_path):
+    path = tmp_path / "recipients.csv"
+    path.write_text("email,name,link\nann@example.com,Ann,https://example.com/a\n")
+    transport = RecordingTransport()
+
+    with ProtonEmailClient(
+        "me@proton.me", "token", messages_per_second=None, transport=transport
+    ) as client:
+        results = list(client.send_merge(_merge(), path))
+
+    assert [result.result.status for result in results] == [250]
+    assert transport.messages[0]["To"] == "ann@example.com"
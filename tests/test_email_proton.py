@@ -1,6 +1,11 @@
+import smtplib
 from email.message import EmailMessage
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from aiosmtplib import SMTPServerDisconnected
+
+from message_sender.email.connection import shared_tls_context
+from message_sender.email.models import Email
 from message_sender.email.proton import AsyncProtonEmailClient, ProtonEmailClient
 
 
@@ -9,7 +14,7 @@ def test_send_email_plain_text() -> None:
     mock_smtp.__enter__ = MagicMock(return_value=mock_smtp)
     mock_smtp.__exit__ = MagicMock(return_value=False)
 
-    with patch("message_sender.email.proton.smtplib.SMTP", return_value=mock_smtp):
+    with patch("message_sender.email.proton.CachedSMTP", return_value=mock_smtp):
         client = ProtonEmailClient(email_address="sender@proton.me", smtp_token="test-token")
         client.send_email(
             message="Hello, World!",
@@ -33,7 +38,7 @@ def test_send_email_with_html() -> None:
     mock_smtp.__enter__ = MagicMock(return_value=mock_smtp)
     mock_smtp.__exit__ = MagicMock(return_value=False)
 
-    with patch("message_sender.email.proton.smtplib.SMTP", return_value=mock_smtp):
+    with patch("message_sender.email.proton.CachedSMTP", return_value=mock_smtp):
         client = ProtonEmailClient(email_address="sender@proton.me", smtp_token="test-token")
         client.send_email(
             message="Hello, World!",
@@ -53,9 +58,7 @@ def test_smtp_connection_parameters() -> None:
     mock_smtp.__enter__ = MagicMock(return_value=mock_smtp)
     mock_smtp.__exit__ = MagicMock(return_value=False)
 
-    with patch(
-        "message_sender.email.proton.smtplib.SMTP", return_value=mock_smtp
-    ) as mock_smtp_class:
+    with patch("message_sender.email.proton.CachedSMTP", return_value=mock_smtp) as mock_smtp_class:
         client = ProtonEmailClient(email_address="sender@proton.me", smtp_token="test-token")
         client.send_email(
             message="Hello",
@@ -72,7 +75,7 @@ async def test_async_send_email_plain_text() -> None:
     mock_smtp.__aexit__ = AsyncMock(return_value=False)
     mock_smtp.send_message = AsyncMock()
 
-    with patch("message_sender.email.proton.SMTP", return_value=mock_smtp):
+    with patch("message_sender.email.proton.CachedAsyncSMTP", return_value=mock_smtp):
         client = AsyncProtonEmailClient(email_address="sender@proton.me", smtp_token="test-token")
         await client.send_email(
             message="Hello, World!",
@@ -95,7 +98,7 @@ async def test_async_send_email_with_html() -> None:
     mock_smtp.__aexit__ = AsyncMock(return_value=False)
     mock_smtp.send_message = AsyncMock()
 
-    with patch("message_sender.email.proton.SMTP", return_value=mock_smtp):
+    with patch("message_sender.email.proton.CachedAsyncSMTP", return_value=mock_smtp):
         client = AsyncProtonEmailClient(email_address="sender@proton.me", smtp_token="test-token")
         await client.send_email(
             message="Hello, World!",
@@ -116,7 +119,9 @@ async def test_aync_smtp_connection_parameters() -> None:
     mock_smtp.__aexit__ = AsyncMock(return_value=False)
     mock_smtp.send_message = AsyncMock()
 
-    with patch("message_sender.email.proton.SMTP", return_value=mock_smtp) as mock_smtp_class:
+    with patch(
+        "message_sender.email.proton.CachedAsyncSMTP", return_value=mock_smtp
+    ) as mock_smtp_class:
         client = AsyncProtonEmailClient(email_address="sender@proton.me", smtp_token="test-token")
         await client.send_email(
             message="Hello",
@@ -130,4 +135,135 @@ async def test_aync_smtp_connection_parameters() -> None:
         username="sender@proton.me",
         password="test-token",
         start_tls=True,
+        tls_context=shared_tls_context(),
     )
+
+
+def test_session_reuses_connection() -> None:
+    mock_smtp = MagicMock()
+
+    with patch("message_sender.email.proton.CachedSMTP", return_value=mock_smtp) as mock_smtp_class:
+        with ProtonEmailClient(
+            email_address="sender@proton.me", smtp_token="test-token", messages_per_second=None
+        ) as client:
+            for _ in range(3):
+                client.send_email(message="Hello", email_to="recipient@example.com", subject="Test")
+
+    mock_smtp_class.assert_called_once_with("smtp.protonmail.ch", 587)
+    mock_smtp.starttls.assert_called_once()
+    mock_smtp.login.assert_called_once_with("sender@proton.me", "test-token")
+    assert mock_smtp.send_message.call_count == 3
+    mock_smtp.quit.assert_called_once()
+
+
+def test_session_reconnects_on_disconnect() -> None:
+    dropped_smtp = MagicMock()
+    dropped_smtp.send_message.side_effect = smtplib.SMTPServerDisconnected()
+    new_smtp = MagicMock()
+
+    with patch(
+        "message_sender.email.proton.CachedSMTP", side_effect=[dropped_smtp, new_smtp]
+    ) as mock_smtp_class:
+        with ProtonEmailClient(
+            email_address="sender@proton.me", smtp_token="test-token", messages_per_second=None
+        ) as client:
+            client.send_email(message="Hello", email_to="recipient@example.com", subject="Test")
+
+    assert mock_smtp_class.call_count == 2
+    new_smtp.login.assert_called_once_with("sender@proton.me", "test-token")
+    new_smtp.send_message.assert_called_once()
+
+
+async def test_async_session_reuses_connection() -> None:
+    mock_smtp = MagicMock()
+    mock_smtp.connect = AsyncMock()
+    mock_smtp.quit = AsyncMock()
+    mock_smtp.send_message = AsyncMock()
+    mock_smtp.is_connected = True
+
+    with patch(
+        "message_sender.email.proton.CachedAsyncSMTP", return_value=mock_smtp
+    ) as mock_smtp_class:
+        async with AsyncProtonEmailClient(
+            email_address="sender@proton.me", smtp_token="test-token", messages_per_second=None
+        ) as client:
+            for _ in range(3):
+                await client.send_email(
+                    message="Hello", email_to="recipient@example.com", subject="Test"
+                )
+
+    mock_smtp_class.assert_called_once()
+    mock_smtp.connect.assert_called_once()
+    assert mock_smtp.send_message.call_count == 3
+    mock_smtp.quit.assert_called_once()
+
+
+async def test_async_session_reconnects_on_disconnect() -> None:
+    dropped_smtp = MagicMock()
+    dropped_smtp.connect = AsyncMock()
+    dropped_smtp.send_message = AsyncMock(side_effect=SMTPServerDisconnected("dropped"))
+    dropped_smtp.is_connected = True
+    new_smtp = MagicMock()
+    new_smtp.connect = AsyncMock()
+    new_smtp.quit = AsyncMock()
+    new_smtp.send_message = AsyncMock()
+    new_smtp.last_reply_code = 250
+    new_smtp.last_reply_message = "2.0.0 Ok: queued as ABC123"
+    new_smtp.last_message_size = 321
+
+    with patch(
+        "message_sender.email.proton.CachedAsyncSMTP", side_effect=[dropped_smtp, new_smtp]
+    ) as mock_smtp_class:
+        async with AsyncProtonEmailClient(
+            email_address="sender@proton.me", smtp_token="test-token", messages_per_second=None
+        ) as client:
+            result = await client.send_email(
+                message="Hello", email_to="recipient@example.com", subject="Test"
+            )
+
+    assert mock_smtp_class.call_count == 2
+    new_smtp.connect.assert_called_once()
+    new_smtp.send_message.assert_called_once()
+    assert result.attempts == 2
+    assert result.status == 250
+    assert result.response == "2.0.0 Ok: queued as ABC123"
+    assert result.bytes_sent == 321
+    assert set(result.timings) == {"build", "wait", "connect", "send"}
+
+
+async def test_async_send_email_is_paced() -> None:
+    mock_smtp = MagicMock()
+    mock_smtp.__aenter__ = AsyncMock(return_value=mock_smtp)
+    mock_smtp.__aexit__ = AsyncMock(return_value=False)
+    mock_smtp.send_message = AsyncMock()
+
+    with (
+        patch("message_sender.email.proton.CachedAsyncSMTP", return_value=mock_smtp),
+        patch("message_sender._pacer.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+    ):
+        client = AsyncProtonEmailClient(
+            email_address="sender@proton.me", smtp_token="test-token", messages_per_second=1
+        )
+        for _ in range(6):
+            await client.send_email(
+                message="Hello", email_to="recipient@example.com", subject="Test"
+            )
+
+    mock_sleep.assert_called_once()
+
+
+async def test_async_send_stream() -> None:
+    mock_smtp = MagicMock()
+    mock_smtp.__aenter__ = AsyncMock(return_value=mock_smtp)
+    mock_smtp.__aexit__ = AsyncMock(return_value=False)
+    mock_smtp.send_message = AsyncMock()
+    emails = [Email(message="Hello", email_to=f"{i}@example.com", subject="Test") for i in range(3)]
+
+    with patch("message_sender.email.proton.CachedAsyncSMTP", return_value=mock_smtp):
+        client = AsyncProtonEmailClient(
+            email_address="sender@proton.me", smtp_token="test-token", messages_per_second=None
+        )
+        results = [result async for result in client.send_stream(emails)]
+
+    assert all(result.ok for result in results)
+    assert mock_smtp.send_message.call_count == 3
@@ -0,0 +1,118 @@
+import queue
+
+import pytest
+
+from message_sender.email.models import Email
+from message_sender.email.sharded import ShardedSMTPSender, _work
+
+
+class FakeClient:
+    async def __aenter__(self) -> "FakeClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def send_email(
+        self, *, message: str, email_to: str, subject: str, html_content: str | None = None
+    ) -> None:
+        if email_to.startswith("fail"):
+            raise ValueError(email_to)
+
+
+class FailingConnectClient(FakeClient):
+    async def __aenter__(self) -> "FakeClient":
+        raise ConnectionError("Unable to connect")
+
+
+def _emails(count: int):
+    for i in range(count):
+        email_to = f"fail{i}@example.com" if i % 10 == 0 else f"user{i}@example.com"
+        yield Email(message="Hello", email_to=email_to, subject="Test")
+
+
+def test_send_many() -> None:
+    sender = ShardedSMTPSender(
+        smtp_server="smtp.server.com",
+        smtp_port=587,
+        email_from="sender@email.com",
+        processes=2,
+        connections_per_process=2,
+        batch_size=7,
+        client_factory=FakeClient,
+    )
+    report = sender.send_many(_emails(100))
+
+    assert report.sent == 90
+    assert report.failed == 10
+    assert [sequence for sequence, _ in report.failures] == list(range(0, 100, 10))
+    assert "fail0@example.com" in report.failures[0][1]
+    assert len(report.workers) == 2
+    assert sum(worker.sent for worker in report.workers) == 90
+    assert report.emails_per_second > 0
+
+
+def test_context_manager() -> None:
+    with ShardedSMTPSender(
+        smtp_server="smtp.server.com",
+        smtp_port=587,
+        email_from="sender@email.com",
+        processes=1,
+        client_factory=FakeClient,
+    ) as sender:
+        sequences = [sender.submit(email) for email in _emails(5)]
+
+    assert sequences == [0, 1, 2, 3, 4]
+    assert sender.report is not None
+    assert sender.report.sent == 4
+    assert sender.close() is sender.report
+
+
+def test_connect_failure_fails_emails() -> None:
+    sender = ShardedSMTPSender(
+        smtp_server="smtp.server.com",
+        smtp_port=587,
+        email_from="sender@email.com",
+        processes=1,
+        connections_per_process=2,
+        client_factory=FailingConnectClient,
+    )
+    report = sender.send_many(_emails(5))
+
+    assert report.sent == 0
+    assert report.failed == 5
+    assert "Unable to connect" in report.failures[0][1]
+
+
+def test_submit_before_start() -> None:
+    sender = ShardedSMTPSender(
+        smtp_server="smtp.server.com", smtp_port=587, email_from="sender@email.com"
+    )
+
+    with pytest.raises(RuntimeError):
+        sender.submit(Email(message="Hello", email_to="user@example.com", subject="Test"))
+
+    with pytest.raises(RuntimeError):
+        sender.close()
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"processes": 0}, {"connections_per_process": 0}, {"batch_size": 0}]
+)
+def test_invalid_settings(kwargs) -> None:
+    with pytest.raises(ValueError):
+        ShardedSMTPSender(
+            smtp_server="smtp.server.com", smtp_port=587, email_from="sender@email.com", **kwargs
+        )
+
+
+async def test_worker_drains_queue() -> None:
+    tasks: queue.Queue = queue.Queue()
+    tasks.put(list(enumerate(_emails(15))))
+    tasks.put(None)
+
+    stats = await _work(FakeClient, 3, tasks)
+
+    assert stats.sent == 13
+    assert stats.failed == 2
+    assert [sequence for sequence, _ in stats.failures] == [0, 10]
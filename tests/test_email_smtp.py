@@ -1,6 +1,10 @@
 from email.message import EmailMessage
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from aiosmtplib import SMTPServerDisconnected
+
+from message_sender.email.connection import shared_tls_context
+from message_sender.email.models import Email
 from message_sender.email.smtp import AsyncSMTPClient, SMTPClient
 
 
@@ -9,7 +13,7 @@ def test_send_email_plain_text() -> None:
     mock_smtp.__enter__ = MagicMock(return_value=mock_smtp)
     mock_smtp.__exit__ = MagicMock(return_value=False)
 
-    with patch("message_sender.email.smtp.smtplib.SMTP", return_value=mock_smtp):
+    with patch("message_sender.email.smtp.CachedSMTP", return_value=mock_smtp):
         client = SMTPClient(
             smtp_server="smtp.server.com",
             smtp_port=587,
@@ -39,7 +43,7 @@ def test_send_email_with_html() -> None:
     mock_smtp.__enter__ = MagicMock(return_value=mock_smtp)
     mock_smtp.__exit__ = MagicMock(return_value=False)
 
-    with patch("message_sender.email.smtp.smtplib.SMTP", return_value=mock_smtp):
+    with patch("message_sender.email.smtp.CachedSMTP", return_value=mock_smtp):
         client = SMTPClient(
             smtp_server="smtp.server.com",
             smtp_port=587,
@@ -65,7 +69,7 @@ def test_smtp_connection_parameters() -> None:
     mock_smtp.__enter__ = MagicMock(return_value=mock_smtp)
     mock_smtp.__exit__ = MagicMock(return_value=False)
 
-    with patch("message_sender.email.smtp.smtplib.SMTP", return_value=mock_smtp) as mock_smtp_class:
+    with patch("message_sender.email.smtp.CachedSMTP", return_value=mock_smtp) as mock_smtp_class:
         client = SMTPClient(
             smtp_server="smtp.server.com",
             smtp_port=587,
@@ -88,7 +92,7 @@ def test_smtp_port_465_uses_implicit_tls() -> None:
     mock_smtp.__exit__ = MagicMock(return_value=False)
 
     with patch(
-        "message_sender.email.smtp.smtplib.SMTP_SSL", return_value=mock_smtp
+        "message_sender.email.smtp.CachedSMTPSSL", return_value=mock_smtp
     ) as mock_smtp_ssl_class:
         client = SMTPClient(
             smtp_server="smtp.server.com",
@@ -103,7 +107,9 @@ def test_smtp_port_465_uses_implicit_tls() -> None:
             subject="Test",
         )
 
-    mock_smtp_ssl_class.assert_called_once_with("smtp.server.com", 465)
+    mock_smtp_ssl_class.assert_called_once_with(
+        "smtp.server.com", 465, context=shared_tls_context()
+    )
     mock_smtp.login.assert_called_once_with("test-user", "test-password")
     mock_smtp.send_message.assert_called_once()
 
@@ -114,7 +120,7 @@ async def test_async_send_email_plain_text() -> None:
     mock_smtp.__aexit__ = AsyncMock(return_value=False)
     mock_smtp.send_message = AsyncMock()
 
-    with patch("message_sender.email.smtp.SMTP", return_value=mock_smtp):
+    with patch("message_sender.email.smtp.CachedAsyncSMTP", return_value=mock_smtp):
         client = AsyncSMTPClient(
             smtp_server="smtp.server.com",
             smtp_port=587,
@@ -143,7 +149,7 @@ async def test_async_send_email_with_html() -> None:
     mock_smtp.__aexit__ = AsyncMock(return_value=False)
     mock_smtp.send_message = AsyncMock()
 
-    with patch("message_sender.email.smtp.SMTP", return_value=mock_smtp):
+    with patch("message_sender.email.smtp.CachedAsyncSMTP", return_value=mock_smtp):
         client = AsyncSMTPClient(
             smtp_server="smtp.server.com",
             smtp_port=587,
@@ -170,7 +176,9 @@ async def test_async_smtp_connection_parameters() -> None:
     mock_smtp.__aexit__ = AsyncMock(return_value=False)
     mock_smtp.send_message = AsyncMock()
 
-    with patch("message_sender.email.smtp.SMTP", return_value=mock_smtp) as mock_smtp_class:
+    with patch(
+        "message_sender.email.smtp.CachedAsyncSMTP", return_value=mock_smtp
+    ) as mock_smtp_class:
         client = AsyncSMTPClient(
             smtp_server="smtp.server.com",
             smtp_port=587,
@@ -191,6 +199,7 @@ async def test_async_smtp_connection_parameters() -> None:
         password="test-password",
         use_tls=False,
         start_tls=True,
+        tls_context=shared_tls_context(),
     )
 
 
@@ -200,7 +209,9 @@ async def test_async_smtp_port_465_uses_implicit_tls() -> None:
     mock_smtp.__aexit__ = AsyncMock(return_value=False)
     mock_smtp.send_message = AsyncMock()
 
-    with patch("message_sender.email.smtp.SMTP", return_value=mock_smtp) as mock_smtp_class:
+    with patch(
+        "message_sender.email.smtp.CachedAsyncSMTP", return_value=mock_smtp
+    ) as mock_smtp_class:
         client = AsyncSMTPClient(
             smtp_server="smtp.server.com",
             smtp_port=465,
@@ -221,4 +232,106 @@ async def test_async_smtp_port_465_uses_implicit_tls() -> None:
         password="test-password",
         use_tls=True,
         start_tls=False,
+        tls_context=shared_tls_context(),
     )
+
+
+async def test_async_session_reuses_connection() -> None:
+    mock_smtp = MagicMock()
+    mock_smtp.connect = AsyncMock()
+    mock_smtp.quit = AsyncMock()
+    mock_smtp.send_message = AsyncMock()
+    mock_smtp.is_connected = True
+
+    with patch(
+        "message_sender.email.smtp.CachedAsyncSMTP", return_value=mock_smtp
+    ) as mock_smtp_class:
+        async with AsyncSMTPClient(
+            smtp_server="smtp.server.com",
+            smtp_port=587,
+            email_from="sender@email.com",
+            user_name="test-user",
+            password="test-password",
+        ) as client:
+            for _ in range(3):
+                await client.send_email(
+                    message="Hello", email_to="recipient@example.com", subject="Test"
+                )
+
+    mock_smtp_class.assert_called_once()
+    mock_smtp.connect.assert_called_once()
+    assert mock_smtp.send_message.call_count == 3
+    mock_smtp.quit.assert_called_once()
+
+
+async def test_async_session_reconnects_on_disconnect() -> None:
+    dropped_smtp = MagicMock()
+    dropped_smtp.connect = AsyncMock()
+    dropped_smtp.send_message = AsyncMock(side_effect=SMTPServerDisconnected("dropped"))
+    dropped_smtp.is_connected = True
+    new_smtp = MagicMock()
+    new_smtp.connect = AsyncMock()
+    new_smtp.quit = AsyncMock()
+    new_smtp.send_message = AsyncMock()
+    new_smtp.last_reply_code = 250
+    new_smtp.last_reply_message = "2.0.0 Ok: queued as ABC123"
+    new_smtp.last_message_size = 321
+
+    with patch(
+        "message_sender.email.smtp.CachedAsyncSMTP", side_effect=[dropped_smtp, new_smtp]
+    ) as mock_smtp_class:
+        async with AsyncSMTPClient(
+            smtp_server="smtp.server.com", smtp_port=587, email_from="sender@email.com"
+        ) as client:
+            result = await client.send_email(
+                message="Hello", email_to="recipient@example.com", subject="Test"
+            )
+
+    assert mock_smtp_class.call_count == 2
+    new_smtp.send_message.assert_called_once()
+    assert result.attempts == 2
+    assert result.status == 250
+    assert result.response == "2.0.0 Ok: queued as ABC123"
+    assert result.bytes_sent == 321
+    assert set(result.timings) == {"build", "wait", "connect", "send"}
+
+
+async def test_async_send_stream() -> None:
+    mock_smtp = MagicMock()
+    mock_smtp.__aenter__ = AsyncMock(return_value=mock_smtp)
+    mock_smtp.__aexit__ = AsyncMock(return_value=False)
+    mock_smtp.send_message = AsyncMock(side_effect=[None, ValueError("refused")])
+    emails = [
+        Email(message="Hello", email_to="recipient@example.com", subject="Test"),
+        Email(message="Hello", email_to="other@example.com", subject="Test"),
+    ]
+
+    with patch("message_sender.email.smtp.CachedAsyncSMTP", return_value=mock_smtp):
+        client = AsyncSMTPClient(
+            smtp_server="smtp.server.com", smtp_port=587, email_from="sender@email.com"
+        )
+        results = [result async for result in client.send_stream(emails, max_in_flight=1)]
+
+    assert [result.ok for result in results] == [True, False]
+    assert results[1].item.email_to == "other@example.com"
+
+
+def test_send_email_result() -> None:
+    mock_smtp = MagicMock()
+    mock_smtp.__enter__ = MagicMock(return_value=mock_smtp)
+    mock_smtp.__exit__ = MagicMock(return_value=False)
+    mock_smtp.last_reply_code = 250
+    mock_smtp.last_reply_message = "2.0.0 Ok: queued as ABC123"
+    mock_smtp.last_message_size = 123
+
+    with patch("message_sender.email.smtp.CachedSMTP", return_value=mock_smtp):
+        client = SMTPClient(
+            smtp_server="smtp.server.com", smtp_port=587, email_from="sender@email.com"
+        )
+        result = client.send_email(message="Hello", email_to="recipient@example.com", subject="Hi")
+
+    assert result.status == 250
+    assert result.response == "2.0.0 Ok: queued as ABC123"
+    assert result.attempts == 1
+    assert result.bytes_sent == 123
+    assert set(result.timings) == {"build", "connect", "send"}
@@ -0,0 +1,233 @@
+import httpx2
+import pytest
+
+from message_sender.discord import AsyncDiscordClient, DiscordClient
+from message_sender.email.direct import AsyncDirectSMTPClient, MXRecord
+from message_sender.email.proton import ProtonEmailClient
+from message_sender.email.smtp import AsyncSMTPClient, SMTPClient
+from message_sender.factory import AsyncClientFactory, ClientFactory
+from message_sender.google_chat import AsyncGoogleChatClient, GoogleChatClient
+from message_sender.limiter import AdaptiveLimiter
+from message_sender.transports import LocalTransport, RecordingTransport
+
+SMTP_SETTINGS = {
+    "type": "smtp",
+    "smtp_server": "smtp.server.com",
+    "smtp_port": 587,
+    "email_from": "sender@email.com",
+    "user_name": "test-user",
+    "password": "test-password",
+}
+
+
+def test_factory_builds_clients_from_dict():
+    factory = AsyncClientFactory(
+        {
+            "alerts": {"type": "discord", "webhook_url": "https://discord.com/api/webhooks/1/a"},
+            "chat": {"type": "google_chat", "webhook_url": "https://chat.googleapis.com/v1/a"},
+            "mail": SMTP_SETTINGS | {"limiter": {"initial_limit": 2, "max_limit": 20}},
+            "direct": {"type": "direct", "email_from": "sender@email.com"},
+        }
+    )
+
+    assert isinstance(factory["alerts"], AsyncDiscordClient)
+    assert isinstance(factory["chat"], AsyncGoogleChatClient)
+    assert isinstance(factory["direct"], AsyncDirectSMTPClient)
+    mail = factory["mail"]
+    assert isinstance(mail, AsyncSMTPClient)
+    assert mail.smtp_port == 587
+    assert isinstance(mail._limiter, AdaptiveLimiter)
+    assert mail._limiter.limit == 2
+
+
+def test_factory_builds_clients_from_toml(tmp_path):
+    path = tmp_path / "message_sender.toml"
+    path.write_text(
+        """
+[clients.alerts]
+type = "discord"
+webhook_url = "https://discord.com/api/webhooks/1/a"
+
+[clients.proton]
+type = "proton"
+email_address = "me@proton.me"
+smtp_token = "token"
+messages_per_second = 2.5
+
+[clients.proton.transport]
+failure_rate = 0.5
+seed = 1
+"""
+    )
+
+    factory = ClientFactory.from_toml(path)
+
+    assert isinstance(factory["alerts"], DiscordClient)
+    proton = factory["proton"]
+    assert isinstance(proton, ProtonEmailClient)
+    assert isinstance(proton._transport, LocalTransport)
+    assert proton._transport.failure_rate == 0.5
+
+
+def test_factory_builds_clients_from_env():
+    factory = ClientFactory.from_env(
+        environ={
+            "MESSAGE_SENDER_MAIL__TYPE": "smtp",
+            "MESSAGE_SENDER_MAIL__SMTP_SERVER": "smtp.server.com",
+            "MESSAGE_SENDER_MAIL__SMTP_PORT": "465",
+            "MESSAGE_SENDER_MAIL__EMAIL_FROM": "sender@email.com",
+            "MESSAGE_SENDER_MAIL__PASSWORD": "12345",
+            "MESSAGE_SENDER_MAIL__TRANSPORT__LATENCY": "0.5",
+            "MESSAGE_SENDER_MAIL__TRANSPORT__RECORD": "true",
+            "MESSAGE_SENDER_CHAT__TYPE": "google_chat",
+            "MESSAGE_SENDER_CHAT__WEBHOOK_URL": "https://chat.googleapis.com/v1/a",
+            "MESSAGE_SENDER_LOG_LEVEL": "debug",
+            "OTHER__TYPE": "discord",
+        }
+    )
+
+    assert sorted(factory.clients) == ["chat", "mail"]
+    assert isinstance(factory["chat"], GoogleChatClient)
+    mail = factory["mail"]
+    assert isinstance(mail, SMTPClient)
+    assert mail.smtp_port == 465
+    assert mail.password == "12345"
+    assert mail._transport.latency == 0.5
+    assert mail._transport.record is True
+
+
+def test_factory_proton_messages_per_second_none_from_env():
+    factory = AsyncClientFactory.from_env(
+        prefix="APP_",
+        environ={
+            "APP_PROTON__TYPE": "proton",
+            "APP_PROTON__EMAIL_ADDRESS": "me@proton.me",
+            "APP_PROTON__SMTP_TOKEN": "token",
+            "APP_PROTON__MESSAGES_PER_SECOND": "none",
+        },
+    )
+
+    assert factory["proton"]._pacer is None
+
+
+@pytest.mark.parametrize(
+    ("config", "match"),
+    [
+        ({"a": {"webhook_url": "https://x"}}, "unknown type None"),
+        ({"a": {"type": "teams", "webhook_url": "https://x"}}, "unknown type 'teams'"),
+        ({"a": {"type": "discord", "url": "https://x"}}, "Unknown setting 'url'"),
+        ({"a": {"type": "discord"}}, "missing a required argument"),
+        ({"a": SMTP_SETTINGS | {"smtp_port": "abc"}}, "Invalid setting 'smtp_port'"),
+        ({"a": SMTP_SETTINGS | {"transport": {"record": "maybe"}}}, "Expected a boolean"),
+        ({"a": SMTP_SETTINGS | {"limiter": {"max_limit": 20}}}, "Unknown setting 'limiter'"),
+        ({"a": {"type": "direct", "email_from": "sender@email.com"}}, "unknown type 'direct'"),
+    ],
+)
+def test_factory_rejects_bad_config(config, match):
+    with pytest.raises(ValueError, match=match):
+        ClientFactory(config)
+
+
+async def test_async_factory_warm_up_and_close():
+    transport = RecordingTransport()
+    factory = AsyncClientFactory(
+        {
+            "alerts": {"type": "discord", "webhook_url": "https://discord.com/api/webhooks/1/a"},
+            "mail": SMTP_SETTINGS,
+        }
+    )
+    factory["alerts"]._client = httpx2.AsyncClient(transport=transport)
+    factory["mail"]._transport = transport
+
+    async with factory:
+        await factory.warm_up()
+
+        assert [request.method for request in transport.requests] == ["GET"]
+        assert factory["mail"]._smtp is not None
+
+    assert factory["mail"]._smtp is None
+    assert factory["alerts"]._client.is_closed
+
+
+async def test_async_factory_warm_up_selected_clients():
+    calls = []
+
+    async def resolver(domain):
+        calls.append(domain)
+        return [MXRecord(0, f"mx.{domain}")]
+
+    factory = AsyncClientFactory({"mail": SMTP_SETTINGS | {"transport": {"record": True}}})
+    factory.clients["direct"] = AsyncDirectSMTPClient("sender@email.com", resolver=resolver)
+
+    await factory.warm_up("direct")
+
+    assert factory["mail"]._smtp is None
+    await factory["direct"].warm_up(["one.com", "one.com", "two.com"])
+    assert sorted(calls) == ["one.com", "two.com"]
+    await factory.close()
+
+
+def test_sync_factory_warm_up():
+    transport = RecordingTransport()
+    factory = ClientFactory(
+        {
+            "chat": {"type": "google_chat", "webhook_url": "https://chat.googleapis.com/v1/a"},
+            "mail": SMTP_SETTINGS,
+            "proton": {
+                "type": "proton",
+                "email_address": "me@proton.me",
+                "smtp_token": "token",
+                "transport": {},
+            },
+        }
+    )
+    factory["chat"]._client = httpx2.Client(transport=transport)
+    factory["mail"]._transport = transport
+
+    with factory:
+        factory.warm_up()
+
+        assert [request.method for request in transport.requests] == ["HEAD"]
+        assert factory["proton"]._smtp is not None
+
+    assert factory["proton"]._smtp is None
+    assert transport.messages == []
+
+
+def test_discord_warm_up_checks_webhook():
+    def handler(request):
+        return httpx2.Response(404 if request.url.path.endswith("/bad") else 200)
+
+    transport = httpx2.MockTransport(handler)
+
+    DiscordClient("https://discord.com/api/webhooks/1/good", transport=transport).warm_up()
+    with pytest.raises(httpx2.HTTPStatusError):
+        DiscordClient("https://discord.com/api/webhooks/1/bad", transport=transport).warm_up()
+
+
+async def test_google_chat_warm_up_ignores_status():
+    transport = httpx2.MockTransport(lambda request: httpx2.Response(405))
+
+    async with AsyncGoogleChatClient(
+        "https://chat.googleapis.com/v1/a", transport=transport
+    ) as client:
+        await client.warm_up()
+
+
+async def test_smtp_warm_up_keeps_session_open():
+    transport = RecordingTransport()
+    client = AsyncSMTPClient(
+        smtp_server="smtp.server.com",
+        smtp_port=587,
+        email_from="sender@email.com",
+        transport=transport,
+    )
+
+    await client.warm_up()
+    smtp = client._smtp
+    await client.warm_up()
+    result = await client.send_email(message="Hello", email_to="a@example.com", subject="Hi")
+
+    assert client._smtp is smtp
+    assert "connect" not in result.timings
+    await client.close()
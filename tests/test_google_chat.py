@@ -1,6 +1,10 @@
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx2
+import pytest
+
 from message_sender.google_chat import AsyncGoogleChatClient, GoogleChatClient
+from message_sender.splitting import MessageTooLongError
 
 
 def test_send_message() -> None:
@@ -57,3 +61,118 @@ async def test_async_context_manager() -> None:
             await client.send_message("test message")
 
     mock_client.aclose.assert_called_once()
+
+
+async def test_async_send_stream() -> None:
+    mock_client = MagicMock()
+    mock_client.post = AsyncMock(return_value=MagicMock())
+    mock_client.aclose = AsyncMock()
+
+    with patch("message_sender.google_chat.AsyncClient", return_value=mock_client):
+        async with AsyncGoogleChatClient("https://example.com/webhook") as client:
+            results = [result async for result in client.send_stream(["a", "b", "c"])]
+
+    assert sorted(result.item for result in results) == ["a", "b", "c"]
+    assert mock_client.post.call_count == 3
+
+
+async def test_async_send_message_splits_into_thread() -> None:
+    mock_client = MagicMock()
+    mock_client.post = AsyncMock(return_value=MagicMock())
+    mock_client.aclose = AsyncMock()
+    message = "word " * 2000
+
+    with patch("message_sender.google_chat.AsyncClient", return_value=mock_client):
+        async with AsyncGoogleChatClient("https://example.com/webhook") as client:
+            await client.send_message(message)
+
+    calls = mock_client.post.call_args_list
+    assert len(calls) == 3
+    assert all(len(call.kwargs["json"]["text"]) <= 4096 for call in calls)
+    assert " ".join(call.kwargs["json"]["text"] for call in calls).split() == message.split()
+    assert len({call.kwargs["json"]["thread"]["threadKey"] for call in calls}) == 1
+    assert all(
+        call.kwargs["params"] == {"messageReplyOption": "REPLY_MESSAGE_FALLBACK_TO_NEW_THREAD"}
+        for call in calls
+    )
+
+
+def test_send_message_thread_key() -> None:
+    mock_client = MagicMock()
+
+    with patch("message_sender.google_chat.Client", return_value=mock_client):
+        with GoogleChatClient("https://example.com/webhook") as client:
+            client.send_message("Hello", thread_key="alerts")
+
+    mock_client.post.assert_called_once_with(
+        "https://example.com/webhook",
+        json={"text": "Hello", "thread": {"threadKey": "alerts"}},
+        params={"messageReplyOption": "REPLY_MESSAGE_FALLBACK_TO_NEW_THREAD"},
+    )
+
+
+@pytest.mark.parametrize(
+    "message, overflow, error",
+    [
+        ("x" * 4097, "error", MessageTooLongError),
+        ("x" * 4097, "attach", ValueError),
+        ("", "split", ValueError),
+    ],
+)
+def test_send_message_invalid_not_sent(message, overflow, error) -> None:
+    mock_client = MagicMock()
+
+    with patch("message_sender.google_chat.Client", return_value=mock_client):
+        with GoogleChatClient("https://example.com/webhook") as client:
+            with pytest.raises(error):
+                client.send_message(message, overflow=overflow)
+
+    mock_client.post.assert_not_called()
+
+
+def test_send_encoded_message() -> None:
+    mock_client = MagicMock()
+    payload = GoogleChatClient.encode_message("Hello", thread_key="alerts")
+
+    with patch("message_sender.google_chat.Client", return_value=mock_client):
+        with GoogleChatClient("https://example.com/webhook") as client:
+            client.send_message(payload, thread_key="alerts")
+
+    mock_client.post.assert_called_once_with(
+        "https://example.com/webhook",
+        content=b'{"text":"Hello","thread":{"threadKey":"alerts"}}',
+        headers={"Content-Type": "application/json"},
+        params={"messageReplyOption": "REPLY_MESSAGE_FALLBACK_TO_NEW_THREAD"},
+    )
+
+
+async def test_async_send_encoded_message() -> None:
+    mock_client = MagicMock()
+    mock_client.post = AsyncMock(return_value=MagicMock())
+    mock_client.aclose = AsyncMock()
+
+    with patch("message_sender.google_chat.AsyncClient", return_value=mock_client):
+        async with AsyncGoogleChatClient("https://example.com/webhook") as client:
+            await client.send_message(AsyncGoogleChatClient.encode_message("Hello"))
+
+    mock_client.post.assert_called_once_with(
+        "https://example.com/webhook",
+        content=b'{"text":"Hello"}',
+        headers={"Content-Type": "application/json"},
+    )
+
+
+async def test_async_send_message_result() -> None:
+    def handler(request):
+        return httpx2.Response(200, json={"name": "spaces/a/messages/b"})
+
+    client = httpx2.AsyncClient(transport=httpx2.MockTransport(handler))
+
+    with patch("message_sender.google_chat.AsyncClient", return_value=client):
+        async with AsyncGoogleChatClient("https://example.com/webhook") as chat:
+            result = await chat.send_message("Hello")
+
+    assert result.status == 200
+    assert result.response == {"name": "spaces/a/messages/b"}
+    assert result.bytes_sent > 0
+    assert result.elapsed > 0
@@ -0,0 +1,138 @@
+import asyncio
+import itertools
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiosmtplib import SMTPResponseException
+from httpx2 import HTTPStatusError, Request, Response
+
+from message_sender.discord import AsyncDiscordClient
+from message_sender.limiter import AdaptiveLimiter, is_throttled
+
+
+def _http_error(status_code: int) -> HTTPStatusError:
+    request = Request("POST", "https://example.com/webhook")
+    return HTTPStatusError(
+        "error", request=request, response=Response(status_code, request=request)
+    )
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (_http_error(429), True),
+        (_http_error(503), True),
+        (_http_error(400), False),
+        (SMTPResponseException(421, "Too many connections"), True),
+        (SMTPResponseException(451, "Try again later"), True),
+        (SMTPResponseException(550, "No such user"), False),
+        (ValueError("boom"), False),
+    ],
+)
+def test_is_throttled(error: Exception, expected: bool) -> None:
+    assert is_throttled(error) is expected
+
+
+async def test_limit_grows_while_latency_is_flat() -> None:
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4)
+
+    # Every send takes exactly one second so timer jitter can't look like a latency spike.
+    with patch("message_sender.limiter.time.perf_counter", side_effect=itertools.count()):
+        for _ in range(50):
+            async with limiter.acquire():
+                pass
+
+    assert limiter.limit == 4
+    assert limiter.baseline_latency is not None
+
+
+async def test_limit_backs_off_on_throttling() -> None:
+    limiter = AdaptiveLimiter(initial_limit=8, min_limit=2)
+
+    with pytest.raises(HTTPStatusError):
+        async with limiter.acquire():
+            raise _http_error(429)
+
+    assert limiter.limit == 4
+
+    for _ in range(3):
+        with pytest.raises(SMTPResponseException):
+            async with limiter.acquire():
+                raise SMTPResponseException(421, "Too many connections")
+
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+async def test_other_errors_do_not_change_limit() -> None:
+    limiter = AdaptiveLimiter(initial_limit=8)
+
+    with pytest.raises(ValueError):
+        async with limiter.acquire():
+            raise ValueError("boom")
+
+    assert limiter.limit == 8
+
+
+async def test_limit_backs_off_on_latency_spike() -> None:
+    limiter = AdaptiveLimiter(initial_limit=8, latency_tolerance=2.0)
+
+    with patch("message_sender.limiter.time.perf_counter", side_effect=[0.0, 0.1, 1.0, 2.0]):
+        async with limiter.acquire():
+            pass
+        async with limiter.acquire():
+            pass
+
+    assert limiter.limit == 4
+
+
+async def test_in_flight_is_capped_at_limit() -> None:
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    release = asyncio.Event()
+    peak = 0
+
+    async def send() -> None:
+        nonlocal peak
+        async with limiter.acquire():
+            peak = max(peak, limiter.in_flight)
+            await release.wait()
+
+    tasks = [asyncio.create_task(send()) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"initial_limit": 0, "min_limit": 0},
+        {"initial_limit": 10, "max_limit": 5},
+        {"backoff": 1.5},
+        {"latency_tolerance": 1},
+    ],
+)
+def test_invalid_settings(kwargs) -> None:
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(**kwargs)
+
+
+async def test_client_backs_off_on_429() -> None:
+    mock_client = MagicMock()
+    mock_response = MagicMock()
+    mock_response.raise_for_status.side_effect = _http_error(429)
+    mock_client.post = AsyncMock(return_value=mock_response)
+    mock_client.aclose = AsyncMock()
+    limiter = AdaptiveLimiter(initial_limit=4)
+
+    with patch("message_sender.discord.AsyncClient", return_value=mock_client):
+        async with AsyncDiscordClient("https://example.com/webhook", limiter=limiter) as client:
+            with pytest.raises(HTTPStatusError):
+                await client.send_message("Hello, World!")
+
+    assert limiter.limit == 2
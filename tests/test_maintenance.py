@@ -0,0 +1,243 @@
+import asyncio
+import smtplib
+import time
+from unittest.mock import patch
+
+import httpx2
+import pytest
+
+from message_sender.attachments import Attachment
+from message_sender.discord import AsyncDiscordClient, DiscordClient
+from message_sender.email.proton import ProtonEmailClient
+from message_sender.email.smtp import AsyncSMTPClient
+from message_sender.google_chat import AsyncGoogleChatClient, GoogleChatClient
+from message_sender.maintenance import AsyncConnectionMaintainer, ConnectionMaintainer
+from message_sender.transports import LocalSMTP, RecordingTransport
+
+
+def _stale_once(error):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise error
+        return httpx2.Response(200)
+
+    return handler, calls
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        httpx2.RemoteProtocolError("Server disconnected without sending a response."),
+        httpx2.ReadError("Connection reset by peer"),
+        httpx2.WriteError("Broken pipe"),
+    ],
+)
+def test_sync_webhook_retries_stale_connection(error):
+    handler, calls = _stale_once(error)
+
+    with DiscordClient(
+        "https://discord.com/api/webhooks/1/a", transport=httpx2.MockTransport(handler)
+    ) as client:
+        result = client.send_message("hi")
+
+    assert result.status == 200
+    assert result.attempts == 2
+    assert [call.content for call in calls] == [b'{"content":"hi"}'] * 2
+
+
+async def test_async_webhook_retries_stale_connection():
+    handler, calls = _stale_once(httpx2.RemoteProtocolError("Server disconnected"))
+
+    async with AsyncGoogleChatClient(
+        "https://chat.googleapis.com/v1/a", transport=httpx2.MockTransport(handler)
+    ) as client:
+        result = await client.send_message("hi")
+
+    assert result.attempts == 2
+    assert len(calls) == 2
+
+
+def test_webhook_retries_stale_connection_once():
+    def handler(request):
+        raise httpx2.RemoteProtocolError("Server disconnected")
+
+    client = GoogleChatClient(
+        "https://chat.googleapis.com/v1/a", transport=httpx2.MockTransport(handler)
+    )
+
+    with pytest.raises(httpx2.RemoteProtocolError):
+        client.send_message("hi")
+
+
+async def test_webhook_does_not_retry_streamed_body():
+    handler, calls = _stale_once(httpx2.WriteError("Broken pipe"))
+
+    async with AsyncDiscordClient(
+        "https://discord.com/api/webhooks/1/a", transport=httpx2.MockTransport(handler)
+    ) as client:
+        with pytest.raises(httpx2.WriteError):
+            await client.send_message("hi", attachments=[Attachment(b"data", filename="a.txt")])
+
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    ("module", "cls", "client"),
+    [
+        ("discord", AsyncDiscordClient, "AsyncClient"),
+        ("discord", DiscordClient, "Client"),
+        ("google_chat", AsyncGoogleChatClient, "AsyncClient"),
+        ("google_chat", GoogleChatClient, "Client"),
+    ],
+)
+def test_webhook_keepalive_expiry(module, cls, client):
+    with patch(f"message_sender.{module}.{client}") as mock_client:
+        cls("https://example.com", keepalive_expiry=30.0)
+
+    limits = mock_client.call_args.kwargs["limits"]
+    assert limits.keepalive_expiry == 30.0
+    assert limits.max_connections == 100
+
+
+def _smtp_client(transport):
+    return AsyncSMTPClient(
+        smtp_server="smtp.server.com",
+        smtp_port=587,
+        email_from="sender@email.com",
+        transport=transport,
+    )
+
+
+async def test_maintain_sends_noop_to_open_session():
+    client = _smtp_client(RecordingTransport())
+
+    async with client:
+        smtp = client._smtp
+        with patch.object(type(smtp), "noop", wraps=smtp.noop, autospec=True) as noop:
+            await client.maintain(idle_timeout=60.0)
+
+        noop.assert_awaited_once()
+        assert client._smtp is smtp
+        assert smtp.is_connected
+
+
+async def test_maintain_reconnects_dropped_session():
+    client = _smtp_client(RecordingTransport())
+
+    async with client:
+        dropped = client._smtp
+        dropped.close()
+
+        await client.maintain()
+
+        assert client._smtp is not dropped
+        assert client._smtp.is_connected
+
+
+async def test_maintain_closes_idle_session_and_next_send_reopens_it():
+    transport = RecordingTransport()
+    client = _smtp_client(transport)
+
+    async with client:
+        client._last_used = time.monotonic() - 120
+        await client.maintain(idle_timeout=60.0)
+
+        assert client._smtp is None
+
+        await client.maintain(idle_timeout=60.0)
+        assert client._smtp is None
+
+        result = await client.send_email(message="Hello", email_to="a@example.com", subject="Hi")
+
+        assert "connect" in result.timings
+        assert client._smtp is not None
+        assert client._session
+
+    assert len(transport.messages) == 1
+
+
+async def test_maintain_outside_session_does_nothing():
+    client = _smtp_client(RecordingTransport())
+
+    await client.maintain(idle_timeout=1.0)
+
+    assert client._smtp is None
+    result = await client.send_email(message="Hello", email_to="a@example.com", subject="Hi")
+    assert client._smtp is None
+    assert result.status == 250
+
+
+def test_sync_proton_maintain():
+    transport = RecordingTransport()
+
+    with ProtonEmailClient(
+        "me@proton.me", "token", messages_per_second=None, transport=transport
+    ) as client:
+        smtp = client._smtp
+        client.maintain(idle_timeout=60.0)
+        assert client._smtp is smtp
+
+        with patch.object(LocalSMTP, "noop", side_effect=smtplib.SMTPServerDisconnected):
+            client.maintain(idle_timeout=60.0)
+        assert client._smtp is not smtp
+
+        client._last_used = time.monotonic() - 120
+        client.maintain(idle_timeout=60.0)
+        assert client._smtp is None
+
+        client.send_email(message="Hello", email_to="a@example.com", subject="Hi")
+        assert client._smtp is not None
+
+    assert client._smtp is None
+    assert len(transport.messages) == 1
+
+
+class _Client:
+    def __init__(self):
+        self.calls = []
+
+    def maintain(self, idle_timeout=None):
+        self.calls.append(idle_timeout)
+
+
+class _AsyncClient(_Client):
+    async def maintain(self, idle_timeout=None):
+        self.calls.append(idle_timeout)
+
+
+def test_maintainer_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        ConnectionMaintainer([], interval=0)
+    with pytest.raises(ValueError):
+        AsyncConnectionMaintainer([], idle_timeout=0)
+
+
+async def test_async_maintainer_runs_periodically():
+    clients = [_AsyncClient(), _AsyncClient()]
+
+    async with AsyncConnectionMaintainer(clients, interval=0.01, idle_timeout=5.0) as maintainer:
+        await asyncio.sleep(0.05)
+
+    assert maintainer._task is None
+    calls = len(clients[0].calls)
+    assert calls >= 2
+    assert set(clients[0].calls) == {5.0}
+    await asyncio.sleep(0.03)
+    assert len(clients[0].calls) == calls
+
+
+def test_maintainer_runs_periodically():
+    client = _Client()
+
+    with ConnectionMaintainer([client], interval=0.01, idle_timeout=None) as maintainer:
+        time.sleep(0.05)
+
+    assert maintainer._thread is None
+    calls = len(client.calls)
+    assert calls >= 2
+    assert set(client.calls) == {None}
+    time.sleep(0.03)
+    assert len(client.calls) == calls
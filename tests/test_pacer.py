@@ -0,0 +1,44 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from message_sender._pacer import AsyncPacer, Pacer
+
+
+def test_pacer_allows_burst() -> None:
+    pacer = Pacer(1, burst=3)
+
+    with patch("message_sender._pacer.time.sleep") as mock_sleep:
+        for _ in range(3):
+            pacer.wait()
+
+    mock_sleep.assert_not_called()
+
+
+def test_pacer_waits_after_burst() -> None:
+    pacer = Pacer(2, burst=1)
+
+    with patch("message_sender._pacer.time.sleep") as mock_sleep:
+        pacer.wait()
+        pacer.wait()
+        pacer.wait()
+
+    assert mock_sleep.call_count == 2
+    assert mock_sleep.call_args_list[1][0][0] == pytest.approx(1.0, abs=0.05)
+
+
+async def test_async_pacer_waits_after_burst() -> None:
+    pacer = AsyncPacer(10, burst=2)
+
+    with patch("message_sender._pacer.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        for _ in range(3):
+            await pacer.wait()
+
+    mock_sleep.assert_called_once()
+    assert mock_sleep.call_args[0][0] == pytest.approx(0.1, abs=0.05)
+
+
+@pytest.mark.parametrize("rate, burst", [(0, 1), (-1, 1), (1, 0)])
+def test_pacer_invalid_settings(rate: float, burst: int) -> None:
+    with pytest.raises(ValueError):
+        Pacer(rate, burst=burst)
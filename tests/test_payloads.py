@@ -0,0 +1,18 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from message_sender import payloads
+from message_sender.payloads import dumps
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps(use_orjson):
+    payload = {"content": "héllo", "thread": {"threadKey": "a"}}
+
+    with patch.object(payloads, "orjson", payloads.orjson if use_orjson else None):
+        encoded = dumps(payload)
+
+    assert encoded == b'{"content":"h\xc3\xa9llo","thread":{"threadKey":"a"}}'
+    assert json.loads(encoded) == payload
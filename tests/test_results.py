@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import httpx2
+
+from message_sender.results import SendResult, record_response
+
+
+def test_send_result_phases():
+    result = SendResult()
+
+    with patch("message_sender.results.time.perf_counter", side_effect=[1.0, 1.5, 2.0, 2.25]):
+        with result.phase("send"):
+            pass
+        with result.phase("send"):
+            pass
+    result.add("build", 0.25)
+
+    assert result.timings == {"send": 0.75, "build": 0.25}
+    assert result.elapsed == 1.0
+    assert result.attempts == 1
+
+
+def test_send_result_repr():
+    result = SendResult(status=250, response="queued as ABC", bytes_sent=10)
+
+    assert repr(result) == (
+        "SendResult(status=250, response='queued as ABC', attempts=1, bytes_sent=10, timings={})"
+    )
+
+
+def test_record_response_json():
+    request = httpx2.Request("POST", "https://example.com", json={"content": "hi"})
+    response = httpx2.Response(200, json={"id": "123"}, request=request)
+    result = SendResult()
+
+    record_response(result, response)
+
+    assert result.status == 200
+    assert result.response == {"id": "123"}
+    assert result.bytes_sent == len(request.content)
+
+
+def test_record_response_empty_and_text():
+    request = httpx2.Request("POST", "https://example.com", json={"content": "hi"})
+    result = SendResult()
+
+    record_response(result, httpx2.Response(204, request=request), bytes_sent=5)
+
+    assert result.status == 204
+    assert result.response is None
+    assert result.bytes_sent == 5
+
+    record_response(result, httpx2.Response(200, text="ok", request=request), bytes_sent=5)
+
+    assert result.response == "ok"
+    assert result.bytes_sent == 10
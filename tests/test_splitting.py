@@ -0,0 +1,61 @@
+import pytest
+
+from message_sender.splitting import MessageTooLongError, chunk_message, split_message
+
+
+def test_split_message_short():
+    assert split_message("hello", 10) == ["hello"]
+
+
+def test_split_message_prefers_newlines():
+    message = "first line here\nsecond line\nthird"
+
+    assert split_message(message, 20) == ["first line here", "second line\nthird"]
+
+
+def test_split_message_falls_back_to_spaces():
+    assert split_message("one two three four", 9) == ["one two", "three", "four"]
+
+
+def test_split_message_cuts_long_words():
+    assert split_message("a" * 25, 10) == ["a" * 10, "a" * 10, "a" * 5]
+
+
+@pytest.mark.parametrize("limit", [1, 7, 50, 2000])
+def test_split_message_chunks_fit_and_keep_order(limit):
+    message = "\n".join(f"line {i} " + "word " * (i % 13) for i in range(500))
+
+    chunks = split_message(message, limit)
+
+    assert all(0 < len(chunk) <= limit for chunk in chunks)
+    assert "".join("".join(chunk.split()) for chunk in chunks) == "".join(message.split())
+
+
+def test_split_message_invalid_limit():
+    with pytest.raises(ValueError):
+        split_message("hello", 0)
+
+
+def test_chunk_message_under_limit():
+    assert chunk_message("hello", 5, "error") == ["hello"]
+
+
+def test_chunk_message_split():
+    assert chunk_message("hello world", 5, "split") == ["hello", "world"]
+
+
+def test_chunk_message_attach():
+    assert chunk_message("hello world", 5, "attach") is None
+
+
+def test_chunk_message_error():
+    with pytest.raises(MessageTooLongError) as e:
+        chunk_message("hello world", 5, "error")
+
+    assert e.value.length == 11
+    assert e.value.limit == 5
+
+
+def test_chunk_message_empty():
+    with pytest.raises(ValueError):
+        chunk_message("", 5, "split")
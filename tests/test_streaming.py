@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from message_sender.streaming import StreamResult, stream_sends
+
+
+async def _source(count: int, pulled: list[int]):
+    for i in range(count):
+        pulled.append(i)
+        yield i
+
+
+async def test_stream_sends_async_source() -> None:
+    pulled: list[int] = []
+
+    async def send(item: int) -> int:
+        await asyncio.sleep(0)
+        return item * 2
+
+    results = [result async for result in stream_sends(_source(20, pulled), send, max_in_flight=3)]
+
+    assert sorted(result.item for result in results) == list(range(20))
+    assert all(result.ok and result.result == result.item * 2 for result in results)
+
+
+async def test_stream_sends_sync_source() -> None:
+    async def send(item: str) -> None:
+        pass
+
+    results = [result async for result in stream_sends(["a", "b"], send)]
+
+    assert sorted(result.item for result in results) == ["a", "b"]
+
+
+async def test_stream_sends_yields_in_completion_order() -> None:
+    async def send(delay: float) -> None:
+        await asyncio.sleep(delay)
+
+    results = [result.item async for result in stream_sends([0.02, 0.0, 0.01], send)]
+
+    assert results == [0.0, 0.01, 0.02]
+
+
+async def test_stream_sends_yields_errors() -> None:
+    async def send(item: int) -> None:
+        if item % 2:
+            raise ValueError(item)
+
+    results = [result async for result in stream_sends(range(4), send)]
+    failed = sorted(result.item for result in results if not result.ok)
+
+    assert failed == [1, 3]
+    assert all(isinstance(result.error, ValueError) for result in results if not result.ok)
+
+
+async def test_stream_sends_applies_backpressure() -> None:
+    pulled: list[int] = []
+    release = asyncio.Event()
+    in_flight = 0
+    peak = 0
+
+    async def send(item: int) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await release.wait()
+        in_flight -= 1
+
+    stream = stream_sends(_source(1000, pulled), send, max_in_flight=4)
+    first = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0.01)
+
+    assert len(pulled) == 4
+
+    release.set()
+    await first
+    await stream.aclose()
+
+    assert peak == 4
+    assert len(pulled) < 1000
+
+
+async def test_stream_sends_cancels_in_flight_on_close() -> None:
+    cancelled = 0
+
+    async def send(item: int) -> None:
+        nonlocal cancelled
+        if item == 0:
+            return
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+
+    stream = stream_sends(range(5), send, max_in_flight=3)
+    await anext(stream)
+    await stream.aclose()
+
+    assert cancelled == 2
+
+
+async def test_stream_sends_invalid_max_in_flight() -> None:
+    async def send(item: int) -> None:
+        pass
+
+    with pytest.raises(ValueError):
+        await anext(stream_sends([1], send, max_in_flight=0))
+
+
+def test_stream_result_repr() -> None:
+    assert repr(StreamResult("a")) == "StreamResult(item='a', result=None, error=None)"
@@ -0,0 +1,206 @@
+import smtplib
+
+import aiosmtplib
+import httpx2
+import pytest
+
+from message_sender.discord import AsyncDiscordClient, DiscordClient
+from message_sender.email.direct import AsyncDirectSMTPClient, MXRecord
+from message_sender.email.models import Email
+from message_sender.email.proton import AsyncProtonEmailClient, ProtonEmailClient
+from message_sender.email.smtp import AsyncSMTPClient, SMTPClient
+from message_sender.google_chat import AsyncGoogleChatClient, GoogleChatClient
+from message_sender.transports import (
+    FailureTransport,
+    LatencyTransport,
+    LocalTransport,
+    NullTransport,
+    RecordingTransport,
+)
+
+
+def _smtp_client(cls, transport):
+    return cls(
+        smtp_server="smtp.server.com",
+        smtp_port=587,
+        email_from="sender@email.com",
+        user_name="test-user",
+        password="test-password",
+        transport=transport,
+    )
+
+
+def test_local_transport_rejects_bad_settings():
+    with pytest.raises(ValueError):
+        LocalTransport(latency=-1)
+    with pytest.raises(ValueError):
+        LocalTransport(jitter=-1)
+    with pytest.raises(ValueError):
+        FailureTransport(1.5)
+
+
+def test_sync_webhook_clients_record_requests():
+    transport = RecordingTransport()
+
+    DiscordClient("https://discord.com/api/webhooks/1/abc", transport=transport).send_message("hi")
+    GoogleChatClient("https://chat.googleapis.com/v1/spaces/1", transport=transport).send_message(
+        "hi"
+    )
+
+    assert [str(request.url.host) for request in transport.requests] == [
+        "discord.com",
+        "chat.googleapis.com",
+    ]
+    assert transport.requests[0].content == b'{"content":"hi"}'
+    assert transport.delivered == 2
+
+
+async def test_async_webhook_clients_null_transport():
+    transport = NullTransport(status_code=204)
+    discord = AsyncDiscordClient("https://discord.com/api/webhooks/1/abc", transport=transport)
+    google_chat = AsyncGoogleChatClient(
+        "https://chat.googleapis.com/v1/spaces/1", transport=transport
+    )
+
+    results = [await discord.send_message("hi"), await google_chat.send_message("hi")]
+
+    assert [result.status for result in results] == [204, 204]
+    assert transport.requests == []
+    assert transport.delivered == 2
+
+
+async def test_latency_transport_delays_requests():
+    client = AsyncDiscordClient(
+        "https://discord.com/api/webhooks/1/abc", transport=LatencyTransport(0.05)
+    )
+
+    result = await client.send_message("hi")
+
+    assert result.timings["send"] >= 0.05
+
+
+def test_latency_transport_jitter_is_seeded():
+    first = LatencyTransport(0.1, jitter=0.5, seed=1)
+    second = LatencyTransport(0.1, jitter=0.5, seed=1)
+
+    delays = [first._delay() for _ in range(5)]
+
+    assert delays == [second._delay() for _ in range(5)]
+    assert all(0.1 <= delay <= 0.6 for delay in delays)
+
+
+def test_failure_transport_fails_requests():
+    client = DiscordClient(
+        "https://discord.com/api/webhooks/1/abc", transport=FailureTransport(1.0, 429)
+    )
+
+    with pytest.raises(httpx2.HTTPStatusError) as e:
+        client.send_message("hi")
+
+    assert e.value.response.status_code == 429
+
+
+def test_failure_transport_is_reproducible():
+    def outcomes(transport):
+        client = GoogleChatClient("https://chat.googleapis.com/v1/spaces/1", transport=transport)
+        results = []
+        for _ in range(20):
+            try:
+                client.send_message("hi")
+                results.append(True)
+            except httpx2.HTTPStatusError:
+                results.append(False)
+        return results
+
+    first = FailureTransport(0.5, seed=7)
+
+    assert outcomes(first) == outcomes(FailureTransport(0.5, seed=7))
+    assert first.failed + first.delivered == 20
+    assert 0 < first.failed < 20
+
+
+def test_sync_smtp_client_records_messages():
+    transport = RecordingTransport()
+
+    result = _smtp_client(SMTPClient, transport).send_email(
+        message="Hello", email_to="recipient@example.com", subject="Test"
+    )
+
+    assert result.status == 250
+    assert [msg["To"] for msg in transport.messages] == ["recipient@example.com"]
+
+
+async def test_async_smtp_client_session_records_messages():
+    transport = RecordingTransport()
+
+    async with _smtp_client(AsyncSMTPClient, transport) as client:
+        results = [
+            await client.send_email(message="Hello", email_to=f"user{i}@example.com", subject="Hi")
+            for i in range(3)
+        ]
+
+    assert [result.status for result in results] == [250, 250, 250]
+    assert len(transport.messages) == 3
+
+
+def test_sync_smtp_client_failure_raises_reply_code():
+    client = _smtp_client(SMTPClient, FailureTransport(1.0, failure_reply=452))
+
+    with pytest.raises(smtplib.SMTPResponseException) as e:
+        client.send_email(message="Hello", email_to="recipient@example.com", subject="Test")
+
+    assert e.value.smtp_code == 452
+
+
+async def test_async_smtp_client_failure_raises_reply_code():
+    client = _smtp_client(AsyncSMTPClient, FailureTransport(1.0))
+
+    with pytest.raises(aiosmtplib.SMTPResponseException) as e:
+        await client.send_email(message="Hello", email_to="recipient@example.com", subject="Test")
+
+    assert e.value.code == 451
+
+
+def test_proton_clients_use_transport():
+    transport = RecordingTransport()
+
+    ProtonEmailClient(
+        "me@proton.me", "token", messages_per_second=None, transport=transport
+    ).send_email(message="Hello", email_to="recipient@example.com", subject="Test")
+    with ProtonEmailClient(
+        "me@proton.me", "token", messages_per_second=None, transport=transport
+    ) as client:
+        client.send_email(message="Hello", email_to="recipient@example.com", subject="Test")
+
+    assert len(transport.messages) == 2
+
+
+async def test_async_proton_client_uses_transport():
+    transport = RecordingTransport()
+
+    async with AsyncProtonEmailClient(
+        "me@proton.me", "token", messages_per_second=None, transport=transport
+    ) as client:
+        result = await client.send_email(
+            message="Hello", email_to="recipient@example.com", subject="Test"
+        )
+
+    assert result.status == 250
+    assert len(transport.messages) == 1
+
+
+async def test_direct_client_uses_transport():
+    transport = RecordingTransport()
+
+    async def resolver(domain):
+        return [MXRecord(0, f"mx.{domain}")]
+
+    client = AsyncDirectSMTPClient("sender@email.com", resolver=resolver, transport=transport)
+
+    results = await client.send_many(
+        Email(message="Hello", email_to=f"user@{domain}", subject="Test")
+        for domain in ("one.com", "two.com")
+    )
+
+    assert all(result.error is None for result in results)
+    assert len(transport.messages) == 2